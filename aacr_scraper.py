@@ -3,12 +3,14 @@ import time
 import random
 import pandas as pd
 from pathlib import Path
-from bs4 import BeautifulSoup
 import sys
 import re
 import os
 import contextlib
 import io
+import json
+import queue
+import multiprocessing
 
 try:
     import ssl
@@ -25,9 +27,32 @@ from selenium.common.exceptions import TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium_stealth import stealth
 
+from driver_pool import DriverPool, TabPipeline, persistent_profile_options, enforce_profile_cap
+import abstractsonline_api as aol
+import readiness
+import extraction
+from throttle import AIMDController
+import failures
+from failures import CircuitBreaker
+from state_store import open_store, copy_tables, rank_rows, TSVStore
+from journal import Journal, recover as recover_journal
+from page_cache import PageCache, reparse
+from devtools import (NetworkCapture, enable_performance_logging, BLOCK_PROFILES,
+                      apply_request_blocking, compare_blocking, print_blocking_report)
 
 import psutil
 
+DEBUG = False
+CAPTURE_NETWORK = False
+HASH_NAV = False
+BLOCK_PATTERNS = BLOCK_PROFILES["abstractsonline"]
+PROFILE_DIR = None
+CACHE_SIZE_MB = 512
+THROTTLE = AIMDController(initial_delay=3.0, min_delay=0.5, max_delay=60.0)
+BREAKER = CircuitBreaker()
+STORE = None  # state_store backend, opened in main()
+PAGE_CACHE = None  # page_cache.PageCache, opened in main(); None with --page-cache-mb 0
+
 class TeeLogger:
     def __init__(self, file_path):
         self.terminal = sys.stdout
@@ -54,9 +79,19 @@ def set_output_paths(base_path):
         "processed_pages": base_path / "processed_session_pages.tsv",
         "aacr_links": base_path / "aacr_links.tsv",
         "aacr_abstracts": base_path / "aacr_abstracts.tsv",
-        "html_dumps": base_path / "html_dumps"
+        "html_dumps": base_path / "html_dumps",
+        "readiness_latencies": logs_path / "readiness_latencies.tsv",
+        "state_db": base_path / "state.sqlite",
+        "state_journal": base_path / "state_journal.jsonl",
+        "page_cache": base_path / "page_cache"
     }
 
+# State tables, each backed by the TSV of the same name in `paths`
+STATE_TABLES = ("session_estimates", "processed_pages", "aacr_links", "aacr_abstracts")
+
+def state_tsv_paths(paths):
+    return {table: paths[table] for table in STATE_TABLES}
+
 def get_chrome_options():
     # Randomize user agent, window size, and optionally incognito mode
     options = webdriver.ChromeOptions()
@@ -87,9 +122,13 @@ def get_chrome_options():
     # prevent memory bloat
     # options.add_argument("--single-process")
     options.add_argument("--memory-pressure-off")
+    if CAPTURE_NETWORK:
+        enable_performance_logging(options)
     return options
 
-def setup_driver(service, options):
+def setup_driver(service, options, profile_slot="main"):
+    if PROFILE_DIR is not None:
+        options = persistent_profile_options(options, PROFILE_DIR, profile_slot, CACHE_SIZE_MB)
     driver = webdriver.Chrome(service=service, options=options)
     stealth(driver,
         languages=random.choice([["en-US", "en"], ["en-GB", "en"], ["fr-FR", "fr"]]),
@@ -99,6 +138,8 @@ def setup_driver(service, options):
         renderer="Intel Iris OpenGL Engine",
         fix_hairline=True,
     )
+    if BLOCK_PATTERNS:
+        apply_request_blocking(driver, BLOCK_PATTERNS)
     return driver
 
 def kill_chromedriver():
@@ -113,7 +154,7 @@ def log_memory():
     mem = psutil.virtual_memory()
     print(f"[DEBUG] Total: {mem.total >> 20} MB | Used: {mem.used >> 20} MB | Free: {mem.free >> 20} MB | Avail: {mem.available >> 20} MB")
 
-def restart_driver(service, options, label=""):
+def restart_driver(service, options, label="", driver=None, profile_slot="main"):
     print(f"🔄 Restarting driver{f' ({label})' if label else ''} ...")
     try:
         driver.quit()
@@ -122,15 +163,22 @@ def restart_driver(service, options, label=""):
     kill_chromedriver()
     log_memory()
     os.system("sudo sh -c 'echo 3 >/proc/sys/vm/drop_caches'")
-    driver = setup_driver(service, options)
+    # Same profile slot, so a persistent disk cache survives the restart
+    driver = setup_driver(service, options, profile_slot)
     print("✅ Driver restarted.")
     log_memory()
-    print("🌙 Sleeping for 15 seconds before resuming...")
-    time.sleep(15)
+    # The restart usually follows a failure, so the throttle has already backed off
+    print(f"🌙 Sleeping for {THROTTLE.host(aol.PRESENTATION_URL).delay:.1f} seconds before resuming...")
+    THROTTLE.cooldown(aol.PRESENTATION_URL)
     return driver
 
-def safe_get(driver, url, retries=3, wait=10):
-    for attempt in range(retries):
+def safe_get(driver, url):
+    """
+    Load `url`, retrying timeouts with jittered backoff. Other driver errors propagate so the
+    caller can recycle. The caller reports the classified outcome to the circuit breaker.
+    """
+    attempt = 0
+    while True:
         try:
             driver.set_page_load_timeout(60)
             driver.get(url)
@@ -138,9 +186,43 @@ def safe_get(driver, url, retries=3, wait=10):
                 print(f"[DEBUG] safe_get got {url}")
             return True
         except TimeoutException:
-            print(f"⏱️ Timeout on attempt {attempt + 1} for {url}")
-            time.sleep(wait)
-    return False
+            attempt += 1
+            if not failures.should_retry(failures.TIMEOUT, attempt):
+                return False
+            delay = failures.backoff_delay(failures.TIMEOUT, attempt)
+            print(f"⏱️ Timeout on attempt {attempt} for {url}; retrying in {delay:.1f} sec")
+            time.sleep(delay)
+
+def hash_navigate(driver, url, content_selector, timeout=30):
+    """
+    Route the already-booted pp8 app to `url` by changing location.hash instead of reloading it.
+    Waits until the route has rendered new `content_selector` elements: existing ones are stamped
+    before navigating, so either an unstamped element or changed text means the route switched.
+    Falls back to a full safe_get on the first load of a driver or if the route never settles.
+    """
+    base, _, route = url.partition("#")
+    try:
+        current = driver.current_url
+    except Exception:
+        current = ""
+    if not route or not current.startswith(base) or current == url:
+        return safe_get(driver, url)
+
+    try:
+        before = readiness.mark_stale(driver, content_selector)
+        driver.execute_script("window.location.hash = arguments[0];", "#" + route)
+        readiness.wait_fresh(driver, content_selector, before, timeout=timeout)
+        if DEBUG:
+            print(f"[DEBUG] hash_navigate routed to {route}")
+        return True
+    except Exception as e:
+        print(f"⚠️ In-app navigation to {route} did not settle ({e.__class__.__name__}); reloading.")
+        return safe_get(driver, url)
+
+def navigate(driver, url, content_selector):
+    if HASH_NAV:
+        return hash_navigate(driver, url, content_selector)
+    return safe_get(driver, url)
 
 def test_landing_page(driver, url, paths):
     output_path = paths["output"]
@@ -155,58 +237,51 @@ def test_landing_page(driver, url, paths):
         f.write(driver.page_source)
     print(f"✅ Rendered HTML saved to {output_file}")
 
-def fetch_aacr_title_link_from_html(driver, url, session_name, dump_dir, retries=3):
+def scrape_listing(driver, min_links=10):
+    """Wait for a rendered session page and scrape its links; raises TimeoutException if it never fills."""
+    readiness.wait_ready(driver, "aacr_listing", arg=min_links, debug=DEBUG)
+
+    # Scrape data using JavaScript
+    data = driver.execute_script("""
+        return [...document.querySelectorAll('h1.name')].map(el => {
+            return {
+                id: el.getAttribute('data-id'),
+                title: (el.querySelector('span.bodyTitle') || {}).innerText || ""
+            };
+        });
+    """)
+
+    return pd.DataFrame([
+        {
+            "link": f"https://www.abstractsonline.com/pp8/#!/20273/presentation/{item['id']}",
+            "title": item["title"].strip(),
+            "retrieved": False
+        }
+        for item in data if item["id"] and item["title"]
+    ], columns=["link", "title", "retrieved"])
+
+def fetch_aacr_title_link_from_html(driver, url, session_name, dump_dir, retries=3, min_links=10):
     if DEBUG:
         print(f"[DEBUG] Trying to fetch url {url} for session {session_name}.")
 
     for attempt in range(1, retries + 1):
         try:
-            success = safe_get(driver, url)
+            success = navigate(driver, url, "h1.name[data-id]")
             if not success:
                 raise Exception("Page load failed after retries")
 
             try:
-                WebDriverWait(driver, 30).until(
-                    lambda d: len(d.find_elements(By.CSS_SELECTOR, "h1.name[data-id]")) >= 10
-                )
+                df = scrape_listing(driver, min_links=min_links)
                 if DEBUG:
-                    print(f"[DEBUG] WebDriverWait succeeded on attempt {attempt}")
+                    print(f"[DEBUG] Listing ready on attempt {attempt}")
+                if PAGE_CACHE is not None and len(df):
+                    # Only the extracted rows: nothing re-parses the rendered listing, and its DOM is large
+                    PAGE_CACHE.put(url, df.to_json(orient="records"), "aacr_listing_rows")
             except TimeoutException:
                 # once this starts happening there is no recovery
-                print(f"WebDriverWait timed out - bailing.")
+                print(f"Listing never became ready - bailing.")
                 break
 
-            time.sleep(5)
-            # JS fallback loop
-            for i in range(10):
-                count = driver.execute_script("return document.querySelectorAll('h1.name').length;")
-                if count > 0:
-                    if DEBUG:
-                        print(f"[DEBUG] Found {count} links via JS after {i + 1} tries.")
-                    break
-                if DEBUG:
-                    print(f"[DEBUG] Waiting for links... attempt {i + 1}")
-                time.sleep(2)
-
-            # Scrape data using JavaScript
-            data = driver.execute_script("""
-                return [...document.querySelectorAll('h1.name')].map(el => {
-                    return {
-                        id: el.getAttribute('data-id'),
-                        title: (el.querySelector('span.bodyTitle') || {}).innerText || ""
-                    };
-                });
-            """)
-
-            df = pd.DataFrame([
-                {
-                    "link": f"https://www.abstractsonline.com/pp8/#!/20273/presentation/{item['id']}",
-                    "title": item["title"].strip(),
-                    "retrieved": False
-                }
-                for item in data if item["id"] and item["title"]
-            ])
-
             return df
 
         except Exception as e:
@@ -225,6 +300,61 @@ def fetch_aacr_title_link_from_html(driver, url, session_name, dump_dir, retries
 
 
 
+def fetch_aacr_title_link_from_network(driver, url, session_name):
+    """
+    Read a session page's links from the JSON the pp8 app fetches while rendering it,
+    instead of scraping h1.name elements. Returns None if no listing response was captured.
+    """
+    capture = NetworkCapture(driver, debug=DEBUG)
+    try:
+        capture.reset()
+        if not navigate(driver, url, "h1.name[data-id]"):
+            return None
+        _, data = capture.wait_for(aol.RESULTS_URL_PATTERN, timeout=30)
+    except Exception as e:
+        print(f"⚠️ Network capture failed for {url}: {e}")
+        return None
+    if data is None:
+        print(f"⚠️ No listing response captured for {url}; falling back to DOM scrape.")
+        return None
+    _, records = aol.parse_results(data)
+    if PAGE_CACHE is not None:
+        PAGE_CACHE.put(url, json.dumps(records), "aacr_listing_json")
+    rows = aol.listing_to_links(records, session_name)
+    if DEBUG:
+        print(f"[DEBUG] Captured {len(rows)} links for {session_name} from {url}")
+    return pd.DataFrame(rows, columns=["link", "title", "retrieved"])
+
+
+def fetch_aacr_title_link_from_api(client, url, session_name):
+    """API counterpart of fetch_aacr_title_link_from_html: one listing page as a links DataFrame."""
+    page_num = int(url.split("/")[-1])
+    cached = PAGE_CACHE.fresh(url, "aacr_listing_json") if PAGE_CACHE is not None else None
+    if cached is not None:
+        records = json.loads(cached)
+    else:
+        try:
+            _, records = client.results(aol.filter_from_session_url(url), page_num)
+        except Exception as e:
+            print(f"⚠️ API listing failed for page {page_num} of session '{session_name}': {e}")
+            return pd.DataFrame(columns=["link", "title", "retrieved"])
+        if PAGE_CACHE is not None:
+            PAGE_CACHE.put(url, json.dumps(records), "aacr_listing_json")
+    rows = aol.listing_to_links(records, session_name, client.meeting_id)
+    if DEBUG:
+        print(f"[DEBUG] API returned {len(rows)} links for page {page_num} of {session_name}")
+    return pd.DataFrame(rows, columns=["link", "title", "retrieved"])
+
+
+def get_total_pages_api(client, url, session_name):
+    try:
+        total_results, _ = client.results(aol.filter_from_session_url(url), 1)
+        return (total_results - 1) // 10 + 1
+    except Exception as e:
+        print(f"[WARNING] API estimate failed for session '{session_name}': {e}")
+        return -1
+
+
 def extract_session_name(url):
     match = re.search(r"@[^=/]+=(.*?)/", url)
     if match:
@@ -233,16 +363,15 @@ def extract_session_name(url):
 
 def get_total_pages(service, options, url, session_name, dump_dir, retries=3):
     for attempt in range(1, retries + 1):
+        BREAKER.wait(url)
         driver = setup_driver(service, options)
         try:
             success = safe_get(driver, url)
             if not success:
                 raise TimeoutException("Page load timeout")
 
-            WebDriverWait(driver, 20).until(
-                EC.text_to_be_present_in_element((By.TAG_NAME, "h1"), "Displaying results")
-            )
-            time.sleep(2)
+            readiness.wait_ready(driver, "aacr_total", debug=DEBUG)
+            BREAKER.record(url, failures.OK)
 
             if DEBUG:
                 print(f"[DEBUG] Attempt {attempt}: Displaying results located.")
@@ -259,6 +388,7 @@ def get_total_pages(service, options, url, session_name, dump_dir, retries=3):
         except Exception as e:
             print(f"[WARNING] Attempt {attempt} failed for session '{session_name}': {e}")
             html = driver.page_source
+            BREAKER.record(url, failures.classify_failure(e, html))
             dump_file = dump_dir / f"{session_name.replace(' ', '_')}.html"
             with open(dump_file, "w", encoding="utf-8") as f:
                 f.write(html)
@@ -270,318 +400,892 @@ def get_total_pages(service, options, url, session_name, dump_dir, retries=3):
     return -1
 
 
-def estimate_all_sessions(session_urls, service, options, paths):
+def estimate_all_sessions(session_urls, service, options, paths, client=None):
     paths["output"].mkdir(parents=True, exist_ok=True)
-    estimates_file = paths["session_estimates"] 
 
-    existing_estimates = pd.DataFrame()
-    if estimates_file.exists():
-        existing_estimates = pd.read_csv(estimates_file, sep="\t")
+    existing_estimates = STORE.read("session_estimates")
+    existing_pages = dict(zip(existing_estimates["session"], existing_estimates["pages"]))
     session_data = []
     retried_sessions = []
     
     for session_url in session_urls:
         session_name = extract_session_name(session_url)
-        existing_row = existing_estimates[existing_estimates["session"] == session_name]
 
-        if not existing_row.empty and existing_row.iloc[0]["pages"] > 0:
-            session_data.append({"session": session_name, "pages": existing_row.iloc[0]["pages"]})
+        if existing_pages.get(session_name, 0) > 0:
+            session_data.append({"session": session_name, "pages": existing_pages[session_name]})
             continue
 
         print(f"🔍 Estimating session: {session_name}")
-        total_pages = get_total_pages(service, options, session_url, session_name, paths["html_dumps"])
+        if client is not None:
+            total_pages = get_total_pages_api(client, session_url, session_name)
+        else:
+            total_pages = get_total_pages(service, options, session_url, session_name, paths["html_dumps"])
         print(f"📄 Estimated pages: {total_pages}")
         session_data.append({"session": session_name, "pages": total_pages})
         retried_sessions.append(session_name)
 
     df = pd.DataFrame(session_data)
-    if estimates_file.exists():
-        estimates_file.rename(estimates_file.with_suffix(".bak"))
-    df.to_csv(estimates_file, sep="\t", index=False)
-    print(f"📊 Session estimates saved to {estimates_file}")
+    STORE.write("session_estimates", df)
+    print(f"📊 Session estimates saved to {STORE.describe('session_estimates')}")
 
     if not retried_sessions:
         paths["session_estimates_ok"].touch()
         print(f"✅ All sessions had valid page estimates. Flag file created: {paths['session_estimates_ok']}")
 
-def get_links(session_urls, service, options, paths, max_pages=100):
-    processed_path = paths["processed_pages"]
-    links_path = paths["aacr_links"]
-    estimates_path = paths["session_estimates"]
+class BuildState:
+    """
+    AACR pipeline state kept in memory across get_links/get_abstracts calls (--build-all).
+    Session estimates, processed pages and links are read from STORE once and indexed
+    (session -> URL and page count, (session, page) -> processed, link -> row). Each
+    result is appended to a fsynced journal as it arrives, and the journal is applied to
+    STORE in one flush every `flush_every` records or `flush_interval` seconds, instead of
+    re-reading and rewriting the tables per call. A journal left by a crash is applied first.
+    """
+
+    def __init__(self, store, journal_path, session_urls=(), flush_every=500, flush_interval=60):
+        self.store = store
+        self.session_urls = {extract_session_name(u): u for u in session_urls}
+        self.journal = Journal(journal_path, every=flush_every, interval=flush_interval)
+        if self.journal.pending:
+            print(f"♻️ Replaying {self.journal.pending} journaled records from an interrupted run")
+            self.flush()
+        self.total_pages = None  # session -> estimated pages
+        self.processed = None  # (session, page) -> bool, in table order
+        self.links = None  # aacr_links rows
+        self._link_rows = {}  # link -> row label in self.links
+        self._unmerged_links = []
+
+    def load_pages(self):
+        if self.processed is not None:
+            return
+        estimates = self.store.read("session_estimates")
+        self.total_pages = dict(zip(estimates["session"], estimates["pages"]))
+        # Load processed or create using estimates.  For persistent tracking of progress
+        if self.store.exists("processed_pages"):
+            processed_df = self.store.read("processed_pages")
+        else:
+            processed_df = pd.DataFrame([
+                {"session": session, "page": page, "processed": False}
+                for session, pages in self.total_pages.items()
+                for page in range(1, pages + 1)
+            ])
+            self.store.write("processed_pages", processed_df)
+        self.processed = processed_df.set_index(["session", "page"])["processed"].astype(bool)
+
+    def load_links(self):
+        if self.links is not None:
+            return
+        self.links = self.store.read("aacr_links").reset_index(drop=True)
+        self._link_rows = dict(zip(self.links["link"], self.links.index))
+
+    def _merge_links(self):
+        if self._unmerged_links:
+            self.links = pd.concat([self.links] + self._unmerged_links)
+            self._unmerged_links = []
+
+    def page_tasks(self, max_pages):
+        """(key, session, page, url, is_last_page) for the next unprocessed pages."""
+        self.load_pages()
+        tasks = []
+        # max_pages + 1, as the original `pages_visited > max_pages` loop allowed
+        for session_name, page_num in self.processed.index[~self.processed.to_numpy()][:max_pages + 1]:
+            url_base = self.session_urls.get(session_name)
+            if not url_base:
+                print(f"⚠️ No URL found for session {session_name}")
+                continue
+            url = re.sub(r"/\d+$", f"/{page_num}", url_base)
+            is_last_page = page_num == self.total_pages.get(session_name)
+            tasks.append(((session_name, page_num), session_name, page_num, url, is_last_page))
+        return tasks
+
+    def mark_processed(self, session_name, page_num):
+        self.processed[(session_name, page_num)] = True
+        self.journal.update("processed_pages", [(session_name, page_num)], processed=True)
+
+    def add_links(self, df, session_name):
+        """Record a listing page's links; returns how many were new."""
+        self.load_links()
+        df = df.assign(session=session_name).drop_duplicates(subset=["link"])
+        df = df[[link not in self._link_rows for link in df["link"]]]
+        if df.empty:
+            return 0
+        start = len(self._link_rows)
+        df.index = range(start, start + len(df))
+        self._link_rows.update(zip(df["link"], df.index))
+        self._unmerged_links.append(df)
+        self.journal.upsert("aacr_links", df.to_dict("records"), keep="old")
+        return len(df)
+
+    def pending_links(self, limit):
+        self.load_links()
+        self._merge_links()
+        return self.links[self.links["retrieved"] == False].head(limit)
+
+    def record_abstract(self, row):
+        """Journal one fetched abstract; a complete or not_found one also flags its link as retrieved."""
+        self.journal.upsert("aacr_abstracts", [row], keep="better")
+        # not_found is final too: the page is gone, asking again will not help
+        if row["status"] in ("complete", "not_found"):
+            self._merge_links()
+            if row["link"] in self._link_rows:
+                self.links.loc[self._link_rows[row["link"]], "retrieved"] = True
+            self.journal.update("aacr_links", [row["link"]], retrieved=True)
+
+    def pages_remaining(self):
+        self.load_pages()
+        return int((~self.processed).sum())
+
+    def links_remaining(self):
+        self.load_links()
+        self._merge_links()
+        return int((self.links["retrieved"] == False).sum())
+
+    def maybe_flush(self):
+        if self.journal.due():
+            self.flush()
+
+    def flush(self):
+        """
+        Apply the journal to the store: rows before the flags that point at them, so a crash
+        never flags a missing row. Abstracts merge best-version-wins (complete, non-embargoed,
+        longer), comparing only the journaled links.
+        """
+        if not self.journal.pending:
+            return
+        applied = self.journal.checkpoint(self.store)
+        print("📌 Checkpoint saved: " + ", ".join(f"{n} {table}" for table, n in applied.items()))
+
+    def close(self):
+        self.flush()
+        self.journal.close()
+
+
+def get_links(session_urls, service, options, paths, max_pages=100, client=None, tabs=1, state=None):
     dump_dir = paths["html_dumps"]
     dump_dir.mkdir(parents=True, exist_ok=True)
     finished_path = paths["get_links_finished"]
-    driver = setup_driver(service, options)
-    # limit driver restarts
-    restart_attempts = 0
-    max_restart_attempts = 10
 
     # Load estimates if not already loaded
-    if not estimates_path.exists():
+    if state is None and not STORE.exists("session_estimates"):
         print("❌ session_estimates.tsv not found.")
         return
-    estimates_df = pd.read_csv(estimates_path, sep="\t")
+    own_state = state is None
+    if own_state:
+        state = BuildState(STORE, paths["state_journal"], session_urls)
 
-    # Load processed or create using estimates.  For persistent tracking of progress
-    if processed_path.exists():
-        processed_df = pd.read_csv(processed_path, sep="\t")
-    else:
-        processed_df = pd.DataFrame([
-            {"session": row["session"], "page": page, "processed": False}
-            for _, row in estimates_df.iterrows()
-            for page in range(1, row["pages"] + 1)
-        ])
-        processed_df.to_csv(processed_path, sep="\t", index=False)
-
-    # Load pre-exisiting progress or create new links file
-    if links_path.exists():
-        aacr_links = pd.read_csv(links_path, sep="\t")
-    else:
-        aacr_links = pd.DataFrame(columns=["session", "link", "title", "retrieved"])
+    driver = setup_driver(service, options, "links") if client is None else None
+    # limit driver restarts
+    restart_attempts = 0
+    max_restart_attempts = 10
 
-    seen_links = set(aacr_links["link"])
-    new_links = []
-    pages_visited = 0
+    # Work out which pages to visit in this call
+    tasks = state.page_tasks(max_pages)
 
-    # Iterate over processed file and get links for each page
-    for idx, row in processed_df.iterrows():
-        session_name, page_num, processed = row["session"], row["page"], row["processed"]
-        if processed or pages_visited > max_pages:
-            continue
+    def record_page(task, df):
+        key, session_name, page_num, url, is_last_page = task
+        # were all 10 expected links retrieved? mark the page as processed
+        if len(df) == 10 or is_last_page:
+            state.mark_processed(session_name, page_num)
         else:
-            pages_visited += 1
-
-        url_base = next((u for u in session_urls if extract_session_name(u) == session_name), None)
-        if not url_base:
-            print(f"⚠️ No URL found for session {session_name}")
-            continue
-        url = re.sub(r"/\d+$", f"/{page_num}", url_base)
-
-        # Determine if this is the last page
-        expected_pages_row = estimates_df[estimates_df["session"] == session_name]
-        total_pages = expected_pages_row.iloc[0]["pages"] if not expected_pages_row.empty else None
-        is_last_page = total_pages is not None and page_num == total_pages
-        
-        try:
-            df = fetch_aacr_title_link_from_html(driver, url, session_name, dump_dir)
-            # were all 10 expected links retrieved? mark the page as processed
-            if len(df) == 10 or is_last_page:
-                processed_df.loc[idx, "processed"] = True
+            print(f"⚠️ Only retrieved {len(df)} links from page {page_num} of session '{session_name}' (expected 10).")
+        # keep just the new links
+        state.add_links(df, session_name)
+        state.maybe_flush()
+
+    if tabs > 1 and driver is not None:
+        # One browser, several tabs: the next page loads while this one is scraped
+        pipeline = TabPipeline(driver, tabs=tabs, content_selector="h1.name[data-id]")
+
+        def listing(d, task):
+            df = scrape_listing(d, min_links=1 if task[4] else 10)
+            return df, failures.OK if len(df) else failures.classify_page(page_markers(d), has_content=False)
+
+        admit = lambda task, wait: admit_load(task[3], wait)
+        for task, result, error in pipeline.run(tasks, lambda task: task[3], listing, admit):
+            if error is not None:
+                outcome = tab_outcome(driver, error)
+                print(f"❌ Failed to fetch page {task[2]} of {task[1]} ({outcome}): {error.__class__.__name__} {error}")
             else:
-                print(f"⚠️ Only retrieved {len(df)} links from page {page_num} of session '{session_name}' (expected 10).")
+                df, outcome = result
+                record_page(task, df)
+            settle_load(task[3], outcome)
+        pipeline.close()
+        tasks = []
+
+    for task in tasks:
+        key, session_name, page_num, url, is_last_page = task
+        BREAKER.wait(url)
+        THROTTLE.acquire(url)
+        outcome = failures.ERROR
+        try:
+            df = None
+            if client is not None:
+                df = fetch_aacr_title_link_from_api(client, url, session_name)
+            elif CAPTURE_NETWORK:
+                df = fetch_aacr_title_link_from_network(driver, url, session_name)
+            if df is None:
+                df = fetch_aacr_title_link_from_html(driver, url, session_name, dump_dir,
+                                                     min_links=1 if is_last_page else 10)
+            record_page(task, df)
+            outcome = failures.OK if len(df) else failures.classify_page(
+                driver.page_source if driver is not None else "", has_content=False)
             # has the connection fallen over - try to recover
-            if len(df) == 0:
+            if len(df) == 0 and driver is not None:
                 restart_attempts += 1
                 if restart_attempts >= max_restart_attempts:
                     print(f"❌ Giving up on page {page_num} of session '{session_name}' after {max_restart_attempts} restart attempts.")
                     continue
                 else:
-                    driver = restart_driver(service, options, label=f"session={session_name}, page={page_num}")
-
-            # prep df with just new links and add
-            df["session"] = session_name    
-            df = df[~df["link"].isin(seen_links)]
-            new_links.append(df)
+                    driver = restart_driver(service, options, label=f"session={session_name}, page={page_num}",
+                                            driver=driver, profile_slot="links")
         except Exception as e:
-            print(f"❌ Failed to fetch page {page_num} of {session_name}: {e}")
-
-    if new_links:
-        combined_df = pd.concat([aacr_links] + new_links, ignore_index=True)
-        if links_path.exists():
-            links_path.rename(links_path.with_suffix(".bak"))
-        combined_df.to_csv(links_path, sep="\t", index=False)
-        total_new = sum(len(x) for x in new_links)
-        print(f"✅ Updated aacr_links.tsv with {total_new} new entries")
-
-    if processed_path.exists():
-        processed_path.rename(processed_path.with_suffix(".bak"))
-    processed_df.to_csv(processed_path, sep="\t", index=False)
-    print(f"📌 Checkpoint saved to {processed_path}")
-
-    if processed_df["processed"].all():
+            outcome = failures.classify_exception(e)
+            print(f"❌ Failed to fetch page {page_num} of {session_name} ({outcome}): {e}")
+            if failures.RETRY_POLICIES[outcome].recycle_driver and driver is not None:
+                driver = restart_driver(service, options, label=f"{outcome}, session={session_name}, page={page_num}",
+                                        driver=driver, profile_slot="links")
+        finally:
+            BREAKER.record(url, outcome)
+            THROTTLE.release(url, outcome if failures.is_pushback(outcome) else None)
+
+    remaining = state.pages_remaining()
+    if own_state:
+        state.close()
+    elif not remaining:
+        state.flush()
+
+    if not remaining:
         finished_path.touch()
         print(f"✅ All pages have been processed. Flag file created: {finished_path}")
     else:
-        remaining = (~processed_df["processed"]).sum()
         print(f"ℹ️ {remaining} pages remaining unprocessed.")
 
-    driver.quit()
+    if driver is not None:
+        driver.quit()
 
-def get_abstracts(service, options, paths, max_pages=100, save_html=False):
-    links_path = paths["aacr_links"]
-    abstracts_path = paths["aacr_abstracts"]
-    finished_flag = paths["get_abstracts_finished"]
+def admit_load(url, wait=True):
+    """
+    Circuit breaker and throttle before one page load. With wait=False (a TabPipeline
+    with other tabs still loading) it only takes a slot that is free right now.
+    """
+    if not wait and BREAKER.remaining(url) > 0:
+        return False
+    BREAKER.wait(url)
+    return THROTTLE.acquire(url, block=wait)
 
-    if not links_path.exists():
-        print(f"❌ {links_path} not found.")
-        return
 
-    links_df = pd.read_csv(links_path, sep="\t")
-    pending = links_df[links_df["retrieved"] == False]
-    print(f"🔎 {len(pending)} abstracts pending retrieval.")
+def settle_load(url, outcome):
+    """Report a load's outcome class to the circuit breaker and the throttle."""
+    BREAKER.record(url, outcome)
+    THROTTLE.release(url, outcome if failures.is_pushback(outcome) else None)
 
-    if pending.empty:
-        finished_flag.touch()
-        print(f"✅ All abstracts retrieved. Flag file created: {finished_flag}")
-        return
 
-    if abstracts_path.exists():
-        abstracts_df = pd.read_csv(abstracts_path, sep="\t")
-    else:
-        abstracts_df = pd.DataFrame(columns=["link", "title", "session", "authors", "abstract", "status"])
+def tab_outcome(driver, error):
+    """Outcome class of a tab load that raised, from the exception and the failure markers in the page."""
+    try:
+        markers = page_markers(driver)
+    except Exception:
+        markers = ""
+    return failures.classify_failure(error, markers)
 
-    new_rows = []
+
+def make_driver_pool(service, options, size=1, max_pages=25, max_age=600, slot_prefix="pool"):
+    return DriverPool(lambda slot: setup_driver(service, options, f"{slot_prefix}-{slot}"), size=size,
+                      max_pages=max_pages, max_age=max_age, debug=DEBUG)
+
+def abstract_outcome(row, html=""):
+    abstract = str(row["abstract"])
+    return failures.classify_page(html, has_content=abstract not in ("", "N/A", "nan"),
+                                  embargoed=abstract.lower().startswith("abstract is embargoed"))
+
+
+def failed_row(link, title, session, outcome):
+    """A 404 is final (status not_found, not fetched again); anything else stays pending as 'retry'."""
+    row = retry_row(link, title, session)
+    if outcome == failures.NOT_FOUND:
+        row["status"] = "not_found"
+    return row
+
+
+def retry_row(link, title, session):
+    return {
+        "link": link,
+        "title": title,
+        "session": session,
+        "authors": "",
+        "abstract": "",
+        "status": "retry"
+    }
+
+def parse_abstract_html(html, link, title, session):
+    """Authors and abstract from a rendered presentation page's HTML, as an aacr_abstracts row."""
+    # Readiness already waited for the abstract text to settle; embargoed stays embargoed
+    authors, abstract = extraction.aacr_presentation(html)
+    return {
+        "link": link,
+        "title": title,
+        "session": session,
+        "authors": authors,
+        "abstract": abstract,
+        "status": "complete"
+    }
+
+
+# The parse_abstract_html walk, run in the page: same dl/dt/dd rules, and text joined like
+# get_text(strip=True) (trimmed non-empty text nodes, no script/style). Only the fields come
+# back over the WebDriver wire, plus which failure markers the page contains when it has no
+# abstract, and the <dl> markup when the page cache wants a copy.
+PRESENTATION_SCRIPT = """
+const markers = arguments[0], withHtml = arguments[1];
+const skip = new Set(['SCRIPT', 'STYLE', 'TEMPLATE']);
+const text = (node, sep) => {
+    const parts = [];
+    const walker = document.createTreeWalker(node, NodeFilter.SHOW_TEXT);
+    while (walker.nextNode()) {
+        const t = walker.currentNode;
+        if (skip.has(t.parentNode.nodeName)) continue;
+        const s = t.nodeValue.trim();
+        if (s) parts.push(s);
+    }
+    return parts.join(sep);
+};
+let authors = 'N/A', abstract = 'N/A';
+const dls = [...document.querySelectorAll('dl')];
+for (const dl of dls) {
+    const dts = dl.querySelectorAll('dt'), dds = dl.querySelectorAll('dd');
+    for (let i = 0; i < Math.min(dts.length, dds.length); i++) {
+        const label = text(dts[i], '').toLowerCase();
+        if (label.includes('presenter') || label.includes('author')) {
+            authors = text(dds[i], ' ');
+        } else if (label.includes('abstract')) {
+            abstract = text(dds[i], ' ');
+            break;
+        }
+    }
+    if (abstract && abstract !== 'N/A') break;
+}
+let found = [];
+if (!abstract || abstract === 'N/A') {
+    const html = document.documentElement.outerHTML;
+    found = markers.filter(m => html.includes(m));
+}
+return {
+    authors: authors,
+    abstract: abstract,
+    markers: found,
+    dl_html: withHtml ? dls.filter(dl => !dl.parentElement.closest('dl')).map(dl => dl.outerHTML).join('\\n') : null
+};
+"""
+
+FAILURE_MARKERS = list(failures.CHALLENGE_MARKERS + failures.NOT_FOUND_MARKERS)
+
+
+def page_markers(driver):
+    """The failure markers in the loaded page, joined; enough for failures.classify_page without the page source."""
+    return " ".join(driver.execute_script(
+        "const html = document.documentElement.outerHTML; return arguments[0].filter(m => html.includes(m));",
+        FAILURE_MARKERS))
+
+
+def extract_abstract_row(driver, idx, link, title, session, paths, save_html=False):
+    """
+    Extract authors and abstract from the presentation page currently loaded in `driver`,
+    in the page itself (PRESENTATION_SCRIPT). Returns (row, outcome class); the page source
+    is only pulled over the wire for save_html.
+    """
+    readiness.wait_ready(driver, "aacr_presentation", debug=DEBUG)
+    fields = driver.execute_script(PRESENTATION_SCRIPT, FAILURE_MARKERS, PAGE_CACHE is not None)
+
+    row = {
+        "link": link,
+        "title": title,
+        "session": session,
+        "authors": fields["authors"],
+        "abstract": fields["abstract"],
+        "status": "complete"
+    }
+    outcome = abstract_outcome(row, " ".join(fields["markers"]))
+    if DEBUG:
+        print(f"[DEBUG] Extracted in page ({outcome}): {len(row['authors'])} chars of authors, "
+              f"abstract preview {row['abstract'][:50]!r}")
+
+    if save_html:
+        fallback_file = paths["output"] / f"abstract_fallback_{idx + 1}.html"
+        with open(fallback_file, "w", encoding="utf-8") as f:
+            f.write(driver.page_source)
+        if DEBUG:
+            print(f"[DEBUG] Saved HTML for abstract page to {fallback_file}")
+
+    if PAGE_CACHE is not None and outcome in (failures.OK, failures.EMBARGOED):
+        # The <dl> lists are all parse_abstract_html reads, so --reparse works on them as on a full page
+        PAGE_CACHE.put(link, fields["dl_html"], "aacr_presentation")
+
+    return row, outcome
+
+
+def cached_abstract_row(link, title, session):
+    """
+    Row from a fresh cached copy of the presentation page (see --cache-max-age), or None.
+    Embargoed copies are not served, so the page is fetched again once it may have lifted.
+    """
+    if PAGE_CACHE is None:
+        return None
+    html = PAGE_CACHE.fresh(link, "aacr_presentation")
+    if html is None:
+        return None
+    row = parse_abstract_html(html, link, title, session)
+    return row if abstract_outcome(row, html) == failures.OK else None
+
+
+def fetch_abstract(pool, idx, link, title, session, paths, save_html=False):
+    """
+    Load one presentation page with a pooled driver and return its row for aacr_abstracts.tsv.
+    Failures are classified and retried per failures.RETRY_POLICIES with jittered backoff.
+    """
+    row = cached_abstract_row(link, title, session)
+    if row is not None:
+        print(f"💾 Abstract {idx + 1} served from the page cache: {link}")
+        return row
+    print(f"🧲 Fetching abstract {idx + 1} for link: {link}")
+    attempt = 0
+    while True:
+        attempt += 1
+        BREAKER.wait(link)
+        THROTTLE.acquire(link)
+        row, outcome = fetch_abstract_once(pool, idx, link, title, session, paths, save_html)
+        BREAKER.record(link, outcome)
+        THROTTLE.release(link, outcome if failures.is_pushback(outcome) else None)
+        if not failures.should_retry(outcome, attempt):
+            return row
+        delay = failures.backoff_delay(outcome, attempt)
+        print(f"🔁 {outcome} for {link}; retry {attempt} in {delay:.1f} sec")
+        time.sleep(delay)
+
+
+def fetch_abstract_once(pool, idx, link, title, session, paths, save_html=False):
+    """One attempt at a presentation page: returns (row, outcome class)."""
+    pooled = None
+    failed = False
+    driver = None
+    try:
+        pooled = pool.acquire()
+        driver = pooled.driver
+        capture = NetworkCapture(driver, debug=DEBUG) if CAPTURE_NETWORK else None
+        if capture:
+            capture.reset()
+        success = navigate(driver, link, "dl")
+        if not success:
+            raise TimeoutException("Page load failed")
+
+        if capture:
+            # Take the presentation record from the app's XHR as soon as it lands
+            _, record = capture.wait_for(aol.PRESENTATION_URL_PATTERN, timeout=30)
+            if record is not None:
+                row = aol.presentation_to_row(record, link, title, session)
+                outcome = abstract_outcome(row)
+                if outcome not in (failures.OK, failures.EMBARGOED):
+                    # Same rule as fetch_abstract_api: a record without an abstract stays pending
+                    print(f"⚠️ No abstract in the captured record for {title} ({outcome})")
+                    return failed_row(link, title, session, outcome), outcome
+                if PAGE_CACHE is not None:
+                    PAGE_CACHE.put(link, json.dumps(record), "aacr_presentation_json")
+                return row, outcome
+            print(f"⚠️ No presentation response captured for {link}; falling back to DOM scrape.")
+
+        row, outcome = extract_abstract_row(driver, idx, link, title, session, paths, save_html)
+        if outcome == failures.CHALLENGE:
+            failed = True  # a challenged browser is not worth keeping
+        return (row if outcome in (failures.OK, failures.EMBARGOED) else failed_row(link, title, session, outcome)), outcome
+
+    except Exception as e:
+        failed = True
+        try:
+            markers = page_markers(driver) if driver is not None else ""
+        except Exception:
+            markers = ""
+        outcome = failures.classify_failure(e, markers)
+        print(f"❌ Failed to fetch abstract for {title} ({outcome}): {e}")
+        return failed_row(link, title, session, outcome), outcome
+
+    finally:
+        if pooled is not None:
+            pool.release(pooled, failed=failed)
+
+
+def fetch_abstract_api(client, idx, link, title, session):
+    """API counterpart of fetch_abstract, returning the same row shape and status values."""
+    cached = PAGE_CACHE.fresh(link, "aacr_presentation_json") if PAGE_CACHE is not None else None
+    if cached is not None:
+        row = aol.presentation_to_row(json.loads(cached), link, title, session)
+        if abstract_outcome(row) == failures.OK:
+            print(f"💾 Abstract {idx + 1} served from the page cache: {link}")
+            return row
+    print(f"🧲 Fetching abstract {idx + 1} via API for link: {link}")
+    BREAKER.wait(link)
+    THROTTLE.acquire(link)
+    try:
+        record = client.presentation(aol.presentation_id_from_link(link))
+        row = aol.presentation_to_row(record, link, title, session)
+        outcome = abstract_outcome(row)
+        if outcome in (failures.OK, failures.EMBARGOED):
+            if PAGE_CACHE is not None:
+                PAGE_CACHE.put(link, json.dumps(record), "aacr_presentation_json")
+        else:
+            # A record without an abstract stays pending, as an empty rendered page does
+            print(f"⚠️ No abstract in the API record for {title} ({outcome})")
+            row = failed_row(link, title, session, outcome)
+    except Exception as e:
+        outcome = failures.classify_exception(e)
+        print(f"❌ Failed to fetch abstract for {title} ({outcome}): {e}")
+        row = failed_row(link, title, session, outcome)
+    BREAKER.record(link, outcome)
+    THROTTLE.release(link, outcome if failures.is_pushback(outcome) else None)
+    return row
+
+
+def abstract_worker(worker_id, driver_path, task_queue, result_queue, paths, settings):
+    """
+    Worker process for --workers: owns its own driver pool, pulls (idx, link, title, session)
+    tasks until it sees None, and sends rows back to the single writer in the parent.
+    """
+    global DEBUG, CAPTURE_NETWORK, HASH_NAV, BLOCK_PATTERNS, PROFILE_DIR, CACHE_SIZE_MB, THROTTLE, BREAKER, PAGE_CACHE
+    DEBUG = settings.get("debug", False)
+    BLOCK_PATTERNS = settings.get("block_patterns", BLOCK_PATTERNS)
+    PROFILE_DIR = settings.get("profile_dir")
+    CACHE_SIZE_MB = settings.get("cache_size_mb", CACHE_SIZE_MB)
+    CAPTURE_NETWORK = settings.get("capture_network", False)
+    extraction.set_backend(settings.get("html_backend"))
+    HASH_NAV = settings.get("hash_nav", False)
+    THROTTLE = AIMDController(**settings.get("throttle", {}), debug=DEBUG)
+    BREAKER = CircuitBreaker(**settings.get("breaker", {}))
+    if settings.get("page_cache"):
+        PAGE_CACHE = PageCache(**settings["page_cache"])
+    fetched = 0
     start_time = time.time()
+    pool = None
+    try:
+        pool = make_driver_pool(Service(driver_path), get_chrome_options(), slot_prefix=f"worker{worker_id}",
+                                **settings.get("pool", {}))
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            idx, link, title, session = task
+            row = fetch_abstract(pool, idx, link, title, session, paths, save_html=settings.get("save_html", False))
+            result_queue.put(("row", worker_id, row))
+            fetched += 1
+    except Exception as e:
+        print(f"❌ Worker {worker_id} stopped: {e}")
+    finally:
+        if pool is not None:
+            pool.close()
+        if PAGE_CACHE is not None:
+            PAGE_CACHE.close()
+        result_queue.put(("done", worker_id, {"fetched": fetched, "elapsed": time.time() - start_time,
+                                              "readiness": dict(readiness.STATS.samples)}))
 
-    for idx, row in pending.head(max_pages).iterrows():
-        link = row["link"]
-        title = row["title"]
-        session = row["session"]
 
-        print(f"🧲 Fetching abstract {idx + 1} for link: {link}")
+def fetch_abstracts_parallel(service, batch, paths, workers, pool_settings=None, save_html=False, on_row=None):
+    """
+    Fan `batch` out to worker processes over a shared queue. Each row is handed to
+    `on_row` as it arrives (or collected and returned if there is no callback).
+    """
+    ctx = multiprocessing.get_context("spawn")
+    task_queue = ctx.Queue()
+    result_queue = ctx.Queue()
+    for idx, row in batch.iterrows():
+        task_queue.put((idx, row["link"], row["title"], row["session"]))
+    workers = max(1, min(workers, len(batch)))
+    for _ in range(workers):
+        task_queue.put(None)
+
+    settings = {"debug": DEBUG, "capture_network": CAPTURE_NETWORK, "hash_nav": HASH_NAV, "block_patterns": BLOCK_PATTERNS,
+                "profile_dir": PROFILE_DIR, "cache_size_mb": CACHE_SIZE_MB,
+                # Workers pace themselves, so each gets 1/N of the rate and trips after 1/N of the failures
+                "throttle": THROTTLE.share(workers), "breaker": BREAKER.share(workers),
+                "pool": pool_settings or {}, "save_html": save_html, "html_backend": extraction.BACKEND,
+                "page_cache": PAGE_CACHE and {"root": str(PAGE_CACHE.root), "max_mb": PAGE_CACHE.max_bytes / 1024 / 1024,
+                                              "max_age": PAGE_CACHE.max_age}}
+    procs = [
+        ctx.Process(target=abstract_worker, args=(w, service.path, task_queue, result_queue, paths, settings), daemon=True)
+        for w in range(workers)
+    ]
+    for proc in procs:
+        proc.start()
+    print(f"👷 Started {workers} abstract workers for {len(batch)} links.")
 
+    new_rows = []
+    received = 0
+    worker_stats = {}
+    while len(worker_stats) < workers:
         try:
-            driver = setup_driver(service, options)
-            success = safe_get(driver, link)
-            if not success:
-                raise Exception("Page load failed")
+            kind, worker_id, payload = result_queue.get(timeout=5)
+        except queue.Empty:
+            if not any(proc.is_alive() for proc in procs):
+                print("⚠️ All workers exited before reporting; unfinished links stay pending.")
+                break
+            continue
+        if kind == "row":
+            received += 1
+            if on_row is not None:
+                on_row(payload)
+            else:
+                new_rows.append(payload)
+            print(f"📥 Worker {worker_id}: {payload['status']} — {payload['link']} ({received}/{len(batch)})")
+        else:
+            worker_stats[worker_id] = payload
+            readiness.STATS.merge(payload.get("readiness", {}))
 
-            WebDriverWait(driver, 30).until(
-                EC.presence_of_element_located((By.XPATH, "//dt[contains(text(),'Abstract')]"))
-            )
-            time.sleep(6)  # Let the page stabilize
+    for proc in procs:
+        proc.join(timeout=30)
 
-            if DEBUG:
-                print("[DEBUG] Length of page source:", len(driver.page_source))
-                print("[DEBUG] Preview snippet:", driver.page_source[:500])
-
-            soup = BeautifulSoup(driver.page_source, "html.parser")
-
-            authors = "N/A"
-            abstract = "N/A"
-
-            for dl_tag in soup.find_all("dl"):
-                dt_tags = dl_tag.find_all("dt")
-                dd_tags = dl_tag.find_all("dd")
-
-                for dt, dd in zip(dt_tags, dd_tags):
-                    label = dt.get_text(strip=True).lower()
-                    if "presenter" in label or "author" in label:
-                        authors = dd.get_text(separator=" ", strip=True)
-                    elif "abstract" in label:
-                        attempts = 0
-                        while attempts < 10:
-                            abstract = dd.get_text(separator=" ", strip=True)
-                            if abstract and not abstract.lower().startswith("abstract is embargoed"):
-                                break
-                            time.sleep(1)
-                            attempts += 1
-                        if DEBUG:
-                            print(f"[DEBUG] Abstract preview after polling: {abstract[:50]!r}")
-                        break
-                if abstract and abstract != "N/A":
-                    break
-
-            new_rows.append({
-                "link": link,
-                "title": title,
-                "session": session,
-                "authors": authors,
-                "abstract": abstract,
-                "status": "complete"
-            })
-            links_df.loc[links_df["link"] == link, "retrieved"] = True
-
-            if save_html:
-                fallback_file = paths["output"] / f"abstract_fallback_{idx + 1}.html"
-                with open(fallback_file, "w", encoding="utf-8") as f:
-                    f.write(driver.page_source)
-                if DEBUG:
-                    print(f"[DEBUG] Saved HTML for abstract page to {fallback_file}")
+    print("📊 Per-worker throughput:")
+    for worker_id in sorted(worker_stats):
+        stats = worker_stats[worker_id]
+        per_min = stats["fetched"] / stats["elapsed"] * 60 if stats["elapsed"] else 0
+        print(f"   worker {worker_id}: {stats['fetched']} abstracts in {stats['elapsed']:.0f} sec ({per_min:.1f}/min)")
 
-        except Exception as e:
-            print(f"❌ Failed to fetch abstract for {title}: {e}")
-            new_rows.append({
-                "link": link,
-                "title": title,
-                "session": session,
-                "authors": "",
-                "abstract": "",
-                "status": "retry"
-            })
+    return new_rows
+
+
+def fetch_abstracts_tabbed(pool, batch, paths, tabs, save_html=False, on_row=None):
+    """
+    Fetch `batch` through several tabs of one pooled driver, overlapping loads with
+    extraction. Rows go to `on_row` as they are extracted, or are collected and returned.
+    Failures are retried per failures.RETRY_POLICIES in further rounds, each after the
+    longest backoff among its items and, if a policy asks for it, with a fresh driver.
+    """
+    items = []
+    new_rows = []
+
+    def emit(row):
+        if on_row is not None:
+            on_row(row)
+        else:
+            new_rows.append(row)
 
+    for idx, row in batch.iterrows():
+        cached = cached_abstract_row(row["link"], row["title"], row["session"])
+        if cached is None:
+            items.append((idx, row["link"], row["title"], row["session"]))
+            continue
+        print(f"💾 Abstract {idx + 1} served from the page cache: {row['link']}")
+        emit(cached)
+
+    attempts = {}
+    while items:
+        retry, delay = [], 0.0
+        pooled = pool.acquire()
+        failed = False
+        try:
+            pipeline = TabPipeline(pooled.driver, tabs=tabs, content_selector="dl")
+            extract = lambda driver, item: extract_abstract_row(driver, *item, paths, save_html)
+            admit = lambda item, wait: admit_load(item[1], wait)
+            for item, result, error in pipeline.run(items, lambda item: item[1], extract, admit):
+                idx, link, title, session = item
+                print(f"🧲 Fetched abstract {idx + 1} in tab for link: {link}")
+                if error is not None:
+                    outcome = tab_outcome(pooled.driver, error)
+                    print(f"❌ Failed to fetch abstract for {title} ({outcome}): {error.__class__.__name__} {error}")
+                    row = None
+                else:
+                    row, outcome = result
+                # Same rules as fetch_abstract: 404s are final, a challenged browser is recycled
+                if outcome not in (failures.OK, failures.EMBARGOED):
+                    row = failed_row(link, title, session, outcome)
+                if failures.RETRY_POLICIES[outcome].recycle_driver:
+                    failed = True
+                settle_load(link, outcome)
+                attempts[item] = attempts.get(item, 0) + 1
+                if failures.should_retry(outcome, attempts[item]):
+                    retry.append(item)
+                    delay = max(delay, failures.backoff_delay(outcome, attempts[item]))
+                    continue
+                emit(row)
+            pipeline.close()
+        except Exception as e:
+            failed = True
+            print(f"❌ Tab pipeline failed: {e}")
+            # Anything not fetched yet stays pending and is picked up by the next call
+            retry = []
         finally:
-            driver.quit()
-            time.sleep(random.uniform(2, 4))
+            pool.release(pooled, failed=failed)
+        items = retry
+        if items:
+            print(f"🔁 Retrying {len(items)} abstract(s) in tabs in {delay:.1f} sec")
+            time.sleep(delay)
+    return new_rows
+
+
+def get_abstracts(service, options, paths, max_pages=100, save_html=False, pool=None, workers=1, pool_settings=None, client=None, tabs=1, state=None):
+    finished_flag = paths["get_abstracts_finished"]
+
+    if state is None and not STORE.exists("aacr_links"):
+        print(f"❌ {STORE.describe('aacr_links')} not found.")
+        return
+    own_state = state is None
+    if own_state:
+        state = BuildState(STORE, paths["state_journal"])
+
+    pending_count = state.links_remaining()
+    print(f"🔎 {pending_count} abstracts pending retrieval.")
+
+    if not pending_count:
+        if own_state:
+            state.close()
+        else:
+            state.flush()
+        finished_flag.touch()
+        print(f"✅ All abstracts retrieved. Flag file created: {finished_flag}")
+        return
+
+    start_time = time.time()
+    batch = state.pending_links(max_pages)
+    fetched = 0
+
+    def on_row(row):
+        # Journaled as it arrives, so a crash mid-batch keeps every abstract fetched so far
+        nonlocal fetched
+        state.record_abstract(row)
+        state.maybe_flush()
+        fetched += 1
+
+    if client is not None:
+        for idx, row in batch.iterrows():
+            on_row(fetch_abstract_api(client, idx, row["link"], row["title"], row["session"]))
+    elif workers > 1:
+        # Workers only fetch; this process is the single writer for the journal and store
+        fetch_abstracts_parallel(service, batch, paths, workers, pool_settings, save_html, on_row=on_row)
+    else:
+        own_pool = pool is None
+        if own_pool:
+            pool = make_driver_pool(service, options, **(pool_settings or {}))
+
+        if tabs > 1:
+            fetch_abstracts_tabbed(pool, batch, paths, tabs, save_html, on_row=on_row)
+        else:
+            for idx, row in batch.iterrows():
+                on_row(fetch_abstract(pool, idx, row["link"], row["title"], row["session"], paths, save_html))
+
+        if own_pool:
+            pool.close()
+
+    remaining = state.links_remaining()
 
     elapsed_time = time.time() - start_time
-    if new_rows:
-        avg_time = elapsed_time / len(new_rows)
-        remaining = links_df["retrieved"].value_counts().get(False, 0)
+    if fetched:
+        avg_time = elapsed_time / fetched
         est_total = int(avg_time * remaining)
         est_min, est_sec = divmod(est_total, 60)
         print(f"⏳ Avg time/abstract: {avg_time:.1f} sec — Estimated time remaining: {est_min} min {est_sec} sec")
 
-    if new_rows:
-        updated_df = pd.DataFrame(new_rows)
-        if abstracts_path.exists():
-            abstracts_path.rename(abstracts_path.with_suffix(".bak"))
-            abstracts_df = pd.concat([abstracts_df, updated_df], ignore_index=True)
-            abstracts_df["abstract_length"] = abstracts_df["abstract"].fillna("").apply(len)
-            abstracts_df = abstracts_df.sort_values(["link", "abstract_length"], ascending=[True, False])
-            if DEBUG:
-                concat_path = abstracts_path.parent / "aacr_abstracts_concat.tsv"
-                abstracts_df.to_csv(concat_path, sep="\t", index=False)
-                print(f"[DEBUG] Intermediate concatenated file saved to {concat_path}")
-            abstracts_df = abstracts_df.drop_duplicates(subset=["link"], keep="first")
-            abstracts_df.drop(columns=["abstract_length"], inplace=True)
-        else:
-            abstracts_df = updated_df
-
-    abstracts_df.to_csv(abstracts_path, sep="\t", index=False)
-    print(f"📄 Abstracts updated and saved to {abstracts_path}")
-    print(f"✅ {len(new_rows)} abstracts processed.")    
+    print(f"✅ {fetched} abstracts processed.")    
 
-    links_path.rename(links_path.with_suffix(".bak"))
-    links_df.to_csv(links_path, sep="\t", index=False)
-    print(f"📌 Updated aacr_links.tsv with retrieval status.")
+    if own_state:
+        state.close()
+    elif not remaining:
+        state.flush()
 
-    if links_df["retrieved"].all():
+    if not remaining:
         finished_flag.touch()
         print(f"✅ All abstracts have been retrieved. Flag file created: {finished_flag}")
 
 
-def reset_processed_sessions(paths, session_list):
-    processed_path = paths["processed_pages"]
+def reparse_abstract_page(body, page, context):
+    """--reparse worker: a cached presentation (rendered HTML or JSON record) back into (row, outcome)."""
+    title, session = context
+    if page.kind == "aacr_presentation_json":
+        row = aol.presentation_to_row(json.loads(body), page.url, title, session)
+        return row, abstract_outcome(row)
+    row = parse_abstract_html(body, page.url, title, session)
+    return row, abstract_outcome(row, body)
+
+
+def reparse_abstracts(workers=None, dry_run=False):
+    """
+    Rebuild aacr_abstracts offline: the latest cached copy of every known presentation goes
+    back through parse_abstract_html (or presentation_to_row for JSON) in a process pool.
+    """
+    if PAGE_CACHE is None:
+        print("❌ --reparse reads the page cache, which is disabled (--page-cache-mb 0).")
+        return
+    if not STORE.exists("aacr_links"):
+        print(f"❌ {STORE.describe('aacr_links')} not found.")
+        return
+    links = STORE.read("aacr_links", columns=["link", "title", "session"])
+    context = dict(zip(links["link"], zip(links["title"], links["session"])))
+    items = [(page, context[page.url]) for page in PAGE_CACHE.entries()
+             if page.kind in ("aacr_presentation", "aacr_presentation_json") and page.url in context]
+    print(f"🔎 Re-parsing {len(items)} cached presentation pages...")
+    if not items:
+        return
+
+    results = reparse(PAGE_CACHE, items, reparse_abstract_page, workers,
+                      initializer=extraction.set_backend, initargs=(extraction.BACKEND,))
+    rows = [result[0] for _, result in results
+            if result is not None and result[1] in (failures.OK, failures.EMBARGOED)]
+    if len(rows) < len(items):
+        print(f"⚠️ {len(items) - len(rows)} cached page(s) no longer parse to an abstract; their rows are left as they are.")
+    if not rows:
+        return
+
+    new = pd.DataFrame(rows).set_index("link")
+    current = STORE.read("aacr_abstracts").set_index("link")
+    common = new.index.intersection(current.index)
+    # The latest cached copy can be older than the stored row (an embargo notice since replaced
+    # by the full text): a reparse may rewrite a row with an equal or better one, never a worse one
+    worse = common[rank_rows("aacr_abstracts", new.loc[common]).to_numpy()
+                   < rank_rows("aacr_abstracts", current.loc[common]).to_numpy()]
+    if len(worse):
+        print(f"⏭️ Keeping {len(worse)} stored abstract(s) that are better than their cached page.")
+        new, common = new.drop(worse), common.difference(worse)
+    if dry_run:
+        columns = ["title", "authors", "abstract", "status"]
+        changed = (new.loc[common, columns].fillna("N/A").astype(str)
+                   != current.loc[common, columns].fillna("N/A").astype(str)).any(axis=1).sum()
+        print(f"📝 Dry run: {len(new) - len(common)} new and {changed} changed abstract(s) — nothing written.")
+        return
+    if new.empty:
+        return
+    new = new.reset_index()
+    STORE.upsert("aacr_abstracts", new, keep="new")
+    STORE.update("aacr_links", new["link"].tolist(), retrieved=True)
+    print(f"✅ Rebuilt {len(new)} abstracts in {STORE.describe('aacr_abstracts')} from the page cache.")
+
+
+def reset_processed_sessions(paths, session_list, dry_run=False):
     links_finished_flag = paths["get_links_finished"]
     abstracts_finished_flag = paths["get_abstracts_finished"]
     
-    if not processed_path.exists():
-        print(f"⚠️ {processed_path} does not exist. Nothing to reset.")
+    if not STORE.exists("processed_pages"):
+        print(f"⚠️ {STORE.describe('processed_pages')} does not exist. Nothing to reset.")
         return
     
-    df = pd.read_csv(processed_path, sep="\t")
-    original_processed = df["processed"].sum()
+    df = STORE.read("processed_pages", columns=["session", "page", "processed"])
 
     if session_list.strip().lower() == "all":
-        df["processed"] = False
-        print("🔄 Reset 'processed' flag for all sessions.")
+        target_sessions = None
+        matched_sessions = pd.Series(True, index=df.index)
     else:
         target_sessions = [s.strip() for s in session_list.split(",")]
         matched_sessions = df["session"].isin(target_sessions)
         if not matched_sessions.any():
             print(f"⚠️ No matching sessions found for: {target_sessions}")
             return
-        df.loc[matched_sessions, "processed"] = False
-        print(f"🔄 Reset 'processed' flag for sessions: {', '.join(target_sessions)}")
 
-    # Backup and save updated file
-    processed_path.rename(processed_path.with_suffix(".bak"))
-    df.to_csv(processed_path, sep="\t", index=False)
-    print(f"📁 Changes saved to {processed_path}")
+    # Only pages that are currently processed actually change
+    to_reset = df.loc[matched_sessions & (df["processed"] == True), ["session", "page"]]
+    label = "all sessions" if target_sessions is None else f"sessions: {', '.join(target_sessions)}"
+    if dry_run:
+        print(f"🔍 Dry run: would reset 'processed' on {len(to_reset)} of {int(matched_sessions.sum())} page(s) for {label}")
+        return
+
+    reset = STORE.update("processed_pages", list(to_reset.itertuples(index=False, name=None)), processed=False)
+    print(f"🔄 Reset 'processed' flag on {reset} page(s) for {label}")
+    print(f"📁 Changes saved to {STORE.describe('processed_pages')}")
 
     # Remove GET_LINKS_FINISHED and GET_ABSTRACTS_FINISHED flag if we reset any rows
-    if df["processed"].sum() < original_processed:
+    if reset:
         if links_finished_flag.exists():
             links_finished_flag.unlink()
             print(f"❌ Removed {links_finished_flag} because some sessions were reset.")
@@ -590,84 +1294,87 @@ def reset_processed_sessions(paths, session_list):
             print(f"❌ Removed {abstracts_finished_flag} because some sessions were reset.")
 
 
-def sync_links_with_abstracts(paths):
-    links_path = paths["aacr_links"]
-    abstracts_path = paths["aacr_abstracts"]
-
-    if not links_path.exists() or not abstracts_path.exists():
+def sync_links_with_abstracts(paths, dry_run=False):
+    if not STORE.exists("aacr_links") or not STORE.exists("aacr_abstracts"):
         print("❌ Required file not found.")
         return
 
     # Load both tables
-    links_df = pd.read_csv(links_path, sep="\t")
-    abstracts_df = pd.read_csv(abstracts_path, sep="\t")
+    links_df = STORE.read("aacr_links", columns=["link", "retrieved"])
+    abstracts_df = STORE.read("aacr_abstracts", columns=["link"])
+
+    # `retrieved` should be exactly "has a row in abstracts": one hash join, then only the
+    # rows that disagree are written
+    present = links_df["link"].isin(abstracts_df["link"])
+    current = links_df["retrieved"] == True
+    to_set = links_df.loc[present & ~current, "link"].tolist()
+    to_clear = links_df.loc[~present & current, "link"].tolist()
+
+    if dry_run:
+        print(f"🔍 Dry run: would set retrieved=True on {len(to_set)} and retrieved=False on {len(to_clear)} "
+              f"of {len(links_df)} link(s)")
+        return
 
-    # Convert links to sets for efficient lookup
-    abstract_links_set = set(abstracts_df["link"])
+    # One write for both directions
+    STORE.update("aacr_links", to_set + to_clear, retrieved=[True] * len(to_set) + [False] * len(to_clear))
+    print(f"🔁 Synced links with abstracts ({len(to_set)} set, {len(to_clear)} cleared). "
+          f"Updated file saved to {STORE.describe('aacr_links')}")
 
-    # Update `retrieved` flag based on presence in abstracts
-    links_df["retrieved"] = links_df["link"].apply(lambda l: l in abstract_links_set)
 
-    # Backup and save
-    links_path.rename(links_path.with_suffix(".bak"))
-    links_df.to_csv(links_path, sep="\t", index=False)
-    print(f"🔁 Synced links with abstracts. Updated file saved to {links_path}")
+def refetch_links(abstracts_df, include_blank=False):
+    """Links whose stored abstract is an embargo notice (and optionally blank or missing)."""
+    abstract = abstracts_df["abstract"]
+    mask = abstract.str.contains("embargoed", case=False, na=False)
+    if include_blank:
+        mask |= abstract.fillna("").astype(str).str.strip() == ""
+    return abstracts_df.loc[mask, "link"].unique()
 
 
-def reset_embargoed_abstracts(paths, reset_blank=False):
+def reset_retrieved_links(include_blank=False, dry_run=False):
     """
-    Resets 'retrieved' to False in the links table for:
-    - abstracts containing the word 'embargoed'
-    - optionally, abstracts that are blank or missing.
-    Also removes the GET_ABSTRACTS_FINISHED flag if any updates occur.
+    Set retrieved=False on links whose abstract needs re-fetching, as one set-based update.
+    Like the old per-link loop, every matching link is reset and counted, whatever its
+    current flag. Returns that count (what a dry run would reset), or None if there was
+    nothing to do.
     """
-    abstracts_path = paths["aacr_abstracts"]
-    links_path = paths["aacr_links"]
-    abstracts_finished_flag = paths["get_abstracts_finished"]
-
-    if not abstracts_path.exists():
-        print(f"❌ Abstracts file not found: {abstracts_path}")
-        return
-    if not links_path.exists():
-        print(f"❌ Links file not found: {links_path}")
-        return
-
-    abstracts_df = pd.read_csv(abstracts_path, sep="\t")
-    links_df = pd.read_csv(links_path, sep="\t")
-
-    embargoed_links = abstracts_df[
-        abstracts_df["abstract"].str.contains("embargoed", case=False, na=False)
-    ]["link"].tolist()
+    if not STORE.exists("aacr_abstracts"):
+        print(f"❌ Abstracts file not found: {STORE.describe('aacr_abstracts')}")
+        return None
+    if not STORE.exists("aacr_links"):
+        print(f"❌ Links file not found: {STORE.describe('aacr_links')}")
+        return None
+
+    reset_links = refetch_links(STORE.read("aacr_abstracts", columns=["link", "abstract"]), include_blank)
+    if not len(reset_links):
+        print("ℹ️ No embargoed or missing abstracts found.")
+        return None
 
-    missing_links = []
-    if reset_blank:
-        missing_links = abstracts_df[
-            abstracts_df["abstract"].isnull() | (abstracts_df["abstract"].str.strip() == "")
-        ]["link"].tolist()
+    links_df = STORE.read("aacr_links", columns=["link"])
+    to_reset = links_df.loc[links_df["link"].isin(reset_links), "link"].unique().tolist()
 
-    all_reset_links = set(embargoed_links + missing_links)
+    if dry_run:
+        print(f"🔍 Dry run: {len(reset_links)} abstract(s) need re-fetching; would reset retrieved=False on "
+              f"{len(to_reset)} link(s) in {STORE.describe('aacr_links')}")
+        return len(to_reset)
 
-    if not all_reset_links:
-        print("ℹ️ No embargoed or missing abstracts found.")
-        return
+    STORE.update("aacr_links", to_reset, retrieved=False)
+    print(f"🔁 Reset retrieved=False for {len(to_reset)} abstract(s) in {STORE.describe('aacr_links')}")
+    return len(to_reset)
 
-    # Backup links file
-    links_backup = links_path.with_suffix(".bak")
-    links_path.rename(links_backup)
 
-    # Reset retrieved flag
-    updated = 0
-    for link in all_reset_links:
-        match = links_df["link"] == link
-        if match.any():
-            links_df.loc[match, "retrieved"] = False
-            updated += 1
+def reset_embargoed_abstracts(paths, reset_blank=False, dry_run=False):
+    """
+    Resets 'retrieved' to False in the links table for:
+    - abstracts containing the word 'embargoed'
+    - optionally, abstracts that are blank or missing.
+    Also removes the GET_ABSTRACTS_FINISHED flag if any updates occur.
+    """
+    abstracts_finished_flag = paths["get_abstracts_finished"]
 
-    links_df.to_csv(links_path, sep="\t", index=False)
-    print(f"🔁 Reset retrieved=False for {updated} abstract(s). Backup saved as: {links_backup}")
+    updated = reset_retrieved_links(include_blank=reset_blank, dry_run=dry_run)
 
     # Remove GET_ABSTRACTS_FINISHED if we reset anything
-    if updated > 0 and abstracts_finished_flag.exists():
+    if updated and not dry_run and abstracts_finished_flag.exists():
         abstracts_finished_flag.unlink()
         print(f"❌ Removed {abstracts_finished_flag} because abstracts need to be re-fetched.")
 
@@ -680,49 +1387,8 @@ def reset_embargoed_abstracts_x(paths, reset_missing=False):
     - abstracts containing the word 'embargoed'
     - optionally, abstracts that are blank or missing
     """
-    abstracts_path = paths["aacr_abstracts"]
-    links_path = paths["aacr_links"]
-
-    if not abstracts_path.exists():
-        print(f"❌ Abstracts file not found: {abstracts_path}")
-        return
-    if not links_path.exists():
-        print(f"❌ Links file not found: {links_path}")
-        return
-
-    abstracts_df = pd.read_csv(abstracts_path, sep="\t")
-    links_df = pd.read_csv(links_path, sep="\t")
-
-    embargoed_links = abstracts_df[
-        abstracts_df["abstract"].str.contains("embargoed", case=False, na=False)
-    ]["link"].tolist()
-
-    missing_links = []
-    if reset_missing:
-        missing_links = abstracts_df[
-            abstracts_df["abstract"].isnull() | (abstracts_df["abstract"].str.strip() == "")
-        ]["link"].tolist()
-
-    all_reset_links = set(embargoed_links + missing_links)
-
-    if not all_reset_links:
-        print("ℹ️ No embargoed or missing abstracts found.")
-        return
-
-    # Backup links file
-    links_backup = links_path.with_suffix(".bak")
-    links_path.rename(links_backup)
-
-    # Reset retrieved flag
-    updated = 0
-    for link in all_reset_links:
-        match = links_df["link"] == link
-        if match.any():
-            links_df.loc[match, "retrieved"] = False
-            updated += 1
 
-    links_df.to_csv(links_path, sep="\t", index=False)
-    print(f"🔁 Reset retrieved=False for {updated} abstract(s). Backup saved as: {links_backup}")
+    reset_retrieved_links(include_blank=reset_missing)
 
 
 
@@ -742,6 +1408,37 @@ def main():
     parser.add_argument("--check-abstract-retrieval", action="store_true", help="Sync retrieved status in aacr_links.tsv with presence in aacr_abstracts.tsv")
     parser.add_argument("--reset-embargoed-abstracts", action="store_true", help="Reset retrieved=False for abstracts marked as embargoed")
     parser.add_argument("--reset-embargoed-and-blank-abstracts", action="store_true", help="Reset retrieved status for embargoed or blank abstracts")
+    parser.add_argument("--dry-run", action="store_true", help="With a reset/check command or --reparse, only report how many rows it would change")
+    parser.add_argument("--reparse", action="store_true", help="Rebuild aacr_abstracts from the page cache with the current parser (no browser or network), then exit")
+    parser.add_argument("--html-backend", choices=["auto", *extraction.BACKENDS], default="auto", help="Parser for extracting abstracts from page HTML; 'auto' picks the fastest installed (selectolax, then lxml, then html.parser)")
+    parser.add_argument("--reparse-workers", type=int, default=None, help="Processes used by --reparse (default: one per CPU)")
+    parser.add_argument("--flush-every", type=int, default=500, help="In --build-all, write queued state changes after this many records")
+    parser.add_argument("--flush-interval", type=float, default=60, help="In --build-all, write queued state changes at least this often (seconds)")
+    parser.add_argument("--pool-size", type=int, default=1, help="Number of warm drivers kept for abstract fetching")
+    parser.add_argument("--driver-max-pages", type=int, default=25, help="Recycle a pooled driver after this many page loads")
+    parser.add_argument("--driver-max-age", type=int, default=600, help="Recycle a pooled driver after this many seconds")
+    parser.add_argument("--source", choices=["browser", "api"], default="browser", help="Fetch listings and presentations by rendering pp8 pages or from its JSON API")
+    parser.add_argument("--api-base", type=str, default=aol.API_BASE, help="Base URL of the abstractsonline data API (e.g. a local stand-in server)")
+    parser.add_argument("--capture-network", action="store_true", help="Harvest the pp8 app's JSON responses via Chrome DevTools instead of scraping the DOM")
+    parser.add_argument("--hash-nav", action="store_true", help="Boot the pp8 app once per driver and move between pages by changing location.hash")
+    parser.add_argument("--tabs", type=int, default=1, help="Pipeline page loads across this many tabs of one browser (get_links and get_abstracts)")
+    parser.add_argument("--block-profile", choices=sorted(BLOCK_PROFILES), default="abstractsonline", help="Request blocklist applied to every driver via DevTools (images, fonts, media, trackers; 'none' turns blocking off)")
+    parser.add_argument("--block-urls", type=str, default="", help="Comma-separated extra URL patterns to block, e.g. '*.mp4,*example.com*'")
+    parser.add_argument("--block-report", type=int, default=0, help="Load N sample pages with and without blocking, report bytes saved and load-time deltas, then exit")
+    parser.add_argument("--profile-dir", type=str, default=None, help="Persistent Chrome profile/disk-cache directory reused by every driver in the run (one slot per live driver)")
+    parser.add_argument("--cache-size-mb", type=int, default=512, help="Disk cache cap per profile slot, in MB")
+    parser.add_argument("--initial-delay", type=float, default=3.0, help="Starting delay between requests to a host; adapted up and down during the run (AIMD)")
+    parser.add_argument("--min-delay", type=float, default=0.5, help="Fastest pace the throttle may reach, in seconds between requests")
+    parser.add_argument("--max-delay", type=float, default=60.0, help="Slowest pace the throttle may back off to, in seconds between requests")
+    parser.add_argument("--breaker-threshold", type=int, default=5, help="Failures on one host within --breaker-window seconds that pause all requests to it")
+    parser.add_argument("--breaker-window", type=int, default=120, help="Window in seconds for counting failures towards the circuit breaker")
+    parser.add_argument("--breaker-cooldown", type=int, default=120, help="First pause in seconds once a host's circuit opens (doubles while it keeps failing)")
+    parser.add_argument("--store", choices=["tsv", "sqlite"], default="tsv", help="State backend: TSV files (every flush rewrites each changed table in full, so flushes slow down as tables grow), or one WAL-mode SQLite database (state.sqlite) seeded from existing TSVs that upserts only the changed rows")
+    parser.add_argument("--import-tsv", action="store_true", help="Load the TSV state files into state.sqlite (replacing its tables), then exit")
+    parser.add_argument("--export-tsv", action="store_true", help="Write every table of state.sqlite back to the TSV files, then exit")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes (each with its own browser) fetching abstracts")
+    parser.add_argument("--page-cache-mb", type=int, default=1024, help="Size cap of the compressed page cache (output/page_cache) in MB; 0 disables it")
+    parser.add_argument("--cache-max-age", type=float, default=None, help="Serve cached pages younger than this many seconds instead of fetching them (default: never serve, only record)")
     args = parser.parse_args()
 
     import datetime  
@@ -756,20 +1453,72 @@ def main():
         "https://www.abstractsonline.com/pp8/#!/20273/presentations/@sessiontype=Poster%20Session/1"
     ]
 
-    global DEBUG
+    global DEBUG, CAPTURE_NETWORK, HASH_NAV, BLOCK_PATTERNS, PROFILE_DIR, CACHE_SIZE_MB, THROTTLE, BREAKER
     DEBUG = args.debug
+    BREAKER = CircuitBreaker(threshold=args.breaker_threshold, window=args.breaker_window,
+                             cooldown=args.breaker_cooldown)
+    # --tabs K lets AIMD widen to K loads in flight; one tab means one page at a time
+    THROTTLE = AIMDController(initial_delay=args.initial_delay, min_delay=args.min_delay,
+                              max_delay=args.max_delay, max_concurrency=max(1, args.tabs), debug=DEBUG)
+    PROFILE_DIR = args.profile_dir
+    CACHE_SIZE_MB = args.cache_size_mb
+    if PROFILE_DIR:
+        enforce_profile_cap(PROFILE_DIR, CACHE_SIZE_MB)
+    BLOCK_PATTERNS = BLOCK_PROFILES[args.block_profile] + [p.strip() for p in args.block_urls.split(",") if p.strip()]
+    CAPTURE_NETWORK = args.capture_network
+    extraction.set_backend(args.html_backend)
+    HASH_NAV = args.hash_nav
     output_path = Path(args.output)
     output_path.mkdir(parents=True, exist_ok=True)
     global paths
     paths = set_output_paths(output_path)
 
     sys.stdout = TeeLogger(paths["log"])
-    service = Service(ChromeDriverManager().install())
+
+    global STORE, PAGE_CACHE
+    if args.page_cache_mb > 0:
+        PAGE_CACHE = PageCache(paths["page_cache"], max_mb=args.page_cache_mb, max_age=args.cache_max_age)
+    STORE = open_store(args.store, state_tsv_paths(paths), paths["state_db"])
+    # Results journaled by a run that crashed go in before anything reads or resets state
+    recover_journal(paths["state_journal"], STORE)
+    if args.import_tsv or args.export_tsv:
+        sqlite_store = STORE if STORE.kind == "sqlite" else open_store("sqlite", state_tsv_paths(paths), paths["state_db"])
+        tsv_store = TSVStore(state_tsv_paths(paths))
+        if args.import_tsv:
+            copy_tables(tsv_store, sqlite_store, STATE_TABLES)
+        else:
+            copy_tables(sqlite_store, tsv_store, STATE_TABLES)
+        sqlite_store.close()
+        return
+    if args.reparse:
+        reparse_abstracts(workers=args.reparse_workers, dry_run=args.dry_run)
+        STORE.close()
+        if PAGE_CACHE is not None:
+            PAGE_CACHE.close()
+        return
+    client = None
+    if args.source == "api":
+        # No browser on the hot path: skip the chromedriver download entirely
+        client = aol.AbstractsOnlineClient(base_url=args.api_base, debug=DEBUG)
+        service = None
+    else:
+        service = Service(ChromeDriverManager().install())
     options = get_chrome_options()
 
     start_time = datetime.datetime.now()
     print(f"🚀 Started AACR scraper at {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
 
+    if args.block_report:
+        sample_urls = session_urls[:1]
+        if STORE.exists("aacr_links"):
+            sample_urls += STORE.read("aacr_links")["link"].head(args.block_report - 1).tolist()
+        patterns = BLOCK_PATTERNS
+        BLOCK_PATTERNS = []  # compare_blocking applies the list itself
+        PROFILE_DIR = None  # a warm disk cache would hide the difference
+        report = compare_blocking(lambda: setup_driver(service, options), sample_urls[:args.block_report], patterns)
+        print_blocking_report(report)
+        return
+
     if args.test_landing_page:
         driver = setup_driver(service, options)
         test_landing_page(driver, session_urls[0], paths)
@@ -777,30 +1526,32 @@ def main():
         return
     
     if args.estimate:
-        estimate_all_sessions(session_urls, service, options, paths)
+        estimate_all_sessions(session_urls, service, options, paths, client=client)
         return
        
     if args.test_get_links:
-        get_links(session_urls, service, options, paths, max_pages=10)
+        get_links(session_urls, service, options, paths, max_pages=10, client=client, tabs=args.tabs)
+
+    pool_settings = dict(size=args.pool_size, max_pages=args.driver_max_pages, max_age=args.driver_max_age)
 
     if args.test_get_abstracts:
-        get_abstracts(service, options, paths, max_pages=1, save_html=True)
+        get_abstracts(service, options, paths, max_pages=1, save_html=True, client=client)
         return
 
     if args.reset_processed_sessions:
-        reset_processed_sessions(paths, args.reset_processed_sessions)
+        reset_processed_sessions(paths, args.reset_processed_sessions, dry_run=args.dry_run)
 
     if args.check_abstract_retrieval:
-        sync_links_with_abstracts(paths)
+        sync_links_with_abstracts(paths, dry_run=args.dry_run)
         return
     
     
     if args.reset_embargoed_and_blank_abstracts:
-        reset_embargoed_abstracts(paths, reset_blank=True)
+        reset_embargoed_abstracts(paths, reset_blank=True, dry_run=args.dry_run)
         return
 
     if args.reset_embargoed_abstracts:
-        reset_embargoed_abstracts(paths)
+        reset_embargoed_abstracts(paths, dry_run=args.dry_run)
         return
 
 
@@ -814,7 +1565,7 @@ def main():
         attempts = 0
         while not paths["session_estimates_ok"].exists() and attempts < 3:
             print(f"🚧 Running estimate_all_sessions (attempt {attempts + 1})...")
-            estimate_all_sessions(session_urls, service, options, paths)
+            estimate_all_sessions(session_urls, service, options, paths, client=client)
             attempts += 1
         if not paths["session_estimates_ok"].exists():
             print("❌ Failed to estimate all sessions after 3 attempts.")
@@ -822,29 +1573,46 @@ def main():
         else:
             print("✅ Session estimates OK — ready to get links.")
         
-        # get_links
-        calls = 0
-        while not paths["get_links_finished"].exists() and calls < max_calls:
-            print(f"🚧 Running get_links (attempt {calls + 1})...")
-            service = Service(ChromeDriverManager().install())
-            options = get_chrome_options()
-            get_links(session_urls, service, options, paths, max_pages=max_pages)
-            calls += 1
-            print(f"Sleeping for {wait} seconds")
-            time.sleep(wait)
-
-        if not paths["get_links_finished"].exists():
-            print("❌ get_links did not complete after maximum allowed attempts.")
-        else:
-            print("✅ Links have been retrieved from all session pages. Ready to retrieve abstracts.")
-        
-        # get abstracts
-        while not paths["get_abstracts_finished"].exists() and calls < max_calls:
-            print(f"🚧 Running get_abstracts (attempt {calls + 1})...")
-            get_abstracts(service, options, paths, max_pages=max_pages)
-            calls += 1
-            print(f"Sleeping for {wait} seconds")
-            time.sleep(wait)
+        # State is loaded once and flushed on a count/timer; the chromedriver Service from
+        # above is reused by every call
+        state = BuildState(STORE, paths["state_journal"], session_urls,
+                           flush_every=args.flush_every, flush_interval=args.flush_interval)
+        pool = None
+        try:
+            # get_links
+            calls = 0
+            while not paths["get_links_finished"].exists() and calls < max_calls:
+                print(f"🚧 Running get_links (attempt {calls + 1})...")
+                get_links(session_urls, service, options, paths, max_pages=max_pages, client=client, tabs=args.tabs,
+                          state=state)
+                calls += 1
+                print(f"Sleeping for {wait} seconds")
+                time.sleep(wait)
+
+            if not paths["get_links_finished"].exists():
+                print("❌ get_links did not complete after maximum allowed attempts.")
+            else:
+                print("✅ Links have been retrieved from all session pages. Ready to retrieve abstracts.")
+
+            # get abstracts, keeping the same warm drivers across calls
+            while not paths["get_abstracts_finished"].exists() and calls < max_calls:
+                print(f"🚧 Running get_abstracts (attempt {calls + 1})...")
+                if client is not None:
+                    get_abstracts(service, options, paths, max_pages=max_pages, client=client, state=state)
+                elif args.workers > 1:
+                    get_abstracts(service, options, paths, max_pages=max_pages,
+                                  workers=args.workers, pool_settings=pool_settings, state=state)
+                else:
+                    if pool is None:
+                        pool = make_driver_pool(service, options, **pool_settings)
+                    get_abstracts(service, options, paths, max_pages=max_pages, pool=pool, tabs=args.tabs, state=state)
+                calls += 1
+                print(f"Sleeping for {wait} seconds")
+                time.sleep(wait)
+        finally:
+            state.close()
+            if pool is not None:
+                pool.close()
 
         if not paths["get_abstracts_finished"].exists():
             print("❌ get_abstracts did not complete after maximum allowed attempts.")
@@ -857,6 +1625,15 @@ def main():
     
 
     # cleanup
+    if client is not None:
+        client.close()
+    STORE.close()
+    if PAGE_CACHE is not None:
+        PAGE_CACHE.report()
+        PAGE_CACHE.close()
+    readiness.STATS.report()
+    readiness.STATS.save(paths["readiness_latencies"])
+    THROTTLE.report()
     end_time = datetime.datetime.now()
     elapsed = end_time - start_time
     print(f"✅ Finished at {end_time.strftime('%Y-%m-%d %H:%M:%S')} (Elapsed time: {elapsed})")
@@ -0,0 +1,147 @@
+"""
+Client for the JSON endpoints behind the abstractsonline.com pp8 app.
+
+The pp8 single-page app renders session listings and presentation pages from these
+endpoints; calling them directly gives the same records without a browser. Endpoint
+paths are templates relative to `base_url` so a local stand-in server can serve
+recorded JSON instead of the live site.
+"""
+import re
+import time
+from urllib.parse import unquote
+
+import httpx
+from bs4 import BeautifulSoup
+
+import failures
+
+API_BASE = "https://www.abstractsonline.com/oe3/Program"
+MEETING_ID = "20273"
+PRESENTATION_URL = "https://www.abstractsonline.com/pp8/#!/{meeting}/presentation/{presentation_id}"
+
+SEARCH_PATH = "/{meeting}/Search/New/presentations"
+RESULTS_PATH = "/{meeting}/Search/{search_id}/Results"
+PRESENTATION_PATH = "/{meeting}/Presentation/{presentation_id}"
+
+# The same endpoints as seen in the browser's network traffic (see devtools.NetworkCapture)
+RESULTS_URL_PATTERN = r"/Search/[^/]+/Results"
+PRESENTATION_URL_PATTERN = r"/Presentation/[^/?]+"
+
+
+def _field(record, *names, default=""):
+    """Return the first non-empty value among `names`, ignoring key case."""
+    lowered = {str(k).lower(): v for k, v in record.items()}
+    for name in names:
+        value = lowered.get(name.lower())
+        if value not in (None, ""):
+            return value
+    return default
+
+
+def _text(value):
+    if isinstance(value, list):
+        value = ", ".join(str(v) for v in value)
+    value = str(value)
+    if "<" in value:
+        value = BeautifulSoup(value, "html.parser").get_text(separator=" ", strip=True)
+    value = re.sub(r"\s+", " ", value)
+    return re.sub(r" ([,;.])", r"\1", value).strip()
+
+
+def filter_from_session_url(url):
+    """'.../presentations/@sessiontype=Minisymposium/1' -> '@sessiontype=Minisymposium'"""
+    match = re.search(r"/(@[^/]+)/\d+$", url)
+    return unquote(match.group(1)) if match else ""
+
+
+def presentation_id_from_link(link):
+    return link.rstrip("/").split("/")[-1]
+
+
+class AbstractsOnlineClient:
+    def __init__(self, base_url=API_BASE, meeting_id=MEETING_ID, timeout=30, retries=3, client=None, debug=False):
+        self.base_url = base_url.rstrip("/")
+        self.meeting_id = meeting_id
+        self.retries = retries
+        self.debug = debug
+        self.client = client or httpx.Client(timeout=timeout, follow_redirects=True,
+                                             headers={"Accept": "application/json"})
+        self._search_ids = {}
+
+    def _url(self, template, **kwargs):
+        return self.base_url + template.format(meeting=self.meeting_id, **kwargs)
+
+    def _request(self, method, url, **kwargs):
+        for attempt in range(1, self.retries + 1):
+            try:
+                response = self.client.request(method, url, **kwargs)
+                response.raise_for_status()
+                if self.debug:
+                    print(f"[DEBUG] {method} {url} -> {response.status_code}")
+                return response.json()
+            except (httpx.HTTPError, ValueError) as e:
+                outcome = failures.classify_exception(e)
+                print(f"⚠️ API {method} {url} failed on attempt {attempt} ({outcome}): {e}")
+                if attempt == self.retries or not failures.should_retry(outcome, attempt):
+                    raise
+                time.sleep(failures.backoff_delay(outcome, attempt))
+
+    def search(self, filter_expr):
+        """Create (or reuse) a server-side search for a session filter and return its id."""
+        if filter_expr not in self._search_ids:
+            data = self._request("POST", self._url(SEARCH_PATH), json={"Filter": filter_expr})
+            search_id = data if isinstance(data, (str, int)) else _field(data, "SearchId", "Id")
+            self._search_ids[filter_expr] = str(search_id)
+        return self._search_ids[filter_expr]
+
+    def results(self, filter_expr, page, page_size=10):
+        """Return (total, records) for one page of a session listing."""
+        search_id = self.search(filter_expr)
+        data = self._request("GET", self._url(RESULTS_PATH, search_id=search_id),
+                             params={"page": page, "pagesize": page_size})
+        return parse_results(data)
+
+    def presentation(self, presentation_id):
+        return self._request("GET", self._url(PRESENTATION_PATH, presentation_id=presentation_id))
+
+    def close(self):
+        self.client.close()
+
+
+def parse_results(data):
+    """Return (total, records) from a listing response body."""
+    if isinstance(data, list):
+        return len(data), data
+    records = _field(data, "Results", "Items", "Presentations", default=[])
+    total = int(_field(data, "Total", "TotalCount", "Count", default=len(records)))
+    return total, records
+
+
+def listing_to_links(records, session_name, meeting_id=MEETING_ID):
+    """Map listing records to rows shaped like aacr_links.tsv (same link format as the browser path)."""
+    rows = []
+    for record in records:
+        presentation_id = _field(record, "Id", "PresentationId")
+        title = _text(_field(record, "Title"))
+        if presentation_id and title:
+            rows.append({
+                "link": PRESENTATION_URL.format(meeting=meeting_id, presentation_id=presentation_id),
+                "title": title,
+                "retrieved": False,
+                "session": session_name,
+            })
+    return rows
+
+
+def presentation_to_row(record, link, title, session):
+    """Map a presentation record to a row shaped like aacr_abstracts.tsv."""
+    authors = _text(_field(record, "AuthorBlock", "Authors", "Presenter", "PresenterDisplayName", default="N/A"))
+    abstract = _text(_field(record, "Abstract", "AbstractBody", "Body", default="N/A"))
+    return {
+        "link": link,
+        "title": _text(_field(record, "Title", default=title)),
+        "session": session,
+        "authors": authors or "N/A",
+        "abstract": abstract or "N/A",
+        "status": "complete",
+    }
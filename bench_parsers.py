@@ -0,0 +1,209 @@
+"""
+Offline micro-benchmarks for the extraction layer (extraction.py), built on the ex_html fixtures.
+
+Cases:
+- sitc_listing: the rendered SITC titles page as saved, and replicated to --scale entries
+- sitc_abstract: the DOI challenge page (no abstract div) and the same page with a synthetic
+  abstract of several subsections, per HTML backend
+- aacr_dl: a rendered-size presentation page (the SITC page as filler around the <dl> lists),
+  per HTML backend
+
+Each case runs in its own process, so peak RSS belongs to that case alone. The report shows
+ops/sec (best of several timed rounds), the Python allocation peak of one call (tracemalloc)
+and peak RSS, both overall and above what building the fixture took. --save-baseline stores
+the results. Later runs are compared against them, and the exit status is 1 if a case is
+slower or allocates more than --threshold allows.
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import re
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+try:
+    import resource
+except ModuleNotFoundError:  # Windows: fall back to psutil's current RSS
+    resource = None
+
+import psutil
+
+import extraction
+
+FIXTURES = Path(__file__).resolve().parent / "ex_html"
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "ex_output" / "parser_bench_baseline.json"
+
+
+def listing_page(scale=None):
+    """The saved SITC titles page; with `scale`, its hits are replicated (with distinct DOIs) to `scale` entries."""
+    page = (FIXTURES / "sitc_page_source.html").read_text(encoding="utf-8")
+    if not scale:
+        return page
+    start = page.find('<li class="ais-Hits-item">')
+    stop = page.rfind("</li></ol>") + len("</li>")
+    items = re.findall(r'<li class="ais-Hits-item">.*?</li>', page[start:stop], re.DOTALL)
+    hits = "".join(items[i % len(items)].replace("SITC2024.", f"SITC2024.{i}") for i in range(scale))
+    return page[:start] + hits + page[stop:]
+
+
+def doi_page(with_abstract=False):
+    """The saved DOI challenge page; with `with_abstract`, a JITC-style abstract div is inserted into its body."""
+    page = (FIXTURES / "debug_doi_page_0.html").read_text(encoding="utf-8")
+    if not with_abstract:
+        return page
+    subsections = "".join(
+        f'<div class="subsection"><p><strong>{name}</strong> ' + f"{name} text with <em>markup</em> and numbers {i}. " * 12 + "</p></div>"
+        for i, name in enumerate(["Background", "Methods", "Results", "Conclusions", "Ethics Approval"])
+    )
+    body = page.find("<body")
+    body = page.find(">", body) + 1 if body >= 0 else 0
+    return page[:body] + f'<div class="section abstract"><h2>Abstract</h2>{subsections}</div>' + page[body:]
+
+
+def presentation_page():
+    """A rendered-size pp8 presentation page: filler markup around the <dl> lists the scraper reads."""
+    filler = listing_page()
+    dls = (
+        "<dl><dt>Session Title</dt><dd>Poster Session</dd><dt>Location</dt><dd>Hall A</dd></dl>"
+        "<dl><dt>Presenter/Authors</dt><dd>" + ", ".join(f"<span>Author {i}</span><sup>{i % 4 + 1}</sup>" for i in range(25)) + "</dd>"
+        "<dt>Disclosures</dt><dd>None</dd>"
+        "<dt>Abstract</dt><dd>" + "<p><b>Background:</b> Abstract text with <i>markup</i>. </p>" * 40 + "</dd></dl>"
+    )
+    cut = filler.find("<div", len(filler) // 2)
+    return filler[:cut] + dls + filler[cut:]
+
+
+def cases(scale):
+    """name -> (fixture builder, function, args); builders run in the case's own process."""
+    table = {
+        "sitc_listing/page": (listing_page, lambda html: list(extraction.sitc_listing(html)), ()),
+        f"sitc_listing/{scale}": (listing_page, lambda html: list(extraction.sitc_listing(html)), (scale,)),
+    }
+    for backend in extraction.BACKENDS:
+        if not extraction.available(backend):
+            continue
+        table[f"sitc_abstract/challenge/{backend}"] = (doi_page, extraction.sitc_abstract, (), backend)
+        table[f"sitc_abstract/synthetic/{backend}"] = (doi_page, extraction.sitc_abstract, (True,), backend)
+        table[f"aacr_dl/synthetic/{backend}"] = (presentation_page, extraction.aacr_presentation, (), backend)
+    return table
+
+
+def _peak_rss_mb():
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KB on Linux
+    return psutil.Process().memory_info().rss / 1024 / 1024
+
+
+def run_case(name, scale, min_time, rounds):
+    """Time one case in this process; meant to run in a fresh process per case."""
+    builder, func, args, *backend = cases(scale)[name]
+    html = builder(*args)
+    fixture_rss = _peak_rss_mb()
+    call = (lambda: func(html, backend[0])) if backend else (lambda: func(html))
+    call()  # warm up (imports, regex compilation)
+
+    number = 1
+    while True:  # calls per round so that a round takes about min_time
+        start = time.perf_counter()
+        for _ in range(number):
+            call()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+    best = elapsed / number
+    for _ in range(rounds - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            call()
+        best = min(best, (time.perf_counter() - start) / number)
+
+    tracemalloc.start()
+    call()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    peak_rss = _peak_rss_mb()
+    return {"ops_per_sec": 1 / best, "ms_per_op": best * 1000, "alloc_peak_kb": peak / 1024,
+            "peak_rss_mb": peak_rss, "run_rss_mb": peak_rss - fixture_rss, "input_kb": len(html) / 1024}
+
+
+def _run_case(args):
+    return run_case(*args)
+
+
+def compare(results, baseline, threshold):
+    """Names of cases that got slower, or whose allocation peak grew, by more than `threshold` (a fraction)."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        slower = result["ops_per_sec"] < base["ops_per_sec"] * (1 - threshold)
+        heavier = result["alloc_peak_kb"] > base["alloc_peak_kb"] * (1 + threshold)
+        if slower or heavier:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the HTML extraction functions")
+    parser.add_argument("--scale", type=int, default=10000, help="Entries in the replicated SITC listing fixture")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Seconds per timed round")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed rounds per case; the best one is reported")
+    parser.add_argument("--only", type=str, default="", help="Only run cases whose name contains this text")
+    parser.add_argument("--baseline", type=str, default=str(DEFAULT_BASELINE), help="Baseline JSON to compare against / save to")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run's results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Flag a case slower, or with a higher allocation peak, than the baseline by more than this fraction")
+    args = parser.parse_args()
+
+    names = [name for name in cases(args.scale) if args.only in name]
+    print(f"⏱️ Running {len(names)} extraction benchmark(s) offline, one process each "
+          f"(backends: {', '.join(b for b in extraction.BACKENDS if extraction.available(b))})")
+
+    results = {}
+    ctx = multiprocessing.get_context("spawn")
+    for name in names:
+        # A fresh process per case, so ru_maxrss is that case's own peak
+        with ctx.Pool(1) as pool:
+            results[name] = pool.apply(_run_case, ((name, args.scale, args.min_time, args.rounds),))
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text())["results"] if baseline_path.exists() else {}
+
+    print(f"\n{'case':36s} {'ops/sec':>10s} {'ms/op':>9s} {'alloc peak':>11s} {'peak RSS':>9s} {'+run':>7s} {'vs base':>8s}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        change = f"{result['ops_per_sec'] / base['ops_per_sec'] - 1:+.0%}" if base else "new"
+        print(f"{name:36s} {result['ops_per_sec']:10.1f} {result['ms_per_op']:9.2f} "
+              f"{result['alloc_peak_kb']:8.0f} KB {result['peak_rss_mb']:6.0f} MB {result['run_rss_mb']:4.0f} MB {change:>8s}")
+
+    regressions = compare(results, baseline, args.threshold)
+    for name in regressions:
+        base, result = baseline[name], results[name]
+        print(f"🐢 Regression in {name}: {base['ops_per_sec']:.1f} -> {result['ops_per_sec']:.1f} ops/sec, "
+              f"alloc peak {base['alloc_peak_kb']:.0f} -> {result['alloc_peak_kb']:.0f} KB")
+
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        saved = {**baseline, **results}
+        baseline_path.write_text(json.dumps({"python": platform.python_version(), "machine": platform.platform(),
+                                             "saved_at": time.strftime("%Y-%m-%d %H:%M:%S"), "results": saved}, indent=2))
+        print(f"💾 Baseline saved to {baseline_path}")
+    elif not baseline:
+        print(f"ℹ️ No baseline at {baseline_path}; run with --save-baseline to create one.")
+
+    if regressions:
+        print(f"❌ {len(regressions)} case(s) regressed by more than {args.threshold:.0%}.")
+        if not args.save_baseline:
+            sys.exit(1)
+    elif baseline:
+        print(f"✅ No regressions beyond {args.threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
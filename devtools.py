@@ -0,0 +1,152 @@
+"""
+Chrome DevTools helpers shared by the scrapers.
+
+NetworkCapture reads the chromedriver performance log to harvest JSON response bodies
+the page receives (e.g. the pp8 app's XHRs), so records can be taken straight from
+the wire instead of scraped from the rendered DOM.
+"""
+import re
+import json
+import time
+import base64
+
+
+def enable_performance_logging(options):
+    """Ask chromedriver to record Network.* DevTools events in the 'performance' log."""
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+
+class NetworkCapture:
+    def __init__(self, driver, debug=False):
+        self.driver = driver
+        self.debug = debug
+        self._responses = {}  # requestId -> url for JSON responses not yet finished
+
+    def _events(self):
+        for entry in self.driver.get_log("performance"):
+            try:
+                yield json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+
+    def reset(self):
+        """Drop events from earlier navigations so wait_for only sees the next page's traffic."""
+        self.driver.get_log("performance")
+        self._responses.clear()
+
+    def _body(self, request_id):
+        result = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        body = result.get("body", "")
+        if result.get("base64Encoded"):
+            body = base64.b64decode(body).decode("utf-8", errors="replace")
+        return json.loads(body)
+
+    def wait_for(self, url_pattern, timeout=30, poll=0.25):
+        """
+        Return (url, parsed_json) for the first JSON response whose URL matches `url_pattern`
+        once it has finished loading, or (None, None) on timeout.
+        """
+        pattern = re.compile(url_pattern)
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            for event in self._events():
+                method, params = event.get("method"), event.get("params", {})
+                if method == "Network.responseReceived":
+                    response = params.get("response", {})
+                    if "json" in response.get("mimeType", "") and pattern.search(response.get("url", "")):
+                        self._responses[params["requestId"]] = response["url"]
+                elif method == "Network.loadingFinished" and params.get("requestId") in self._responses:
+                    url = self._responses.pop(params["requestId"])
+                    try:
+                        data = self._body(params["requestId"])
+                    except Exception as e:
+                        print(f"⚠️ Could not read captured response body for {url}: {e}")
+                        continue
+                    if self.debug:
+                        print(f"[DEBUG] Captured JSON response from {url}")
+                    return url, data
+            time.sleep(poll)
+        return None, None
+
+
+# Stylesheets stay: hiding rules (display: none) change what innerText returns, which the
+# DOM extraction relies on. Each extension also matches with a query string (logo.png?v=3).
+_ASSETS = [pattern for ext in ("png", "jpg", "jpeg", "gif", "webp", "svg", "ico",
+                               "woff", "woff2", "ttf", "otf", "eot", "mp4", "webm")
+           for pattern in (f"*.{ext}", f"*.{ext}?*")]
+_TRACKERS = ["*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+             "*facebook.net*", "*facebook.com/tr*", "*hotjar.com*", "*linkedin.com/px*",
+             "*ads-twitter.com*", "*scorecardresearch.com*", "*newrelic.com*", "*nr-data.net*"]
+
+# Network.setBlockedURLs patterns per site. Scripts the pages need (the pp8 Angular
+# bundle, Algolia InstantSearch, Cloudflare's challenge) are deliberately left alone.
+BLOCK_PROFILES = {
+    "none": [],
+    "abstractsonline": _ASSETS + _TRACKERS,
+    "sitc": _ASSETS + _TRACKERS + ["*trendmd.com*", "*altmetric.com*", "*addthis.com*",
+                                   "*crossmark*", "*adobedtm.com*", "*omtrdc.net*"],
+}
+
+
+def apply_request_blocking(driver, patterns):
+    """Block matching requests for every page this driver loads from now on (an empty list clears the blocklist)."""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+
+
+def page_metrics(driver):
+    """Bytes transferred, request count and load time (ms) of the page currently loaded, from the Performance API."""
+    return driver.execute_script("""
+        const nav = performance.getEntriesByType('navigation')[0] || {};
+        const resources = performance.getEntriesByType('resource');
+        const bytes = resources.reduce((sum, r) => sum + (r.transferSize || 0), nav.transferSize || 0);
+        const loaded = nav.loadEventEnd || nav.domContentLoadedEventEnd || performance.now();
+        return {bytes: bytes, requests: resources.length + 1, load_ms: Math.round(loaded)};
+    """)
+
+
+def compare_blocking(make_driver, urls, patterns, settle=3):
+    """
+    Load each URL once without blocking and once with `patterns` blocked (fresh driver each
+    pass so caches don't skew the result) and return per-URL metrics for a fetch report.
+    """
+    report = []
+    for label, blocked in (("unblocked", []), ("blocked", patterns)):
+        driver = make_driver()
+        try:
+            apply_request_blocking(driver, blocked)
+            for url in urls:
+                try:
+                    driver.get(url)
+                    time.sleep(settle)
+                    metrics = page_metrics(driver)
+                except Exception as e:
+                    print(f"⚠️ Could not measure {url} ({label}): {e}")
+                    continue
+                metrics.update({"url": url, "mode": label})
+                report.append(metrics)
+        finally:
+            driver.quit()
+    return report
+
+
+def print_blocking_report(report):
+    by_url = {}
+    for row in report:
+        by_url.setdefault(row["url"], {})[row["mode"]] = row
+    print("📉 Request blocking report")
+    saved_total, delta_total, n = 0, 0, 0
+    for url, modes in by_url.items():
+        if "unblocked" not in modes or "blocked" not in modes:
+            continue
+        before, after = modes["unblocked"], modes["blocked"]
+        saved = before["bytes"] - after["bytes"]
+        delta = after["load_ms"] - before["load_ms"]
+        saved_total += saved
+        delta_total += delta
+        n += 1
+        print(f"   {url}\n      {before['bytes'] >> 10} KB → {after['bytes'] >> 10} KB (saved {saved >> 10} KB), "
+              f"{before['requests']} → {after['requests']} requests, load {before['load_ms']} → {after['load_ms']} ms ({delta:+d} ms)")
+    if n:
+        print(f"   Average: saved {(saved_total // n) >> 10} KB/page, load-time delta {delta_total // n:+d} ms/page over {n} page(s)")
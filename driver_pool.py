@@ -0,0 +1,276 @@
+import copy
+import time
+import queue
+import shutil
+import threading
+import contextlib
+import collections
+from pathlib import Path
+
+import readiness
+
+
+def persistent_profile_options(options, profile_dir, slot, cache_size_mb=512):
+    """
+    Copy of `options` that runs Chrome from a persistent profile under `profile_dir`, so the
+    HTTP disk cache (JS bundles, fonts, CSS) survives driver restarts. Chrome locks a profile
+    while it runs, so every concurrently live driver needs its own `slot` directory.
+    """
+    options = copy.deepcopy(options)
+    if "--incognito" in options.arguments:
+        # Incognito keeps the cache in memory only
+        options.arguments.remove("--incognito")
+    slot_dir = Path(profile_dir).resolve() / f"slot-{slot}"
+    slot_dir.mkdir(parents=True, exist_ok=True)
+    options.add_argument(f"--user-data-dir={slot_dir}")
+    options.add_argument(f"--disk-cache-size={cache_size_mb * 1024 * 1024}")
+    return options
+
+
+def _dir_size(path):
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def enforce_profile_cap(profile_dir, cache_size_mb=512):
+    """
+    Chrome caps the HTTP cache itself via --disk-cache-size; this also bounds the rest of
+    the profile. Any slot larger than twice the cache cap has its caches cleared before the run.
+    """
+    profile_dir = Path(profile_dir)
+    if not profile_dir.exists():
+        return
+    cap = cache_size_mb * 1024 * 1024 * 2
+    for slot_dir in sorted(profile_dir.glob("slot-*")):
+        size = _dir_size(slot_dir)
+        if size <= cap:
+            continue
+        for cache_dir in list(slot_dir.rglob("Cache")) + list(slot_dir.rglob("Code Cache")):
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        print(f"🧹 Cleared caches in {slot_dir} ({size >> 20} MB > {cap >> 20} MB cap)")
+
+
+class PooledDriver:
+    """A driver handed out by DriverPool, with the bookkeeping used to decide when to recycle it."""
+
+    def __init__(self, driver, slot):
+        self.driver = driver
+        self.slot = slot
+        self.created = time.time()
+        self.pages = 0
+
+    @property
+    def age(self):
+        return time.time() - self.created
+
+
+class DriverPool:
+    """
+    Keeps `size` warm, stealth-configured drivers so that abstract fetching does not pay a
+    Chrome cold start per link. A driver is recycled (quit and replaced) after `max_pages`
+    page loads, once it is older than `max_age` seconds, or as soon as a fetch using it fails.
+
+    `factory` is called with the slot number and returns a ready driver, e.g.
+    `lambda slot: setup_driver(service, options)`, so both scrapers can share the pool.
+    A recycled driver is restarted in the same slot, so a persistent per-slot profile
+    (see persistent_profile_options) keeps its cache across restarts.
+    """
+
+    def __init__(self, factory, size=1, max_pages=25, max_age=600, debug=False):
+        self.factory = factory
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.max_age = max_age
+        self.debug = debug
+        self.started = 0
+        self.recycled = 0
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        for slot in range(self.size):
+            self._idle.put(self._start(slot))
+        print(f"🏊 Driver pool ready with {self.size} warm driver(s).")
+
+    def _start(self, slot):
+        driver = self.factory(slot)
+        with self._lock:
+            self.started += 1
+        if self.debug:
+            print(f"[DEBUG] Started driver for pool slot {slot}")
+        return PooledDriver(driver, slot)
+
+    def _retire(self, pooled, reason):
+        if pooled.driver is None:
+            return
+        if self.debug:
+            print(f"[DEBUG] Recycling driver in slot {pooled.slot} ({reason}, {pooled.pages} pages, {pooled.age:.0f}s old)")
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            print(f"⚠️ Failed to quit pooled driver cleanly: {e}")
+        with self._lock:
+            self.recycled += 1
+
+    def _recycle_reason(self, pooled, failed=False):
+        if failed:
+            return "failure"
+        if self.max_pages and pooled.pages >= self.max_pages:
+            return "page limit"
+        if self.max_age and pooled.age >= self.max_age:
+            return "age limit"
+        return None
+
+    def acquire(self, timeout=None):
+        if self._closed:
+            raise RuntimeError("DriverPool is closed")
+        pooled = self._idle.get(timeout=timeout)
+        try:
+            if pooled.driver is None:
+                pooled = self._start(pooled.slot)
+            # A driver can outlive max_age while sitting idle between batches
+            reason = self._recycle_reason(pooled)
+            if reason:
+                self._retire(pooled, reason)
+                pooled = self._start(pooled.slot)
+        except Exception:
+            self._idle.put(PooledDriver(None, pooled.slot))
+            raise
+        return pooled
+
+    def release(self, pooled, failed=False):
+        pooled.pages += 1
+        reason = self._recycle_reason(pooled, failed)
+        if reason and not self._closed:
+            self._retire(pooled, reason)
+            try:
+                pooled = self._start(pooled.slot)
+            except Exception as e:
+                # Keep the slot alive; the next acquire retries the start
+                print(f"⚠️ Could not restart driver for slot {pooled.slot}: {e}")
+                pooled = PooledDriver(None, pooled.slot)
+        if self._closed:
+            self._retire(pooled, "pool closed")
+            return
+        self._idle.put(pooled)
+
+    @contextlib.contextmanager
+    def driver(self, timeout=None):
+        """Check out a driver; any exception raised inside the block recycles it."""
+        pooled = self.acquire(timeout=timeout)
+        failed = False
+        try:
+            yield pooled.driver
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.release(pooled, failed=failed)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._retire(pooled, "pool closed")
+        print(f"🏁 Driver pool closed ({self.started} started, {self.recycled} recycled).")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TabPipeline:
+    """
+    Drives `tabs` tabs of a single browser so page N+1 is loading while page N is
+    extracted. Loads are started without blocking (`location.href = url`) and results
+    come back in submission order, each extracted in the tab that loaded it.
+    """
+
+    def __init__(self, driver, tabs=2, content_selector=None, timeout=30):
+        """
+        A new URL that differs only after '#' is a fragment change: the tab keeps the previous
+        load's DOM until the app re-renders. With `content_selector` (e.g. 'dl'), the matching
+        elements are stamped before each load and extraction waits up to `timeout` seconds for
+        fresh ones, reloading the tab if they never come.
+        """
+        self.driver = driver
+        self.content_selector = content_selector
+        self.timeout = timeout
+        self._before = {}  # handle -> text of the elements stamped before its current load
+        self.handles = [driver.current_window_handle]
+        for _ in range(max(1, tabs) - 1):
+            driver.switch_to.new_window("tab")
+            self.handles.append(driver.current_window_handle)
+        driver.switch_to.window(self.handles[0])
+
+    def _start(self, handle, url):
+        self.driver.switch_to.window(handle)
+        if self.content_selector:
+            self._before[handle] = readiness.mark_stale(self.driver, self.content_selector)
+        self.driver.execute_script("window.location.href = arguments[0];", url)
+
+    def _wait_fresh(self, handle):
+        """With the tab current: wait until its load has replaced the stamped content, else reload it."""
+        if not self.content_selector:
+            return
+        try:
+            readiness.wait_fresh(self.driver, self.content_selector, self._before.pop(handle, ""), self.timeout)
+        except readiness.ReadinessTimeout:
+            print(f"⚠️ Tab never rendered fresh {self.content_selector!r} content; reloading it.")
+            self.driver.refresh()
+
+    def run(self, items, url_of, extract, admit=None):
+        """
+        For each item, load url_of(item) in a free tab and yield (item, result, error) in
+        submission order, where result = extract(driver, item) once the item's tab is current.
+        A load that fails to start is yielded with its error in its own turn.
+
+        `admit(item, wait)`, if given, runs before each load starts (e.g. the breaker and
+        throttle). With wait=False, other tabs are still loading and it may return False to
+        hold the item back until a later turn; with wait=True it has to block until the item
+        may go. Idle tabs are refilled once the consumer asks for the next result, so whatever
+        it does with a result (e.g. releasing a throttle slot) happens before the next load.
+        """
+        pending = collections.deque(items)
+        inflight = collections.deque()
+        idle = list(self.handles)
+
+        def fill():
+            while idle and pending:
+                if admit is not None and not admit(pending[0], wait=not inflight):
+                    return
+                item = pending.popleft()
+                handle = idle.pop(0)
+                try:
+                    self._start(handle, url_of(item))
+                    inflight.append((handle, item, None))
+                except Exception as e:
+                    inflight.append((handle, item, e))
+
+        fill()
+        while inflight:
+            handle, item, error = inflight.popleft()
+            result = None
+            if error is None:
+                try:
+                    self.driver.switch_to.window(handle)
+                    self._wait_fresh(handle)
+                    result = extract(self.driver, item)
+                except Exception as e:
+                    error = e
+            idle.append(handle)
+            yield item, result, error
+            fill()
+
+    def close(self):
+        """Close the extra tabs so the driver goes back to the pool with a single window."""
+        for handle in self.handles[1:]:
+            try:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            except Exception as e:
+                print(f"⚠️ Could not close tab: {e}")
+        self.driver.switch_to.window(self.handles[0])
@@ -0,0 +1,333 @@
+"""
+Driver-free extraction of the fields the scrapers keep, with a selectable HTML backend.
+
+Only the region that holds the data is parsed. The BeautifulSoup backends ('lxml',
+'html.parser') use a SoupStrainer, so only the <dl> lists of an AACR presentation or
+the SITC abstract div become a tree and the rest of the page is dropped while it is
+tokenized. 'selectolax' (lexbor) parses in C, and only the CSS-selected nodes are
+walked from Python. Every backend returns exactly what the original full-page
+BeautifulSoup(html, "html.parser") walk returned. The backends repair broken markup
+differently (an unclosed <dt>, a stray </p>, a <textarea>, lists inside a <template>), so
+_well_formed() scans the region first, and a page it is not sure of gets that original walk.
+
+The SITC titles listing needs no tree at all: sitc_listing() streams its entries out of
+the page source in one forward pass.
+"""
+import re
+import collections
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ModuleNotFoundError:  # optional; the BeautifulSoup backends need nothing extra
+    LexborHTMLParser = None
+
+try:
+    import lxml  # noqa: F401  (BeautifulSoup's "lxml" tree builder)
+    HAVE_LXML = True
+except ModuleNotFoundError:
+    HAVE_LXML = False
+
+# Fastest first; "auto" picks the first one installed
+BACKENDS = ("selectolax", "lxml", "html.parser")
+
+_AACR_STRAINER = SoupStrainer("dl")
+# Loose on purpose: the strainer sees the raw class string ("section  abstract" too), and
+# the exact class_="section abstract" lookup then runs on what it kept
+_SITC_STRAINER = SoupStrainer("div", class_=lambda value: value is not None and "abstract" in value)
+# get_text() leaves out the contents of these, and comments; the selectolax walk does the same
+_NON_TEXT = {"script", "style", "template"}
+
+# What _well_formed() checks. Inside the region an extractor reads, markup the backends
+# repair differently sends the page to html.parser; outside it, only what can swallow or
+# hide the region does.
+_AACR_REGION = re.compile(r"<dl\b", re.IGNORECASE)
+_SITC_REGION = re.compile(r"<div\b[^>]*abstract", re.IGNORECASE)
+_TOKEN = re.compile(r"<!--.*?-->|<!doctype[^>]*>|<(/?)([a-z][^\s/>]*)((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>",
+                    re.IGNORECASE | re.DOTALL)
+# Skipped outside the region: comments, and the elements whose contents are not parsed as HTML
+_SKIP = re.compile(r"<!--|<(script|style|title|textarea|xmp|iframe|noembed|noframes|svg|math|template|plaintext"
+                   r"|frameset)\b", re.IGNORECASE)
+# A character reference without its ";", which html.parser and the HTML5 parsers decode differently
+_LOOSE_REFERENCE = re.compile(r"&(?:[a-z][a-z0-9]*|#x?[0-9a-f]+)(?![a-z0-9;])", re.IGNORECASE)
+_VOID = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"}
+# Raw text to html.parser too
+_RAW_TEXT = {"script", "style"}
+# Raw text to an HTML5 parser but markup to html.parser: alike only while there is no tag inside
+_RCDATA = {"title", "textarea", "xmp", "iframe", "noembed", "noframes"}
+# Parsed by rules of their own (templates, SVG/MathML, table foster-parenting, select)
+_FOREIGN = {"template", "svg", "math", "plaintext", "frameset", "select", "table", "caption", "colgroup",
+            "tbody", "thead", "tfoot", "tr", "td", "th"}
+# An open one is closed by the next start tag of the same group, up to the nearest special element
+_IMPLIED_END = {"li": {"li"}, "dd": {"dd", "dt"}, "dt": {"dd", "dt"}}
+_SPECIAL = {"article", "aside", "blockquote", "body", "center", "details", "dir", "dl", "fieldset",
+            "figcaption", "figure", "footer", "form", "header", "hgroup", "html", "li", "main", "menu", "nav",
+            "object", "ol", "pre", "section", "summary", "ul", "dd", "dt", "button", "marquee", "applet"}
+# Never nested: an HTML5 parser closes or re-parents the outer one
+_NO_NESTING = {"a", "button", "form", "nobr", "option", "h1", "h2", "h3", "h4", "h5", "h6"}
+_HEADINGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+
+
+def available(backend):
+    return {"selectolax": LexborHTMLParser is not None, "lxml": HAVE_LXML, "html.parser": True}[backend]
+
+
+def default_backend():
+    return next(backend for backend in BACKENDS if available(backend))
+
+
+BACKEND = default_backend()
+
+
+def set_backend(name):
+    """Select the backend for this process ("auto" = fastest installed) and return it."""
+    global BACKEND
+    if name in (None, "auto"):
+        name = default_backend()
+    elif not available(name):
+        print(f"⚠️ {name} is not installed — falling back to html.parser for extraction.")
+        name = "html.parser"
+    BACKEND = name
+    return name
+
+
+def _odd_comment(token):
+    """<!--> and <!--->, which end at once in HTML5, and the --!> ending html.parser does not know."""
+    return token.startswith(("<!-->", "<!--->")) or "--!>" in token
+
+
+def _skip_contents(html, name, start):
+    """Position just past the </name> that ends the contents starting at `start`; -1 if there is none or it hides a tag."""
+    end = re.compile(rf"</{name}\s*>", re.IGNORECASE).search(html, start)
+    if end is None or (name in _RCDATA and "<" in html[start:end.start()]):
+        return -1
+    return end.end()
+
+
+def _well_formed(html, region):
+    """
+    True when every backend builds the same tree for the regions starting at `region`:
+    tags inside close in order, nothing is closed implicitly, and no raw-text, template,
+    foreign or table markup is involved. Anything else goes to the full html.parser walk.
+    """
+    pos = 0
+    enter = None
+    while True:
+        skip = _SKIP.search(html, pos)
+        if enter is None or enter.start() < pos:
+            enter = region.search(html, pos)
+        if enter is None:
+            return True
+        if skip is not None and skip.start() < enter.start():
+            name = (skip.group(1) or "").lower()
+            if name in ("template", "plaintext", "frameset"):
+                return False
+            if not name:
+                comment = _TOKEN.match(html, skip.start())
+                if comment is None or not comment.group().startswith("<!--") or _odd_comment(comment.group()):
+                    return False
+                pos = comment.end()
+                continue
+            opener = _TOKEN.match(html, skip.start())
+            if opener is None:
+                return False
+            pos = _skip_contents(html, name, opener.end())
+            if pos < 0:
+                return False
+            continue
+        pos = _region_end(html, enter.start())
+        if pos < 0 or _LOOSE_REFERENCE.search(html, enter.start(), pos):
+            return False
+
+
+def _region_end(html, pos):
+    """Walk one region tag by tag from `pos` (its opening tag); where it closes, or -1 if it is not well formed."""
+    stack = []
+    while True:
+        pos = html.find("<", pos)
+        if pos < 0:
+            return -1
+        token = _TOKEN.match(html, pos)
+        if token is None:
+            # A lone "<" is text to every parser unless it could start a tag or declaration
+            if html[pos + 1:pos + 2].isalpha() or html[pos + 1:pos + 2] in ("/", "!", "?"):
+                return -1
+            pos += 1
+            continue
+        pos = token.end()
+        if token.group(2) is None:
+            if _odd_comment(token.group()):
+                return -1
+            continue
+        closing, name, attrs = token.group(1), token.group(2).lower(), token.group(3)
+        if "<" in attrs or name in _FOREIGN:
+            return -1
+        if closing:
+            if not stack or stack.pop() != name:
+                return -1
+            if not stack:
+                return pos
+            continue
+        if name in _VOID:
+            continue
+        if attrs.endswith("/"):
+            return -1
+        if name in _RAW_TEXT or name in _RCDATA:
+            pos = _skip_contents(html, name, pos)
+            if pos < 0:
+                return -1
+            continue
+        if name in _NO_NESTING and (name in stack or (name in _HEADINGS and stack[-1] in _HEADINGS)):
+            return -1
+        for open_name in reversed(stack):
+            if open_name in _IMPLIED_END.get(name, ()):
+                return -1
+            if open_name in _SPECIAL:
+                break
+        stack.append(name)
+
+
+def _soup_text(node, separator=""):
+    return node.get_text(separator=separator, strip=True)
+
+
+def _lexbor_text(node, separator=""):
+    """get_text(separator, strip=True) for a lexbor node: stripped, non-empty text nodes, joined."""
+    parts = []
+    for child in node.traverse(include_text=True):
+        if child.tag == "-text" and child.parent.tag not in _NON_TEXT:
+            text = child.text_content.strip()
+            if text:
+                parts.append(text)
+    return separator.join(parts)
+
+
+def aacr_presentation(html, backend=None):
+    """(authors, abstract) from the <dl> lists of a rendered presentation page; "N/A" where missing."""
+    backend = backend or BACKEND
+    strainer = _AACR_STRAINER if _well_formed(html, _AACR_REGION) else None
+    if backend == "selectolax" and strainer:
+        dls = LexborHTMLParser(html).css("dl")
+        find_all, text = (lambda node, name: node.css(name)), _lexbor_text
+    else:
+        # No strainer: the original full-page html.parser walk
+        soup = BeautifulSoup(html, backend if strainer else "html.parser", parse_only=strainer)
+        dls = soup.find_all("dl")
+        find_all, text = (lambda node, name: node.find_all(name)), _soup_text
+
+    authors = "N/A"
+    abstract = "N/A"
+    for dl in dls:
+        for dt, dd in zip(find_all(dl, "dt"), find_all(dl, "dd")):
+            label = text(dt).lower()
+            if "presenter" in label or "author" in label:
+                authors = text(dd, " ")
+            elif "abstract" in label:
+                abstract = text(dd, " ")
+                break
+        if abstract and abstract != "N/A":
+            break
+    return authors, abstract
+
+
+def _lexbor_sitc_div(html):
+    for node in LexborHTMLParser(html).css("div.section.abstract"):
+        # class_="section abstract" matches the attribute as a whole, not any order of the two classes
+        if " ".join((node.attributes.get("class") or "").split()) == "section abstract":
+            return node
+    return None
+
+
+def sitc_abstract(html, backend=None):
+    """
+    [(section, text)] from the abstract div of a SITC DOI page: one entry per subsection,
+    or a single ("Abstract", text) without subsections. [] when there is no abstract div.
+    """
+    backend = backend or BACKEND
+    strainer = _SITC_STRAINER if _well_formed(html, _SITC_REGION) else None
+    if backend == "selectolax" and strainer:
+        abstract_div = _lexbor_sitc_div(html)
+        subsections = lambda: abstract_div.css("div.subsection")
+        heading_of = lambda node: node.css_first("strong")
+        text = _lexbor_text
+    else:
+        # No strainer: the original full-page html.parser walk
+        soup = BeautifulSoup(html, backend if strainer else "html.parser", parse_only=strainer)
+        abstract_div = soup.find("div", class_="section abstract")
+        subsections = lambda: abstract_div.find_all("div", class_="subsection")
+        heading_of = lambda node: node.find("strong")
+        text = _soup_text
+    if not abstract_div:
+        return []
+
+    sections = []
+    for subsection in subsections():
+        heading = heading_of(subsection)
+        section_name = text(heading) if heading else "Unknown Section"
+        sections.append((section_name, text(subsection).replace(section_name, "", 1).strip()))
+    return sections or [("Abstract", text(abstract_div))]
+
+
+ListingEntry = collections.namedtuple("ListingEntry", ["number", "title", "authors", "doi_link"])
+
+# The rendered SITC titles page is walked forward once. Each hit starts at "Abstract Number"
+# and runs to the next one. Within a hit, the first title anchor, "Authors" label and DOI
+# link are located with bounded str.find / compiled-regex searches, and each captured text
+# ends at the first closing tag after its marker in the same hit. Nothing scans past the
+# hit, so a malformed entry cannot make a pattern backtrack over the rest of the page.
+_HIT = "Abstract Number"
+_TITLE = '<p style="font-size: 1.5em; font-weight: 700;"><a href='
+_AUTHORS = "Authors</span>"
+_HIGHLIGHT = '<span class="ais-Highlight"><span class="ais-Highlight-nonHighlighted">'
+_DOI = re.compile(r"https?://dx\.doi\.org/10\.1136/jitc-2024-SITC2024\.\d+")
+_TAG = re.compile(r"<.*?>")
+
+
+def _between(html, start, opener, closer, end):
+    """Text from the first `opener` at or after `start` up to the next `closer`, both before `end`; None if either is missing."""
+    begin = html.find(opener, start, end)
+    if begin < 0:
+        return None
+    begin += len(opener)
+    stop = html.find(closer, begin, end)
+    return html[begin:stop] if stop >= 0 else None
+
+
+def _after(html, marker, start, end):
+    """Position just past the first `marker` in html[start:end], or -1."""
+    found = html.find(marker, start, end)
+    return found + len(marker) if found >= 0 else -1
+
+
+def sitc_listing(html, doi_pattern=_DOI):
+    """
+    Yield a ListingEntry per hit on the rendered SITC titles page, in one forward pass.
+    Missing fields come back as "Unknown Title", "Unknown Authors" and "No DOI Found".
+    `doi_pattern` is the compiled regex for the DOI link (http or https by default).
+    """
+    hit = html.find(_HIT)
+    while hit >= 0:
+        start = hit + len(_HIT)
+        hit = html.find(_HIT, start)
+        end = len(html) if hit < 0 else hit
+
+        number = _between(html, start, _HIGHLIGHT, "</span>", end)
+
+        title = None
+        title_at = _after(html, _TITLE, start, end)
+        if title_at >= 0:
+            title = _between(html, title_at, ">", "</a></p>", end)
+
+        authors = None
+        authors_at = _after(html, _AUTHORS, start, end)
+        if authors_at >= 0:
+            authors = _between(html, authors_at, _HIGHLIGHT, "</span></span>", end)
+
+        doi = doi_pattern.search(html, start, end)
+        yield ListingEntry(
+            (number or "").strip(),
+            _TAG.sub("", title.strip()) if title is not None else "Unknown Title",
+            authors.strip() if authors is not None else "Unknown Authors",
+            doi.group() if doi else "No DOI Found",
+        )
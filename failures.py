@@ -0,0 +1,203 @@
+"""
+Fetch outcome classification, per-class retry policy and a per-host circuit breaker.
+
+Every failed page is put in one class (timeout, bot challenge, empty render, embargoed,
+not found, driver crash, other error). Each class has its own retry budget and backoff
+base: a timeout is worth a quick retry, a challenge needs a long pause, a 404 or an
+embargo is final. Retries wait with full-jitter exponential backoff, and a burst of
+failures on one host opens its circuit so every caller pauses instead of burning
+through pages that are bound to fail.
+"""
+import math
+import time
+import random
+import asyncio
+import threading
+from dataclasses import dataclass
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+try:
+    import httpx
+except ModuleNotFoundError:  # only the SITC --http path and the API client need it
+    httpx = None
+
+from throttle import host_of
+
+OK = "ok"
+TIMEOUT = "timeout"
+CHALLENGE = "challenge"
+EMPTY = "empty"
+EMBARGOED = "embargoed"
+NOT_FOUND = "not_found"
+DRIVER_CRASH = "driver_crash"
+ERROR = "error"
+
+CHALLENGE_MARKERS = (
+    "needs to review the security of your connection",
+    "cf-browser-verification",
+    "challenge-platform",
+    "Just a moment...",
+)
+NOT_FOUND_MARKERS = (
+    "Page not found",
+    "404 Not Found",
+    "The requested presentation could not be found",
+)
+# chromedriver messages that mean the browser itself is gone
+CRASH_MARKERS = (
+    "invalid session id",
+    "chrome not reachable",
+    "session deleted",
+    "disconnected",
+    "target window already closed",
+    "no such window",
+)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    retries: int  # further attempts after the first
+    base: float  # backoff base in seconds
+    cap: float  # longest single wait
+    recycle_driver: bool = False  # the driver must be replaced before retrying
+    trips_breaker: bool = True  # counts towards opening the host's circuit
+
+
+RETRY_POLICIES = {
+    OK: RetryPolicy(retries=0, base=0, cap=0, trips_breaker=False),
+    TIMEOUT: RetryPolicy(retries=2, base=5, cap=60),
+    CHALLENGE: RetryPolicy(retries=1, base=60, cap=300, recycle_driver=True),
+    EMPTY: RetryPolicy(retries=1, base=5, cap=30),
+    EMBARGOED: RetryPolicy(retries=0, base=0, cap=0, trips_breaker=False),
+    NOT_FOUND: RetryPolicy(retries=0, base=0, cap=0, trips_breaker=False),
+    DRIVER_CRASH: RetryPolicy(retries=2, base=1, cap=10, recycle_driver=True, trips_breaker=False),
+    ERROR: RetryPolicy(retries=1, base=5, cap=30),
+}
+
+
+def looks_like_challenge(html):
+    """True for a Cloudflare-style interstitial instead of the requested page."""
+    return any(marker in html for marker in CHALLENGE_MARKERS)
+
+
+def classify_page(html, has_content=True, embargoed=False):
+    """Class of a page that loaded: OK, or why it did not yield a record."""
+    if has_content:
+        return EMBARGOED if embargoed else OK
+    if looks_like_challenge(html):
+        return CHALLENGE
+    if any(marker in html for marker in NOT_FOUND_MARKERS):
+        return NOT_FOUND
+    return EMPTY
+
+
+def classify_exception(e):
+    if isinstance(e, TimeoutException):
+        return TIMEOUT
+    if isinstance(e, WebDriverException):
+        message = str(e).lower()
+        return DRIVER_CRASH if any(marker in message for marker in CRASH_MARKERS) else ERROR
+    if httpx is not None:
+        if isinstance(e, httpx.TimeoutException):
+            return TIMEOUT
+        if isinstance(e, httpx.HTTPStatusError):
+            return classify_status(e.response.status_code)
+    return ERROR
+
+
+def classify_failure(e, html=""):
+    """Class of a fetch that raised `e`; the page source refines a timeout into a challenge or 404."""
+    outcome = classify_exception(e)
+    if outcome in (TIMEOUT, ERROR) and html:
+        page_outcome = classify_page(html, has_content=False)
+        if page_outcome in (CHALLENGE, NOT_FOUND):
+            return page_outcome
+    return outcome
+
+
+def classify_status(status_code):
+    if status_code in (404, 410):
+        return NOT_FOUND
+    if status_code in (403, 429, 503):
+        return CHALLENGE
+    if status_code >= 500:
+        return TIMEOUT  # treat overloaded upstreams like a slow page
+    return OK if status_code < 400 else ERROR
+
+
+def is_pushback(outcome):
+    """True for outcomes that mean the site is pushing back, so pacing should slow down."""
+    return outcome != OK and RETRY_POLICIES[outcome].trips_breaker
+
+
+def backoff_delay(outcome, attempt):
+    """Full-jitter exponential backoff before retry number `attempt` (1-based) of `outcome`."""
+    policy = RETRY_POLICIES[outcome]
+    return random.uniform(0, min(policy.cap, policy.base * 2 ** (attempt - 1)))
+
+
+def should_retry(outcome, attempt):
+    """Whether a page that failed with `outcome` on attempt number `attempt` gets another try."""
+    return outcome != OK and attempt <= RETRY_POLICIES[outcome].retries
+
+
+class CircuitBreaker:
+    """
+    Per-host breaker: `threshold` failures within `window` seconds open the circuit for
+    `cooldown` seconds, during which wait() blocks. After the cooldown one request is let
+    through (half-open); a success closes the circuit, another failure reopens it for
+    twice as long, up to `max_cooldown`.
+    """
+
+    def __init__(self, threshold=5, window=120, cooldown=120, max_cooldown=1800):
+        self.settings = dict(threshold=threshold, window=window, cooldown=cooldown, max_cooldown=max_cooldown)
+        self._failures = {}  # host -> [timestamps]
+        self._open_until = {}  # host -> time
+        self._cooldown = {}  # host -> current cooldown
+        self._lock = threading.Lock()
+
+    def record(self, url, outcome):
+        host = host_of(url)
+        s = self.settings
+        with self._lock:
+            if not is_pushback(outcome):
+                if outcome == OK and host in self._cooldown:
+                    print(f"✅ {host}: circuit closed")
+                    del self._cooldown[host]
+                self._failures.pop(host, None)
+                return
+            now = time.time()
+            recent = [t for t in self._failures.get(host, []) if now - t < s["window"]] + [now]
+            self._failures[host] = recent
+            half_open = host in self._cooldown and now >= self._open_until.get(host, 0)
+            if len(recent) >= s["threshold"] or half_open:
+                cooldown = min(s["max_cooldown"], self._cooldown.get(host, s["cooldown"] / 2) * 2)
+                self._cooldown[host] = cooldown
+                self._open_until[host] = now + cooldown
+                self._failures[host] = []
+                print(f"⛔ {host}: circuit open after {len(recent)} recent failure(s) (last: {outcome}); "
+                      f"pausing requests for {cooldown:.0f} sec")
+
+    def share(self, n):
+        """
+        Settings for one of `n` processes that each keep their own breaker: a process only sees
+        its share of a host's failures, so it opens the circuit after threshold / n of them.
+        """
+        return dict(self.settings, threshold=max(1, math.ceil(self.settings["threshold"] / n)))
+
+    def remaining(self, url):
+        return max(0.0, self._open_until.get(host_of(url), 0) - time.time())
+
+    def wait(self, url):
+        """Block while the host's circuit is open."""
+        remaining = self.remaining(url)
+        if remaining > 0:
+            print(f"⏸️ {host_of(url)}: circuit open, waiting {remaining:.0f} sec")
+            time.sleep(remaining)
+
+    async def wait_async(self, url):
+        remaining = self.remaining(url)
+        if remaining > 0:
+            print(f"⏸️ {host_of(url)}: circuit open, waiting {remaining:.0f} sec")
+            await asyncio.sleep(remaining)
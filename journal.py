@@ -0,0 +1,125 @@
+"""
+Append-only journal of state-store writes, so results survive a crash between checkpoints.
+
+Each fetched record is appended as one JSON line and fsynced before the scraper moves on,
+so nothing has to be held in memory until the end of a batch. checkpoint() applies the
+journaled upserts and updates to the store in one batch per table and truncates the
+journal; it is due every `every` records or `interval` seconds. A journal left behind by
+a crashed run is applied when the next run opens it. The operations are idempotent, so
+replaying a journal that was already applied (a crash between apply and truncate) is harmless.
+"""
+import os
+import json
+import time
+from pathlib import Path
+
+import pandas as pd
+
+
+def _json_default(value):
+    """numpy scalars -> plain Python values."""
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class Journal:
+    def __init__(self, path, every=500, interval=60):
+        self.path = Path(path)
+        self.every = every
+        self.interval = interval
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        self._repair()
+        self.pending = sum(len(entry.get("rows") or entry.get("keys") or []) for entry in self.replay())
+        self._last_checkpoint = time.time()
+
+    def _repair(self):
+        """Cut a torn last line (crash mid-append) so the next record starts on a fresh line."""
+        size = os.fstat(self._fd).st_size
+        if not size:
+            return
+        with open(self.path, "rb") as f:
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < size:
+            os.ftruncate(self._fd, end)
+            os.fsync(self._fd)
+            print(f"🩹 Dropped a torn record at the end of {self.path}")
+
+    def _append(self, entry, records):
+        line = (json.dumps(entry, default=_json_default) + "\n").encode("utf-8")
+        os.write(self._fd, line)  # one O_APPEND write per entry
+        os.fsync(self._fd)
+        self.pending += records
+
+    def upsert(self, table, rows, keep="new"):
+        """Journal rows (dicts) for store.upsert(table, rows, keep=keep)."""
+        rows = list(rows)
+        if rows:
+            self._append({"op": "upsert", "table": table, "keep": keep, "rows": rows}, len(rows))
+
+    def update(self, table, keys, **values):
+        """Journal store.update(table, keys, **values); composite keys are tuples."""
+        keys = list(keys)
+        if keys:
+            self._append({"op": "update", "table": table, "keys": keys, "values": values}, len(keys))
+
+    def replay(self):
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def due(self):
+        return self.pending >= self.every or (
+            self.pending > 0 and time.time() - self._last_checkpoint >= self.interval)
+
+    def checkpoint(self, store):
+        """
+        Apply the journal to `store` and truncate it. All upserts go first, then the flag
+        updates, so a flag never points at a row that was not written. Returns {table: records}.
+        """
+        upserts, updates = {}, {}
+        for entry in self.replay():
+            if entry["op"] == "upsert":
+                upserts.setdefault((entry["table"], entry["keep"]), []).extend(entry["rows"])
+            else:
+                by_key = updates.setdefault((entry["table"], tuple(sorted(entry["values"]))), {})
+                for key in entry["keys"]:
+                    by_key[tuple(key) if isinstance(key, list) else key] = entry["values"]
+
+        applied = {}
+        for (table, keep), rows in upserts.items():
+            store.upsert(table, pd.DataFrame(rows), keep=keep)
+            applied[table] = applied.get(table, 0) + len(rows)
+        for (table, columns), by_key in updates.items():
+            keys = list(by_key)
+            store.update(table, keys, **{c: [by_key[k][c] for k in keys] for c in columns})
+            applied[table] = applied.get(table, 0) + len(keys)
+
+        os.ftruncate(self._fd, 0)
+        os.fsync(self._fd)
+        self.pending = 0
+        self._last_checkpoint = time.time()
+        return applied
+
+    def close(self):
+        os.close(self._fd)
+
+
+def recover(path, store):
+    """Apply a journal left behind by an interrupted run to `store`; returns the number of records."""
+    if not Path(path).exists():
+        return 0
+    journal = Journal(path)
+    pending = journal.pending
+    if pending:
+        print(f"♻️ Replaying {pending} journaled records from an interrupted run into {store.kind} state")
+        journal.checkpoint(store)
+    journal.close()
+    return pending
@@ -0,0 +1,236 @@
+"""
+Content-addressed, compressed cache of successfully fetched pages (rendered DOM snapshots
+and captured JSON), so re-parses and later runs can read pages from disk instead of the
+network.
+
+Bodies are stored once per SHA-256 of their content under objects/, compressed with zstd
+when the `zstandard` package is installed and with zlib otherwise. An SQLite index maps
+(url, fetch time) to a body and its kind (e.g. 'aacr_presentation', 'sitc_abstract').
+The cache has a size cap: once the compressed bodies outgrow it, the least recently used
+ones are evicted together with their index entries.
+
+reparse() runs a pure parse function over cached pages in a process pool, so outputs can
+be rebuilt after a selector change without fetching anything again.
+"""
+import os
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+import contextlib
+import multiprocessing
+from pathlib import Path
+from collections import namedtuple
+
+try:
+    import zstandard
+except ModuleNotFoundError:  # zlib is always there; zstd is smaller and faster when installed
+    zstandard = None
+
+CachedPage = namedtuple("CachedPage", ["url", "fetched_at", "kind", "digest"])
+
+_SUFFIX = {"zstd": ".zst", "zlib": ".zz"}
+
+
+class PageCache:
+    def __init__(self, root, max_mb=1024, max_age=None):
+        """
+        `max_mb` caps the compressed size on disk. `max_age` (seconds) is how old a page may
+        be for fresh() to serve it in place of a fetch; None means fresh() never serves.
+        """
+        self.root = Path(root)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_age = max_age
+        self.codec = "zstd" if zstandard is not None else "zlib"
+        (self.root / "objects").mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.root / "index.sqlite", timeout=30, isolation_level=None,
+                                    check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS objects (digest TEXT PRIMARY KEY, codec TEXT, "
+                          "size INTEGER, raw_size INTEGER, last_access REAL)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS pages (url TEXT, fetched_at REAL, kind TEXT, digest TEXT, "
+                          "PRIMARY KEY (url, fetched_at))")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS pages_kind ON pages (kind)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS pages_digest ON pages (digest)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS objects_last_access ON objects (last_access)")
+
+    def _path(self, digest, codec):
+        return self.root / "objects" / digest[:2] / (digest + _SUFFIX[codec])
+
+    def _compress(self, raw):
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor(level=10).compress(raw)
+        return zlib.compress(raw, 6)
+
+    @staticmethod
+    def _decompress(data, codec):
+        if codec == "zstd":
+            if zstandard is None:
+                raise RuntimeError("page was cached with zstd but the zstandard package is not installed")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+
+    def put(self, url, content, kind="html", fetched_at=None):
+        """Store one fetched page (str or bytes) and return its digest. Identical bodies are stored once."""
+        raw = content.encode("utf-8") if isinstance(content, str) else content
+        digest = hashlib.sha256(raw).hexdigest()
+        now = time.time()
+        with self._lock:
+            # The lookup only saves compressing a known body again; another process sharing the
+            # cache may store the same body in between, which INSERT OR IGNORE settles
+            added = False
+            if not self.conn.execute("SELECT 1 FROM objects WHERE digest = ?", (digest,)).fetchone():
+                path = self._path(digest, self.codec)
+                path.parent.mkdir(exist_ok=True)
+                data = self._compress(raw)
+                tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, path)
+                added = self.conn.execute("INSERT OR IGNORE INTO objects VALUES (?, ?, ?, ?, ?)",
+                                          (digest, self.codec, len(data), len(raw), now)).rowcount == 1
+            if not added:
+                self.conn.execute("UPDATE objects SET last_access = ? WHERE digest = ?", (now, digest))
+            self.conn.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)",
+                              (url, fetched_at or now, kind, digest))
+        if added:
+            self.evict()
+        return digest
+
+    def lookup(self, url, kind=None, max_age=None):
+        """The most recent CachedPage for `url` (optionally of `kind`, at most `max_age` seconds old), or None."""
+        query, params = "SELECT url, fetched_at, kind, digest FROM pages WHERE url = ?", [url]
+        if kind is not None:
+            query += " AND kind = ?"
+            params.append(kind)
+        if max_age is not None:
+            query += " AND fetched_at >= ?"
+            params.append(time.time() - max_age)
+        row = self.conn.execute(query + " ORDER BY fetched_at DESC LIMIT 1", params).fetchone()
+        return CachedPage(*row) if row else None
+
+    def read(self, digest, touch=True):
+        """Body of a cached page as str; marks it recently used unless `touch` is False."""
+        with self._lock:
+            codec = self.conn.execute("SELECT codec FROM objects WHERE digest = ?", (digest,)).fetchone()
+            if codec is None:
+                raise KeyError(digest)
+            if touch:
+                self.conn.execute("UPDATE objects SET last_access = ? WHERE digest = ?", (time.time(), digest))
+        with open(self._path(digest, codec[0]), "rb") as f:
+            return self._decompress(f.read(), codec[0]).decode("utf-8")
+
+    def get(self, url, kind=None, max_age=None):
+        """Body of the most recent cached page for `url`, or None."""
+        page = self.lookup(url, kind, max_age)
+        if page is None:
+            return None
+        try:
+            return self.read(page.digest)
+        except (KeyError, OSError):
+            return None  # evicted by another process in the meantime
+
+    def fresh(self, url, kind=None):
+        """Body to serve instead of fetching `url`: only when a max_age was configured and a young enough copy exists."""
+        if self.max_age is None:
+            return None
+        return self.get(url, kind, self.max_age)
+
+    def entries(self, kind=None):
+        """The most recent CachedPage per URL, optionally only of `kind`."""
+        query = "SELECT url, MAX(fetched_at), kind, digest FROM pages"
+        params = []
+        if kind is not None:
+            query += " WHERE kind = ?"
+            params.append(kind)
+        return [CachedPage(*row) for row in self.conn.execute(query + " GROUP BY url", params)]
+
+    def size(self):
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+
+    def evict(self):
+        """
+        Once over the cap, drop least recently used bodies (and the index entries pointing
+        at them) down to 90% of it, so eviction runs in bursts rather than on every put.
+        """
+        with self._lock:
+            size = self.size()
+            if size <= self.max_bytes:
+                return 0
+            excess = size - int(self.max_bytes * 0.9)
+            victims, freed = [], 0
+            for digest, codec, size in self.conn.execute(
+                    "SELECT digest, codec, size FROM objects ORDER BY last_access"):
+                if freed >= excess:
+                    break
+                victims.append((digest, codec))
+                freed += size
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.executemany("DELETE FROM pages WHERE digest = ?", [(d,) for d, _ in victims])
+            self.conn.executemany("DELETE FROM objects WHERE digest = ?", [(d,) for d, _ in victims])
+            self.conn.execute("COMMIT")
+        for digest, codec in victims:
+            with contextlib.suppress(FileNotFoundError):
+                self._path(digest, codec).unlink()
+        print(f"🧹 Page cache: evicted {len(victims)} least recently used page(s), {freed / 1024 / 1024:.1f} MB")
+        return len(victims)
+
+    def report(self):
+        pages, objects, size, raw = self.conn.execute(
+            "SELECT (SELECT COUNT(*) FROM pages), COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(raw_size), 0) "
+            "FROM objects").fetchone()
+        ratio = raw / size if size else 0
+        print(f"💾 Page cache {self.root}: {pages} page(s), {objects} unique bodies, "
+              f"{size / 1024 / 1024:.1f} MB on disk ({self.codec}, {ratio:.1f}x)")
+
+    def close(self):
+        self.conn.close()
+
+
+def _reparse_batch(args):
+    """reparse() worker: read and parse one batch of (CachedPage, context) pairs."""
+    root, parse, batch = args
+    cache = PageCache(root)
+    results = []
+    try:
+        for page, context in batch:
+            try:
+                # Reads don't bump last_access, so workers never write to the index
+                results.append((page, parse(cache.read(page.digest, touch=False), page, context)))
+            except (KeyError, OSError):
+                results.append((page, None))  # evicted meanwhile
+            except Exception as e:
+                print(f"⚠️ Could not re-parse {page.url}: {e}")
+                results.append((page, None))
+    finally:
+        cache.close()
+    return results
+
+
+def reparse(cache, items, parse, workers=None, batch_size=200, initializer=None, initargs=()):
+    """
+    Run `parse(body, page, context)` over cached pages without touching the network.
+    `items` are (CachedPage, context) pairs; `parse` has to be a module-level function so
+    it can be sent to the worker processes, and `initializer(*initargs)` runs in each of
+    them first. Returns [(page, result)], with result None for pages that could not be
+    read or parsed, and prints the throughput.
+    """
+    items = list(items)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(items) // batch_size + 1))
+    batches = [(str(cache.root), parse, items[i:i + batch_size]) for i in range(0, len(items), batch_size)]
+    start_time = time.time()
+    results = []
+    if workers == 1:
+        for batch in batches:
+            results.extend(_reparse_batch(batch))
+    else:
+        with multiprocessing.get_context("spawn").Pool(workers, initializer, initargs) as pool:
+            for batch_results in pool.imap_unordered(_reparse_batch, batches):
+                results.extend(batch_results)
+    elapsed = time.time() - start_time
+    rate = len(items) / elapsed if elapsed else 0
+    print(f"🧪 Re-parsed {len(items)} cached page(s) in {elapsed:.1f} sec with {workers} process(es) "
+          f"({rate:.0f} pages/sec)")
+    return results
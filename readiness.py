@@ -0,0 +1,192 @@
+"""
+Event-driven page readiness shared by the scrapers.
+
+Instead of sleeping a fixed number of seconds after each load, wait_ready installs a
+MutationObserver in the page and returns as soon as the page type's content predicate
+holds and the DOM has been quiet for a short window. Every wait is recorded in STATS so
+timeouts can be tuned from observed latencies rather than guessed.
+"""
+import time
+import collections
+from pathlib import Path
+
+import pandas as pd
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+class ReadinessTimeout(TimeoutException):
+    """Raised when a page never became ready; a TimeoutException so existing handlers still apply."""
+
+
+# Per page type: a JS predicate body (`arg` is the caller's argument), how long the DOM must
+# stay quiet once it holds, how long a quiet page without content counts as final (0 = never,
+# keep waiting until the timeout) and the default timeout in seconds.
+PAGE_TYPES = {
+    # pp8 session listing: enough h1.name rows rendered (arg = minimum links on this page)
+    "aacr_listing": {
+        "check": "return document.querySelectorAll('h1.name[data-id]').length >= (arg || 1);",
+        "quiet_ms": 400, "settle_ms": 0, "timeout": 30,
+    },
+    # pp8 listing header carrying the result count
+    "aacr_total": {
+        "check": "return [...document.querySelectorAll('h1')].some(h => /Displaying results.*of \\d/.test(h.innerText));",
+        "quiet_ms": 200, "settle_ms": 0, "timeout": 20,
+    },
+    # pp8 presentation: the Abstract <dd> has text (an embargo notice is final text too)
+    "aacr_presentation": {
+        "check": """
+            const dt = [...document.querySelectorAll('dl dt')].find(e => e.textContent.includes('Abstract'));
+            const dd = dt && dt.nextElementSibling;
+            return !!(dd && dd.tagName === 'DD' && dd.textContent.trim().length > 0);
+        """,
+        "quiet_ms": 500, "settle_ms": 0, "timeout": 30,
+    },
+    # SITC titles page: InstantSearch has rendered its hits
+    "sitc_listing": {
+        "check": "return document.querySelectorAll('.ais-Hits-item').length >= (arg || 1);",
+        "quiet_ms": 750, "settle_ms": 0, "timeout": 30,
+    },
+    # JITC article: the abstract section is in the DOM; pages without one settle instead
+    "sitc_abstract": {
+        "check": "const div = document.querySelector('div.section.abstract'); return !!(div && div.textContent.trim());",
+        "quiet_ms": 300, "settle_ms": 3000, "timeout": 20,
+    },
+}
+
+_WAIT_SCRIPT = """
+const done = arguments[arguments.length - 1];
+const arg = arguments[0], quietMs = arguments[1], settleMs = arguments[2], timeoutMs = arguments[3];
+const check = function (arg) { %s };
+const start = performance.now();
+let last = start;
+const observer = new MutationObserver(() => { last = performance.now(); });
+observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+const finish = (outcome) => {
+    observer.disconnect();
+    done({outcome: outcome, ms: Math.round(performance.now() - start)});
+};
+const tick = () => {
+    const now = performance.now();
+    let ok = false;
+    try { ok = !!check(arg); } catch (e) {}
+    if (ok && now - last >= quietMs) return finish('ready');
+    if (!ok && settleMs && document.readyState === 'complete' && now - last >= settleMs) return finish('settled');
+    if (now - start >= timeoutMs) return finish('timeout');
+    setTimeout(tick, 50);
+};
+tick();
+"""
+
+
+class ReadinessStats:
+    """Observed readiness latencies per page type, for the end-of-run report and timeout tuning."""
+
+    def __init__(self):
+        self.samples = collections.defaultdict(list)  # page_type -> [(ms, outcome)]
+
+    def record(self, page_type, ms, outcome):
+        self.samples[page_type].append((ms, outcome))
+
+    def merge(self, samples):
+        """Add samples collected in another process (e.g. an abstract worker)."""
+        for page_type, rows in samples.items():
+            self.samples[page_type].extend(rows)
+
+    def summary(self):
+        rows = []
+        for page_type, samples in sorted(self.samples.items()):
+            ms = pd.Series([m for m, outcome in samples if outcome == "ready"], dtype=float)
+            outcomes = collections.Counter(outcome for _, outcome in samples)
+            p99 = ms.quantile(0.99) if len(ms) else float("nan")
+            rows.append({
+                "page_type": page_type,
+                "n": len(samples),
+                "ready": outcomes["ready"],
+                "settled": outcomes["settled"],
+                "timeout": outcomes["timeout"],
+                "p50_ms": ms.median() if len(ms) else float("nan"),
+                "p90_ms": ms.quantile(0.9) if len(ms) else float("nan"),
+                "p99_ms": p99,
+                "max_ms": ms.max() if len(ms) else float("nan"),
+                # Headroom over the slowest typical page
+                "suggested_timeout_s": max(5.0, round(p99 * 1.5 / 1000 + 1, 1)) if len(ms) else float("nan"),
+            })
+        return pd.DataFrame(rows)
+
+    def report(self):
+        summary = self.summary()
+        if summary.empty:
+            return
+        print("⏱️ Page readiness latencies (ms, ready pages only):")
+        for row in summary.itertuples():
+            print(f"   {row.page_type}: n={row.n} ready={row.ready} settled={row.settled} timeout={row.timeout} "
+                  f"p50={row.p50_ms:.0f} p90={row.p90_ms:.0f} p99={row.p99_ms:.0f} max={row.max_ms:.0f} "
+                  f"→ suggested timeout {row.suggested_timeout_s}s")
+
+    def save(self, path):
+        """Append this run's samples to a TSV so latencies accumulate across runs."""
+        rows = [
+            {"page_type": page_type, "outcome": outcome, "ms": ms}
+            for page_type, samples in self.samples.items() for ms, outcome in samples
+        ]
+        if not rows:
+            return
+        path = Path(path)
+        pd.DataFrame(rows).to_csv(path, sep="\t", index=False, mode="a", header=not path.exists())
+
+
+STATS = ReadinessStats()
+
+
+def wait_ready(driver, page_type, arg=None, timeout=None, stats=STATS, debug=False):
+    """
+    Block until the page currently loaded in `driver` is ready for `page_type` and return
+    the outcome ('ready', or 'settled' for page types that allow a quiet page without content).
+    Raises ReadinessTimeout if neither happens within `timeout` seconds.
+    """
+    spec = PAGE_TYPES[page_type]
+    timeout = spec["timeout"] if timeout is None else timeout
+    started = time.time()
+    driver.set_script_timeout(timeout + 5)
+    try:
+        result = driver.execute_async_script(_WAIT_SCRIPT % spec["check"], arg, spec["quiet_ms"],
+                                             spec["settle_ms"], int(timeout * 1000))
+    except TimeoutException:
+        result = {"outcome": "timeout", "ms": int((time.time() - started) * 1000)}
+    stats.record(page_type, result["ms"], result["outcome"])
+    if debug:
+        print(f"[DEBUG] {page_type} {result['outcome']} after {result['ms']} ms")
+    if result["outcome"] == "timeout":
+        raise ReadinessTimeout(f"{page_type} not ready after {timeout}s")
+    return result["outcome"]
+
+
+# Navigations that keep the document (pp8 routes differ only after '#!') leave the previous
+# route's content in place until the app re-renders, and wait_ready would accept it. The
+# elements rendered for a selector are stamped before such a navigation; afterwards the route
+# has switched once one of them is unstamped or their text has changed.
+_MARK_STALE_SCRIPT = """
+    const els = [...document.querySelectorAll(arguments[0])];
+    els.forEach(e => e.setAttribute('data-scraper-stale', '1'));
+    return els.map(e => e.textContent).join('|');
+"""
+_FRESH_SCRIPT = """
+    const els = [...document.querySelectorAll(arguments[0])];
+    return els.length > 0 && (els.some(e => !e.hasAttribute('data-scraper-stale'))
+        || els.map(e => e.textContent).join('|') !== arguments[1]);
+"""
+
+
+def mark_stale(driver, selector):
+    """Stamp the elements currently matching `selector`; returns their text for wait_fresh."""
+    return driver.execute_script(_MARK_STALE_SCRIPT, selector)
+
+
+def wait_fresh(driver, selector, before, timeout=30, poll=0.1):
+    """Block until `selector` matches content rendered after mark_stale; raises ReadinessTimeout otherwise."""
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=poll).until(
+            lambda d: d.execute_script(_FRESH_SCRIPT, selector, before))
+    except TimeoutException:
+        raise ReadinessTimeout(f"no fresh {selector!r} content after {timeout}s") from None
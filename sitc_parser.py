@@ -1,15 +1,27 @@
 import time
+import itertools
 import re
 import pandas as pd
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
 from selenium_stealth import stealth
-import random
 from selenium.common.exceptions import TimeoutException, WebDriverException
 
+from driver_pool import DriverPool
+from devtools import BLOCK_PROFILES, apply_request_blocking
+import readiness
+import extraction
+from throttle import AIMDController
+import failures
+from failures import CircuitBreaker
+
+THROTTLE = AIMDController(initial_delay=10.0, min_delay=1.0, max_delay=120.0)
+BREAKER = CircuitBreaker()
+DOI_PATTERN = re.compile(r"https://dx\.doi\.org/10\.1136/jitc-2024-SITC2024\.\d+")  # sitc_parser has always matched https links only
+BLOCK_PROFILE = "sitc"  # devtools.BLOCK_PROFILES key; "none" turns request blocking off
+
 # Setup Selenium WebDriver Options once
 def get_chrome_options_x():
     options = webdriver.ChromeOptions()
@@ -54,6 +66,8 @@ def setup_driver(service, options):
         renderer="Intel Iris OpenGL Engine",
         fix_hairline=True,
     )
+    if BLOCK_PROFILES[BLOCK_PROFILE]:
+        apply_request_blocking(driver, BLOCK_PROFILES[BLOCK_PROFILE])
     return driver
 
 # Function to fetch and parse SITC abstracts using Selenium
@@ -61,50 +75,22 @@ def fetch_sitc_title_auths_link(service, options):
     url = "https://www.sitcancer.org/2024/abstracts/titles-and-publications"
     driver = setup_driver(service, options)
     driver.get(url)
-    time.sleep(5)  # Wait for JavaScript to load content
+    readiness.wait_ready(driver, "sitc_listing")  # Wait for JavaScript to render the hits
     
     # Extract all page content
     page_source = driver.page_source
     driver.quit()  # Close browser early
 
-    # Split into sections using "Abstract Number"
-    sections = page_source.split("Abstract Number")
-    
     titles, authors_list, doi_links = [], [], []
     
-    for section in sections[1:16]:  # Skip first empty split and limit to 15 abstracts
-        
-        # Extract abstract number
-        abstract_number = section.split('</span></span>')[0].strip()
-        
-        # Extract title and remove HTML tags
-        try:
-            title_match = re.search(r'<p style="font-size: 1.5em; font-weight: 700;"><a href=.*?>(.*?)</a></p>', section, re.DOTALL)
-            title = title_match.group(1).strip() if title_match else "Unknown Title"
-            title = re.sub(r'<.*?>', '', title)  # Remove all remaining HTML tags explicitly
-        except:
-            title = "Unknown Title"
-        
-        # Extract authors
-        try:
-            authors_match = re.search(r'Authors</span>.*?<span class="ais-Highlight"><span class="ais-Highlight-nonHighlighted">(.*?)</span></span>', section, re.DOTALL)
-            authors = authors_match.group(1).strip() if authors_match else "Unknown Authors"
-        except:
-            authors = "Unknown Authors"
-        
-        # Extract DOI link
-        try:
-            doi_match = re.search(r'(https://dx\.doi\.org/10\.1136/jitc-2024-SITC2024\.\d+)', section)
-            doi_link = doi_match.group(1) if doi_match else "No DOI Found"
-        except:
-            doi_link = "No DOI Found"
-        
-        print(f"Extracted DOI: {doi_link}")  # Debugging output
+    # One pass over the page; stop after 15 abstracts
+    for entry in itertools.islice(extraction.sitc_listing(page_source, DOI_PATTERN), 15):
+        print(f"Extracted DOI: {entry.doi_link}")  # Debugging output
         
         # Append extracted data
-        titles.append(title)
-        authors_list.append(authors)
-        doi_links.append(doi_link)
+        titles.append(entry.title)
+        authors_list.append(entry.authors)
+        doi_links.append(entry.doi_link)
     
     # Store in DataFrame
     df = pd.DataFrame({"Abstract Number": list(range(1, len(titles) + 1)), "Title": titles, "Authors": authors_list, "DOI Link": doi_links})
@@ -112,21 +98,84 @@ def fetch_sitc_title_auths_link(service, options):
     return df
 
 
-def safe_get(driver, url, retries=3, wait=10):
-    """Try to get a URL with retries and backoff"""
-    for attempt in range(retries):
+def safe_get(driver, url):
+    """Try to get a URL, retrying timeouts with jittered exponential backoff"""
+    attempt = 0
+    while True:
         try:
             driver.set_page_load_timeout(60)
             driver.get(url)
             return True
         except TimeoutException:
-            print(f"⏱️ Timeout on attempt {attempt + 1} for {url}")
-            time.sleep(wait)
-    return False
+            attempt += 1
+            if not failures.should_retry(failures.TIMEOUT, attempt):
+                return False
+            delay = failures.backoff_delay(failures.TIMEOUT, attempt)
+            print(f"⏱️ Timeout on attempt {attempt} for {url}; retrying in {delay:.1f} sec")
+            time.sleep(delay)
+
+
+def fetch_sitc_abstract_once(pool, doi_link):
+    """One attempt at a DOI landing page with a pooled driver: returns (rows, outcome class)."""
+    pooled = None
+    failed = False
+    driver = None
+    try:
+        pooled = pool.acquire()
+        driver = pooled.driver
+
+        success = safe_get(driver, doi_link)
+        if not success:
+            failed = True
+            return [{
+                "DOI Link": doi_link,
+                "Section": "Timeout",
+                "Text": "Page load timed out after retries"
+            }], failures.TIMEOUT
+
+        readiness.wait_ready(driver, "sitc_abstract")
 
+        page_source = driver.page_source
+        sections = extraction.sitc_abstract(page_source)
+        outcome = failures.classify_page(page_source, has_content=bool(sections))
+        failed = failures.RETRY_POLICIES[outcome].recycle_driver
 
-def fetch_sitc_abstracts(df, service, options):
+        if sections:
+            return [{
+                "DOI Link": doi_link,
+                "Section": section_name,
+                "Text": text
+            } for section_name, text in sections], outcome
+        return [{
+            "DOI Link": doi_link,
+            "Section": "None",
+            "Text": "No Abstract Found"
+        }], outcome
+
+    except Exception as e:
+        failed = True
+        try:
+            html = driver.page_source if driver is not None else ""
+        except Exception:
+            html = ""
+        outcome = failures.classify_failure(e, html)
+        print(f"❌ Error processing {doi_link} ({outcome}): {e}")
+        return [{
+            "DOI Link": doi_link,
+            "Section": "Error",
+            "Text": f"Failed due to exception: {e}"
+        }], outcome
+
+    finally:
+        if pooled is not None:
+            pool.release(pooled, failed=failed)
+
+
+def fetch_sitc_abstracts(df, service, options, pool=None):
     abstract_sections = []
+    own_pool = pool is None
+    if own_pool:
+        pool = DriverPool(lambda slot: setup_driver(service, options))
 
     for index, row in df.iterrows():
         doi_link = row["DOI Link"]
@@ -140,66 +189,25 @@ def fetch_sitc_abstracts(df, service, options):
             })
             continue
 
-        # Create a fresh driver every time
-        try:
-            driver = setup_driver(service, options)
-
-            success = safe_get(driver, doi_link)
-            if not success:
-                abstract_sections.append({
-                    "DOI Link": doi_link,
-                    "Section": "Timeout",
-                    "Text": "Page load timed out after retries"
-                })
-                driver.quit()
-                continue
-
-            time.sleep(5)
-
-            soup = BeautifulSoup(driver.page_source, "html.parser")
-            abstract_div = soup.find("div", class_="section abstract")
-
-            if abstract_div:
-                subsections = abstract_div.find_all("div", class_="subsection")
-                if subsections:
-                    for subsection in subsections:
-                        heading = subsection.find("strong")
-                        section_name = heading.get_text(strip=True) if heading else "Unknown Section"
-                        text = subsection.get_text(strip=True).replace(section_name, "", 1).strip()
-                        abstract_sections.append({
-                            "DOI Link": doi_link,
-                            "Section": section_name,
-                            "Text": text
-                        })
-                else:
-                    text = abstract_div.get_text(strip=True)
-                    abstract_sections.append({
-                        "DOI Link": doi_link,
-                        "Section": "Abstract",
-                        "Text": text
-                    })
-            else:
-                abstract_sections.append({
-                    "DOI Link": doi_link,
-                    "Section": "None",
-                    "Text": "No Abstract Found"
-                })
-
-        except Exception as e:
-            print(f"❌ Error processing {doi_link}: {e}")
-            abstract_sections.append({
-                "DOI Link": doi_link,
-                "Section": "Error",
-                "Text": f"Failed due to exception: {e}"
-            })
-
-        finally:
-            driver.quit()
-
-        # Throttle between requests
-        sleep_time = random.uniform(8, 12)
-        print(f"⏳ Sleeping for {sleep_time:.1f} seconds...")
-        time.sleep(sleep_time)
+        # Reuse a warm driver from the pool; failures recycle it and are retried per class
+        attempt = 0
+        while True:
+            attempt += 1
+            BREAKER.wait(doi_link)
+            THROTTLE.acquire(doi_link)
+            rows, outcome = fetch_sitc_abstract_once(pool, doi_link)
+            # Paces the next request: faster while pages succeed, slower after failures
+            BREAKER.record(doi_link, outcome)
+            THROTTLE.release(doi_link, outcome if failures.is_pushback(outcome) else None)
+            if not failures.should_retry(outcome, attempt):
+                break
+            delay = failures.backoff_delay(outcome, attempt)
+            print(f"🔁 {outcome} for {doi_link}; retry {attempt} in {delay:.1f} sec")
+            time.sleep(delay)
+        abstract_sections.extend(rows)
+
+    if own_pool:
+        pool.close()
 
     df_abstracts = pd.DataFrame(abstract_sections)
     return df_abstracts
@@ -17,11 +17,24 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
 from selenium_stealth import stealth
-import random
+import asyncio
+import httpx
 from selenium.common.exceptions import TimeoutException, WebDriverException
 from pathlib import Path
+from urllib.parse import quote
+
+from driver_pool import DriverPool, persistent_profile_options, enforce_profile_cap
+from devtools import BLOCK_PROFILES, apply_request_blocking, compare_blocking, print_blocking_report
+import readiness
+import extraction
+from throttle import AIMDController
+import failures
+from failures import CircuitBreaker
+from state_store import TSVStore, open_store, copy_tables
+from journal import Journal, recover as recover_journal
+from page_cache import PageCache, reparse
+from standin_server import standin_url
 
 
 # Setup Selenium WebDriver Options once
@@ -39,6 +52,16 @@ def get_chrome_options_x():
     options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
     return options
 
+BLOCK_PATTERNS = BLOCK_PROFILES["sitc"]
+PROFILE_DIR = None
+CACHE_SIZE_MB = 512
+THROTTLE = AIMDController(initial_delay=10.0, min_delay=1.0, max_delay=120.0)
+BREAKER = CircuitBreaker()
+PAGE_CACHE = None  # page_cache.PageCache, opened in main(); None with --page-cache-mb 0
+BASE_URL = None  # --base-url: send requests to a stand-in server instead of the live hosts
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
 def get_chrome_options():
     options = webdriver.ChromeOptions()
     options.add_argument("--headless=new")
@@ -50,15 +73,13 @@ def get_chrome_options():
     options.add_argument("--disable-background-networking")
     options.add_argument("--disable-features=NetworkService")
     options.add_argument("--remote-debugging-pipe")
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+    options.add_argument(f"user-agent={USER_AGENT}")
     return options
 
 
-# Dynamically manage ChromeDriver
-service = Service(ChromeDriverManager().install())
-options = get_chrome_options()
-
-def setup_driver(service, options):
+def setup_driver(service, options, profile_slot="main"):
+    if PROFILE_DIR is not None:
+        options = persistent_profile_options(options, PROFILE_DIR, profile_slot, CACHE_SIZE_MB)
     driver = webdriver.Chrome(service=service, options=options)
     stealth(driver,
         languages=["en-US", "en"],
@@ -68,165 +89,432 @@ def setup_driver(service, options):
         renderer="Intel Iris OpenGL Engine",
         fix_hairline=True,
     )
+    if BLOCK_PATTERNS:
+        apply_request_blocking(driver, BLOCK_PATTERNS)
     return driver
 
+
+def sitc_store(links_path, abstracts_path="sitc_abstracts.tsv", kind="tsv"):
+    """State store for the SITC tables; the SQLite database sits next to the links TSV."""
+    tsv_paths = {"sitc_links": Path(links_path), "sitc_abstracts": Path(abstracts_path)}
+    return open_store(kind, tsv_paths, Path(links_path).with_name("sitc_state.sqlite"))
+
+
+def sitc_journal_path(links_path):
+    """Journal of fetched abstracts not yet checkpointed into the store, next to the links TSV."""
+    return Path(links_path).with_name("sitc_journal.jsonl")
+
+
+def sitc_page_cache_path(links_path):
+    """Compressed cache of fetched DOI landing pages, next to the links TSV."""
+    return Path(links_path).with_name("sitc_page_cache")
+
+
+def request_url(url):
+    """Where to fetch a live URL: itself, or its address on the --base-url stand-in server."""
+    return standin_url(BASE_URL, url) if BASE_URL else url
+
+
 # Function to fetch and parse SITC abstracts using Selenium
-def fetch_sitc_title_auths_link(service, options, links_path: str):
+def fetch_sitc_title_auths_link(service, options, links_path: str, store=None):
     import os
 
-    url = "https://www.sitcancer.org/2024/abstracts/titles-and-publications"
+    url = request_url(SITC_LISTING_URL)
     driver = setup_driver(service, options)
     driver.get(url)
-    time.sleep(5)  # Allow JS to load
+    readiness.wait_ready(driver, "sitc_listing")  # InstantSearch renders the hits client-side
     page_source = driver.page_source
     driver.quit()
 
-    sections = page_source.split("Abstract Number")
-    titles, authors_list, doi_links = [], [], []
-
-    for section in sections[1:]:
-        try:
-            title_match = re.search(r'<p style="font-size: 1.5em; font-weight: 700;"><a href=.*?>(.*?)</a></p>', section, re.DOTALL)
-            title = title_match.group(1).strip() if title_match else "Unknown Title"
-            title = re.sub(r'<.*?>', '', title)
-        except:
-            title = "Unknown Title"
-
-        try:
-            authors_match = re.search(r'Authors</span>.*?<span class="ais-Highlight"><span class="ais-Highlight-nonHighlighted">(.*?)</span></span>', section, re.DOTALL)
-            authors = authors_match.group(1).strip() if authors_match else "Unknown Authors"
-        except:
-            authors = "Unknown Authors"
-
-        try:
-            doi_match = re.search(r'(https?://dx\.doi\.org/10\.1136/jitc-2024-SITC2024\.\d+)', section)
-            doi_link = doi_match.group(1) if doi_match else "No DOI Found"
-        except:
-            doi_link = "No DOI Found"
-
-        titles.append(title)
-        authors_list.append(authors)
-        doi_links.append(doi_link)
-
+    entries = list(extraction.sitc_listing(page_source))
     new_df = pd.DataFrame({
-        "Title": titles,
-        "Authors": authors_list,
-        "DOI Link": doi_links,
+        "Title": [entry.title for entry in entries],
+        "Authors": [entry.authors for entry in entries],
+        "DOI Link": [entry.doi_link for entry in entries],
         "retrieved": False
     })
 
-    path = Path(links_path)
+    return save_sitc_links(new_df, links_path, store)
 
-    if path.exists():
-        existing_df = pd.read_csv(path, sep="\t")
-        merged_df = pd.concat([existing_df, new_df], ignore_index=True)
-        merged_df.drop_duplicates(subset=["DOI Link"], inplace=True)
-        path.rename(path.with_suffix(".bak"))  # Backup
-    else:
-        merged_df = new_df
 
-    merged_df.to_csv(path, sep="\t", index=False)
-    print(f"🔗 Links written to {links_path} ({len(merged_df)} total entries)")
+def save_sitc_links(new_df, links_path: str, store=None):
+    """Merge freshly listed links into the links table, keeping existing rows (and their retrieved flag)."""
+    store = store or TSVStore({"sitc_links": links_path})
+    store.upsert("sitc_links", new_df, keep="old")
+    merged_df = store.read("sitc_links")
+    print(f"🔗 Links written to {store.describe('sitc_links')} ({len(merged_df)} total entries)")
 
     return merged_df
 
 
-def safe_get(driver, url, retries=3, wait=10):
-    """Try to get a URL with retries and backoff"""
-    for attempt in range(retries):
+SITC_LISTING_URL = "https://www.sitcancer.org/2024/abstracts/titles-and-publications"
+# Public search-only credentials and index used by the listing page's InstantSearch widget
+ALGOLIA_APP_ID = "MB7PRWYHM8"
+ALGOLIA_API_KEY = "8e751930b75635d5aacbcd4abae7a3c8"
+ALGOLIA_INDEX = "SITC 2024 Abstract Titles"
+ALGOLIA_FACET = "Primary Category"
+ALGOLIA_PAGINATION_LIMIT = 1000  # Algolia's default paginationLimitedTo
+DOI_PATTERN = re.compile(r"(https?://dx\.doi\.org/10\.1136/jitc-2024-SITC2024\.\d+)")
+
+
+class AlgoliaListingClient:
+    """Queries the SITC Algolia index directly with paginated JSON requests."""
+
+    def __init__(self, app_id=ALGOLIA_APP_ID, api_key=ALGOLIA_API_KEY, index_name=ALGOLIA_INDEX,
+                 base_url=None, hits_per_page=1000, timeout=30):
+        self.index_name = index_name
+        self.hits_per_page = hits_per_page
+        self.base_url = (base_url or f"https://{app_id.lower()}-dsn.algolia.net").rstrip("/")
+        self.client = httpx.Client(timeout=timeout, headers={
+            "X-Algolia-Application-Id": app_id,
+            "X-Algolia-API-Key": api_key,
+        })
+
+    def query(self, page=0, hits_per_page=None, **params):
+        url = f"{self.base_url}/1/indexes/{quote(self.index_name, safe='')}/query"
+        body = {"query": "", "page": page, "hitsPerPage": self.hits_per_page if hits_per_page is None else hits_per_page}
+        body.update(params)
+        response = self.client.post(url, json=body)
+        response.raise_for_status()
+        return response.json()
+
+    def iter_hits(self, **params):
+        page = 0
+        while True:
+            data = self.query(page=page, **params)
+            yield from data.get("hits", [])
+            page += 1
+            if page >= data.get("nbPages", 0):
+                break
+
+    def all_hits(self):
+        """
+        Every hit in the index. Algolia caps pagination (1000 hits by default), so when the
+        index is larger the query is split by facet value and the pieces are merged.
+        """
+        first = self.query(page=0, hits_per_page=0, facets=[ALGOLIA_FACET])
+        total = first.get("nbHits", 0)
+        hits = {}
+        if total <= ALGOLIA_PAGINATION_LIMIT:
+            for hit in self.iter_hits():
+                hits[hit.get("objectID", len(hits))] = hit
+        else:
+            for value in first.get("facets", {}).get(ALGOLIA_FACET, {}):
+                for hit in self.iter_hits(facetFilters=[[f"{ALGOLIA_FACET}:{value}"]]):
+                    hits[hit.get("objectID", len(hits))] = hit
+            if len(hits) < total:
+                # Hits without a facet value are not reachable through the split
+                for hit in self.iter_hits():
+                    hits.setdefault(hit.get("objectID", len(hits)), hit)
+        if len(hits) < total:
+            print(f"⚠️ Algolia reported {total} hits but only {len(hits)} could be paged.")
+        return list(hits.values())
+
+    def close(self):
+        self.client.close()
+
+
+def algolia_hit_to_link(hit):
+    doi_match = DOI_PATTERN.search(str(hit.get("Link", ""))) or DOI_PATTERN.search(str(hit))
+    return {
+        "Title": str(hit.get("Title") or "Unknown Title").strip(),
+        "Authors": str(hit.get("Authors") or "Unknown Authors").strip(),
+        "DOI Link": doi_match.group(1) if doi_match else "No DOI Found",
+        "retrieved": False,
+    }
+
+
+def fetch_sitc_title_auths_link_algolia(links_path: str, client=None, store=None):
+    """Listing mode without a browser: same Title/Authors/DOI Link/retrieved frame as the rendered page."""
+    own_client = client is None
+    if own_client:
+        client = AlgoliaListingClient(base_url=request_url(f"https://{ALGOLIA_APP_ID.lower()}-dsn.algolia.net"))
+    start_time = time.time()
+    try:
+        hits = client.all_hits()
+    finally:
+        if own_client:
+            client.close()
+    print(f"🔎 Algolia returned {len(hits)} hits in {time.time() - start_time:.1f} sec")
+
+    new_df = pd.DataFrame([algolia_hit_to_link(hit) for hit in hits],
+                          columns=["Title", "Authors", "DOI Link", "retrieved"])
+    return save_sitc_links(new_df, links_path, store)
+
+
+def safe_get(driver, url):
+    """Try to get a URL, retrying timeouts with jittered exponential backoff (the caller reports the outcome to the breaker)"""
+    attempt = 0
+    while True:
         try:
             driver.set_page_load_timeout(60)
             driver.get(url)
             return True
         except TimeoutException:
-            print(f"⏱️ Timeout on attempt {attempt + 1} for {url}")
-            time.sleep(wait)
-    return False
-
-
-def fetch_sitc_abstracts(links_path: str, abstracts_path: str, service, options, limit=None):
-    links_df = pd.read_csv(links_path, sep="\t")
+            attempt += 1
+            if not failures.should_retry(failures.TIMEOUT, attempt):
+                return False
+            delay = failures.backoff_delay(failures.TIMEOUT, attempt)
+            print(f"⏱️ Timeout on attempt {attempt} for {url}; retrying in {delay:.1f} sec")
+            time.sleep(delay)
+
+
+def parse_sitc_abstract(html, doi_link):
+    """Return the abstract sections of a DOI landing page, or [] if there is no abstract div."""
+    return [{"DOI Link": doi_link, "Section": section, "Text": text}
+            for section, text in extraction.sitc_abstract(html)]
+
+
+def reparse_sitc_page(body, page, context):
+    """--reparse worker: a cached DOI landing page back into its abstract sections."""
+    return parse_sitc_abstract(body, page.url)
+
+
+def reparse_sitc_abstracts(store, workers=None, dry_run=False):
+    """
+    Rebuild sitc_abstracts offline: every cached DOI page of a known link goes back through
+    parse_sitc_abstract in a process pool, and its sections replace the stored ones.
+    """
+    if PAGE_CACHE is None:
+        print("❌ --reparse reads the page cache, which is disabled (--page-cache-mb 0).")
+        return
+    if not store.exists("sitc_links"):
+        print(f"❌ File {store.describe('sitc_links')} does not exist. Run with --refresh to create it.")
+        return
+    known = set(store.read("sitc_links", columns=["DOI Link"])["DOI Link"])
+    items = [(page, None) for page in PAGE_CACHE.entries("sitc_abstract") if page.url in known]
+    print(f"🔎 Re-parsing {len(items)} cached DOI pages...")
+    if not items:
+        return
+
+    results = reparse(PAGE_CACHE, items, reparse_sitc_page, workers,
+                      initializer=extraction.set_backend, initargs=(extraction.BACKEND,))
+    parsed = {page.url: sections for page, sections in results if sections}
+    if len(parsed) < len(items):
+        print(f"⚠️ {len(items) - len(parsed)} cached page(s) no longer parse to an abstract; their sections are left as they are.")
+    if not parsed:
+        return
+
+    current = store.read("sitc_abstracts")
+    replaced = current["DOI Link"].isin(parsed)
+    if dry_run:
+        old = {link: list(zip(group["Section"], group["Text"])) for link, group in current[replaced].groupby("DOI Link")}
+        changed = sum(1 for link, sections in parsed.items()
+                      if link in old and old[link] != [(s["Section"], s["Text"]) for s in sections])
+        print(f"📝 Dry run: {len(parsed) - len(old)} new and {changed} changed abstract(s) — nothing written.")
+        return
+    # Each link's sections are replaced as a whole, so a renamed subsection leaves no stale row behind
+    new = pd.DataFrame([section for sections in parsed.values() for section in sections])
+    store.write("sitc_abstracts", pd.concat([current[~replaced], new], ignore_index=True))
+    store.update("sitc_links", list(parsed), retrieved=True)
+    print(f"✅ Rebuilt {len(parsed)} abstracts ({len(new)} sections) in {store.describe('sitc_abstracts')} from the page cache.")
+
+
+async def _fetch_sitc_abstracts_http(doi_links, concurrency, timeout, on_result=None):
+    try:
+        import h2  # noqa: F401  (httpx needs it for HTTP/2)
+        http2 = True
+    except ImportError:
+        print("⚠️ h2 not installed — falling back to HTTP/1.1 for the fast path.")
+        http2 = False
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    headers = {"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml"}
+    # Start gently and widen towards `concurrency` while the site keeps answering
+    throttle = AIMDController(initial_delay=0.2, min_delay=0.02, max_delay=30.0,
+                              initial_concurrency=min(4, concurrency), max_concurrency=concurrency)
+    results = {}
+
+    async with httpx.AsyncClient(http2=http2, follow_redirects=True, limits=limits,
+                                 timeout=timeout, headers=headers) as client:
+        async def fetch_one(doi_link):
+            # No retries here: anything that fails falls through to the Selenium path
+            await BREAKER.wait_async(doi_link)
+            await throttle.acquire_async(doi_link)
+            outcome = failures.ERROR
+            try:
+                response = await client.get(request_url(doi_link))
+                outcome = failures.classify_status(response.status_code)
+                if outcome == failures.OK:
+                    results[doi_link] = parse_sitc_abstract(response.text, doi_link)
+                    outcome = failures.classify_page(response.text, has_content=bool(results[doi_link]))
+                    if PAGE_CACHE is not None and outcome == failures.OK:
+                        PAGE_CACHE.put(doi_link, response.text, "sitc_abstract")
+                else:
+                    print(f"⚠️ HTTP {response.status_code} ({outcome}) for {doi_link}")
+                    results[doi_link] = []
+            except httpx.HTTPError as e:
+                outcome = failures.classify_exception(e)
+                print(f"⚠️ HTTP error ({outcome}) for {doi_link}: {e}")
+                results[doi_link] = []
+            finally:
+                BREAKER.record(doi_link, outcome)
+                throttle.release(doi_link, outcome if failures.is_pushback(outcome) else None)
+            if on_result is not None:
+                on_result(doi_link, results[doi_link])
+
+        # A fixed set of workers pulls links from the queue, so there are never more pending
+        # coroutines than --concurrency, however many links are left
+        queue = asyncio.Queue()
+        for doi_link in doi_links:
+            queue.put_nowait(doi_link)
+
+        async def worker():
+            while True:
+                try:
+                    doi_link = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await fetch_one(doi_link)
+
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(doi_links)))))
+    throttle.report()
+    return results
+
+
+def fetch_sitc_abstracts_http(doi_links, concurrency=16, timeout=30, on_result=None):
+    """
+    Browserless fast path: fetch DOI landing pages with a pooled async httpx client.
+    Returns {doi_link: sections}; an empty list means the abstract div was missing
+    (e.g. a bot challenge) and the link should go through Selenium instead.
+    `on_result(doi_link, sections)` is called as each page completes.
+    """
+    start_time = time.time()
+    results = asyncio.run(_fetch_sitc_abstracts_http(doi_links, concurrency, timeout, on_result))
+    elapsed = time.time() - start_time
+    found = sum(1 for sections in results.values() if sections)
+    rate = len(results) / elapsed * 60 if elapsed else 0
+    print(f"⚡ HTTP fast path: {found}/{len(results)} abstracts in {elapsed:.1f} sec ({rate:.0f} pages/min)")
+    return results
+
+
+def fetch_sitc_abstract_once(pool, doi_link):
+    """One attempt at a DOI landing page with a pooled driver: returns (sections, outcome class)."""
+    pooled = None
+    failed = False
+    driver = None
+    try:
+        pooled = pool.acquire()
+        driver = pooled.driver
+
+        if not safe_get(driver, request_url(doi_link)):
+            failed = True
+            return [], failures.TIMEOUT
+
+        readiness.wait_ready(driver, "sitc_abstract")
+        page_source = driver.page_source
+        sections = parse_sitc_abstract(page_source, doi_link)
+        outcome = failures.classify_page(page_source, has_content=bool(sections))
+        if PAGE_CACHE is not None and outcome == failures.OK:
+            PAGE_CACHE.put(doi_link, page_source, "sitc_abstract")
+        failed = failures.RETRY_POLICIES[outcome].recycle_driver
+        return sections, outcome
+
+    except Exception as e:
+        failed = True
+        try:
+            html = driver.page_source if driver is not None else ""
+        except Exception:
+            html = ""
+        outcome = failures.classify_failure(e, html)
+        print(f"❌ Error processing {doi_link} ({outcome}): {e}")
+        return [], outcome
+
+    finally:
+        if pooled is not None:
+            pool.release(pooled, failed=failed)
+
+
+def fetch_sitc_abstracts(links_path: str, abstracts_path: str, service, options, limit=None, pool=None,
+                         pool_settings=None, http=False, concurrency=16, store=None, flush_every=500, flush_interval=60):
+    store = store or TSVStore({"sitc_links": links_path, "sitc_abstracts": abstracts_path})
+    # Each abstract is journaled as it arrives and checkpointed into the store every
+    # `flush_every` records or `flush_interval` seconds; leftovers from a crash go in first
+    journal = Journal(sitc_journal_path(links_path), every=flush_every, interval=flush_interval)
+    if journal.pending:
+        print(f"♻️ Replaying {journal.pending} journaled records from an interrupted run")
+        journal.checkpoint(store)
+    links_df = store.read("sitc_links")
 
     pending_df = links_df[links_df["retrieved"] == False]
     if limit:
         pending_df = pending_df.head(limit)
 
     if pending_df.empty:
+        journal.close()
         print("✅ No abstracts to fetch — all entries marked as retrieved.")
         return pd.DataFrame()
 
-    abstract_sections = []
-    updated_links = links_df.copy()
+    def record(doi_link, sections):
+        if not sections:
+            return
+        # Sections already stored are kept as they are
+        journal.upsert("sitc_abstracts", sections, keep="old")
+        journal.update("sitc_links", [doi_link], retrieved=True)
+        if journal.due():
+            applied = journal.checkpoint(store)
+            print("📌 Checkpoint saved: " + ", ".join(f"{n} {table}" for table, n in applied.items()))
+
+    if PAGE_CACHE is not None and PAGE_CACHE.max_age is not None:
+        served = []
+        for doi_link in pending_df["DOI Link"]:
+            html = PAGE_CACHE.fresh(doi_link, "sitc_abstract")
+            sections = parse_sitc_abstract(html, doi_link) if html is not None else []
+            if sections:
+                record(doi_link, sections)
+                served.append(doi_link)
+        if served:
+            print(f"💾 {len(served)} abstract(s) served from the page cache.")
+            pending_df = pending_df[~pending_df["DOI Link"].isin(served)]
+
+    if http and not pending_df.empty:
+        doi_links = [link for link in pending_df["DOI Link"] if str(link).startswith("http")]
+        http_results = fetch_sitc_abstracts_http(doi_links, concurrency=concurrency, on_result=record)
+        fetched = [link for link, sections in http_results.items() if sections]
+        # Only pages without an abstract div need a browser
+        pending_df = pending_df[~pending_df["DOI Link"].isin(fetched)]
+        if not pending_df.empty:
+            print(f"🌐 Falling back to Selenium for {len(pending_df)} page(s).")
+
+    own_pool = pool is None and not pending_df.empty
+    if own_pool:
+        if service is None:
+            service = Service(ChromeDriverManager().install())
+        pool = DriverPool(lambda slot: setup_driver(service, options, f"pool-{slot}"), **(pool_settings or {}))
 
     for index, row in pending_df.iterrows():
         doi_link = row["DOI Link"]
         print(f"\n[{index+1}/{len(links_df)}] Trying DOI: {doi_link}")
 
-        try:
-            driver = setup_driver(service, options)
-
-            success = safe_get(driver, doi_link)
-            if not success:
-                print(f"⚠️ Timeout: {doi_link}")
-                driver.quit()
-                continue
-
-            time.sleep(5)
-            soup = BeautifulSoup(driver.page_source, "html.parser")
-            abstract_div = soup.find("div", class_="section abstract")
-
-            if abstract_div:
-                subsections = abstract_div.find_all("div", class_="subsection")
-                if subsections:
-                    for subsection in subsections:
-                        heading = subsection.find("strong")
-                        section_name = heading.get_text(strip=True) if heading else "Unknown Section"
-                        text = subsection.get_text(strip=True).replace(section_name, "", 1).strip()
-                        abstract_sections.append({
-                            "DOI Link": doi_link,
-                            "Section": section_name,
-                            "Text": text
-                        })
-                else:
-                    text = abstract_div.get_text(strip=True)
-                    abstract_sections.append({
-                        "DOI Link": doi_link,
-                        "Section": "Abstract",
-                        "Text": text
-                    })
-
-                # Mark as retrieved in original DataFrame
-                updated_links.loc[updated_links["DOI Link"] == doi_link, "retrieved"] = True
-
-            else:
-                print(f"⚠️ No abstract found at {doi_link}")
-
-        except Exception as e:
-            print(f"❌ Error processing {doi_link}: {e}")
-
-        finally:
-            driver.quit()
-            time.sleep(random.uniform(8, 12))
-
-    # Write updated links with backup
-    link_path = Path(links_path)
-    link_path.rename(link_path.with_suffix(".bak"))
-    updated_links.to_csv(links_path, sep="\t", index=False)
-    print(f"✅ Updated links saved to {links_path}")
-
-    # Save abstract content
-    abstract_df = pd.DataFrame(abstract_sections)
-
-    if Path(abstracts_path).exists():
-        existing = pd.read_csv(abstracts_path, sep="\t")
-        combined = pd.concat([existing, abstract_df], ignore_index=True)
-        combined.drop_duplicates(subset=["DOI Link", "Section"], inplace=True)
-        Path(abstracts_path).rename(Path(abstracts_path).with_suffix(".bak"))
-    else:
-        combined = abstract_df
-
-    combined.to_csv(abstracts_path, sep="\t", index=False)
-    print(f"📄 Abstracts saved to {abstracts_path} ({len(combined)} total entries)")
+        attempt = 0
+        while True:
+            attempt += 1
+            BREAKER.wait(doi_link)
+            THROTTLE.acquire(doi_link)
+            sections, outcome = fetch_sitc_abstract_once(pool, doi_link)
+            BREAKER.record(doi_link, outcome)
+            THROTTLE.release(doi_link, outcome if failures.is_pushback(outcome) else None)
+            if not failures.should_retry(outcome, attempt):
+                break
+            delay = failures.backoff_delay(outcome, attempt)
+            print(f"🔁 {outcome} for {doi_link}; retry {attempt} in {delay:.1f} sec")
+            time.sleep(delay)
+
+        if sections:
+            record(doi_link, sections)
+        else:
+            print(f"⚠️ No abstract found at {doi_link} ({outcome})")
+
+    if own_pool:
+        pool.close()
+
+    # Abstract sections first, then the retrieved flags
+    journal.checkpoint(store)
+    journal.close()
+    print(f"✅ Updated links saved to {store.describe('sitc_links')}")
+
+    combined = store.read("sitc_abstracts")
+    print(f"📄 Abstracts saved to {store.describe('sitc_abstracts')} ({len(combined)} total entries)")
 
     return combined
 
@@ -241,20 +529,100 @@ def main():
     parser.add_argument("--limit", type=int, default=None, help="Limit number of abstracts to retrieve")
     parser.add_argument("--links-path", type=str, default="sitc_links.tsv", help="Path to links data file")
     parser.add_argument("--abstracts-path", type=str, default="sitc_abstracts.tsv", help="Path to abstracts output file")
+    parser.add_argument("--pool-size", type=int, default=1, help="Number of warm drivers kept for abstract fetching")
+    parser.add_argument("--driver-max-pages", type=int, default=25, help="Recycle a pooled driver after this many page loads")
+    parser.add_argument("--driver-max-age", type=int, default=600, help="Recycle a pooled driver after this many seconds")
+    parser.add_argument("--listing", choices=["browser", "algolia"], default="browser", help="How --refresh lists abstracts: render the page or query the Algolia index")
+    parser.add_argument("--block-profile", choices=sorted(BLOCK_PROFILES), default="sitc", help="Request blocklist applied to every driver via DevTools (images, fonts, media, trackers; 'none' turns blocking off)")
+    parser.add_argument("--block-urls", type=str, default="", help="Comma-separated extra URL patterns to block")
+    parser.add_argument("--block-report", type=int, default=0, help="Load N sample pages with and without blocking, report bytes saved and load-time deltas, then exit")
+    parser.add_argument("--profile-dir", type=str, default=None, help="Persistent Chrome profile/disk-cache directory reused by every driver in the run")
+    parser.add_argument("--cache-size-mb", type=int, default=512, help="Disk cache cap per profile slot, in MB")
+    parser.add_argument("--http", action="store_true", help="Fetch DOI pages with httpx first; use Selenium only when the abstract div is missing")
+    parser.add_argument("--breaker-threshold", type=int, default=5, help="Failures on one host within --breaker-window seconds that pause all requests to it")
+    parser.add_argument("--breaker-window", type=int, default=120, help="Window in seconds for counting failures towards the circuit breaker")
+    parser.add_argument("--breaker-cooldown", type=int, default=120, help="First pause in seconds once a host's circuit opens (doubles while it keeps failing)")
+    parser.add_argument("--store", choices=["tsv", "sqlite"], default="tsv", help="State backend: the TSV files (every flush rewrites each changed table in full), or sitc_state.sqlite (WAL) next to the links file, seeded from existing TSVs, which upserts only the changed rows")
+    parser.add_argument("--import-tsv", action="store_true", help="Load the links/abstracts TSVs into sitc_state.sqlite, then exit")
+    parser.add_argument("--export-tsv", action="store_true", help="Write sitc_state.sqlite back to the links/abstracts TSVs, then exit")
+    parser.add_argument("--flush-every", type=int, default=500, help="Checkpoint journaled abstracts into the store after this many records")
+    parser.add_argument("--flush-interval", type=float, default=60, help="Checkpoint journaled abstracts into the store at least this often (seconds)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Max in-flight requests for the --http fast path (the throttle starts lower and widens while pages succeed)")
+    parser.add_argument("--page-cache-mb", type=int, default=1024, help="Size cap of the compressed DOI page cache (sitc_page_cache next to the links file) in MB; 0 disables it")
+    parser.add_argument("--reparse", action="store_true", help="Rebuild the abstracts table from the DOI page cache with the current parser (no browser or network), then exit")
+    parser.add_argument("--html-backend", choices=["auto", *extraction.BACKENDS], default="auto", help="Parser for extracting abstract sections from DOI pages; 'auto' picks the fastest installed (selectolax, then lxml, then html.parser)")
+    parser.add_argument("--reparse-workers", type=int, default=None, help="Processes used by --reparse (default: one per CPU)")
+    parser.add_argument("--dry-run", action="store_true", help="With --reparse, only report how many abstracts would change")
+    parser.add_argument("--cache-max-age", type=float, default=None, help="Serve cached DOI pages younger than this many seconds instead of fetching them (default: never serve, only record)")
+    parser.add_argument("--initial-delay", type=float, default=10.0, help="Starting delay between browser page loads; adapted up and down during the run (AIMD)")
+    parser.add_argument("--min-delay", type=float, default=1.0, help="Fastest pace the throttle may reach, in seconds between page loads")
+    parser.add_argument("--max-delay", type=float, default=120.0, help="Slowest pace the throttle may back off to, in seconds between page loads")
+    parser.add_argument("--base-url", type=str, default=None, help="Send listing, Algolia and DOI requests to this stand-in server (standin_server.py) instead of the live hosts; https://<host>/<path> becomes <base-url>/<host>/<path>")
     args = parser.parse_args()
 
-    service = Service(ChromeDriverManager().install())
+    global BLOCK_PATTERNS, PROFILE_DIR, CACHE_SIZE_MB, THROTTLE, BREAKER, PAGE_CACHE, BASE_URL
+    BASE_URL = args.base_url
+    BREAKER = CircuitBreaker(threshold=args.breaker_threshold, window=args.breaker_window,
+                             cooldown=args.breaker_cooldown)
+    THROTTLE = AIMDController(initial_delay=args.initial_delay, min_delay=args.min_delay, max_delay=args.max_delay)
+    BLOCK_PATTERNS = BLOCK_PROFILES[args.block_profile] + [p.strip() for p in args.block_urls.split(",") if p.strip()]
+    PROFILE_DIR = args.profile_dir
+    extraction.set_backend(args.html_backend)
+    CACHE_SIZE_MB = args.cache_size_mb
+    if PROFILE_DIR:
+        enforce_profile_cap(PROFILE_DIR, CACHE_SIZE_MB)
+
+    if args.page_cache_mb > 0:
+        PAGE_CACHE = PageCache(sitc_page_cache_path(args.links_path), max_mb=args.page_cache_mb,
+                               max_age=args.cache_max_age)
+    store = sitc_store(args.links_path, args.abstracts_path, args.store)
+    # Abstracts journaled by a run that crashed go in before anything reads or exports state
+    recover_journal(sitc_journal_path(args.links_path), store)
+    if args.import_tsv or args.export_tsv:
+        sqlite_store = store if store.kind == "sqlite" else sitc_store(args.links_path, args.abstracts_path, "sqlite")
+        tsv_store = TSVStore({"sitc_links": args.links_path, "sitc_abstracts": args.abstracts_path})
+        tables = ["sitc_links", "sitc_abstracts"]
+        if args.import_tsv:
+            copy_tables(tsv_store, sqlite_store, tables)
+        else:
+            copy_tables(sqlite_store, tsv_store, tables)
+        return
+    if args.reparse:
+        reparse_sitc_abstracts(store, workers=args.reparse_workers, dry_run=args.dry_run)
+        if PAGE_CACHE is not None:
+            PAGE_CACHE.close()
+        return
+
+    if args.http and (args.listing == "algolia" or not args.refresh) and not args.block_report:
+        # The browser is only a fallback here: chromedriver is installed once a page needs it
+        service = None
+    else:
+        service = Service(ChromeDriverManager().install())
     options = get_chrome_options()
 
+    if args.block_report:
+        sample_urls = [SITC_LISTING_URL]
+        if store.exists("sitc_links"):
+            links = store.read("sitc_links")["DOI Link"]
+            sample_urls += links[links.str.startswith("http")].head(args.block_report - 1).tolist()
+        patterns = BLOCK_PATTERNS
+        BLOCK_PATTERNS = []  # compare_blocking applies the list itself
+        PROFILE_DIR = None  # a warm disk cache would hide the difference
+        report = compare_blocking(lambda: setup_driver(service, options), sample_urls[:args.block_report], patterns)
+        print_blocking_report(report)
+        return
+
     if args.refresh:
         print("🔄 Refreshing links from SITC site...")
-        links_df = fetch_sitc_title_auths_link(service, options, args.links_path)
+        if args.listing == "algolia":
+            links_df = fetch_sitc_title_auths_link_algolia(args.links_path, store=store)
+        else:
+            links_df = fetch_sitc_title_auths_link(service, options, args.links_path, store=store)
     else:
-        path = Path(args.links_path)
-        if not path.exists():
-            print(f"❌ File {args.links_path} does not exist. Run with --refresh to create it.")
+        if not store.exists("sitc_links"):
+            print(f"❌ File {store.describe('sitc_links')} does not exist. Run with --refresh to create it.")
             return
-        links_df = pd.read_csv(path, sep="\t")
+        links_df = store.read("sitc_links")
 
     print("📥 Fetching abstracts not yet retrieved...")
     df_abstracts = fetch_sitc_abstracts(
@@ -263,8 +631,20 @@ def main():
         service=service,
         options=options,
         limit=args.limit,
+        pool_settings=dict(size=args.pool_size, max_pages=args.driver_max_pages, max_age=args.driver_max_age),
+        http=args.http,
+        concurrency=args.concurrency,
+        store=store,
+        flush_every=args.flush_every,
+        flush_interval=args.flush_interval,
     )
 
+    readiness.STATS.report()
+    readiness.STATS.save(Path(args.links_path).with_name("sitc_readiness_latencies.tsv"))
+    THROTTLE.report()
+    if PAGE_CACHE is not None:
+        PAGE_CACHE.report()
+        PAGE_CACHE.close()
     print("✅ Done.")
 
 if __name__ == "__main__":
@@ -0,0 +1,343 @@
+"""
+Local stand-in for the live sites (abstractsonline.com, sitcancer.org, Algolia, doi.org and
+the journal pages DOIs redirect to), so end-to-end throughput can be measured reproducibly.
+
+A live URL https://<host>/<path> is served at <base>/<host>/<path>; standin_url() does that
+mapping, and the scrapers apply it through their base-URL options (aacr_scraper.py
+--api-base, sitc_scraper.py --base-url).
+
+- record: a recording proxy. Each request is forwarded to the live host and every 2xx/3xx
+  answer is stored in a recording (a page_cache.PageCache directory), keyed by method, URL
+  and request body. Redirects are not followed upstream; their Location is rewritten onto
+  the stand-in, so a DOI redirect chain is recorded hop by hop.
+- serve: replays a recording with configurable latency, jitter and injected errors
+  (429/500/503 answers, dropped connections, hung requests). Requests that were never
+  recorded get a 404.
+- load-test: serves a recording, runs pipeline commands against it ("{base}" in a command is
+  replaced with the server's address) and reports pages/min and p50/p95 latency per stage.
+"""
+import re
+import sys
+import json
+import time
+import random
+import shlex
+import hashlib
+import argparse
+import threading
+import subprocess
+from pathlib import Path
+from urllib.parse import urlsplit, urljoin, parse_qsl, urlencode
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pandas as pd
+
+from page_cache import PageCache
+
+KIND = "standin"
+DEFAULT_RECORDING = "standin_recording"
+ERROR_KINDS = ("429", "500", "503", "reset", "timeout")
+
+# First match wins; anything else is reported under its host name
+STAGES = [
+    ("aacr_search", re.compile(r"^POST \S+/Search/New/")),
+    ("aacr_listing", re.compile(r"/Search/[^/]+/Results")),
+    ("aacr_presentation", re.compile(r"/Presentation/")),
+    ("sitc_algolia", re.compile(r"algolia\.net/")),
+    ("sitc_listing", re.compile(r"sitcancer\.org/")),
+    ("doi_redirect", re.compile(r"^\w+ https?://(dx\.)?doi\.org/")),
+    ("doi_page", re.compile(r"^\w+ https?://jitc\.bmj\.com/")),
+]
+
+# Not passed on to the live host: the proxy sets its own, and stores bodies decoded
+_HOP_HEADERS = {"host", "content-length", "connection", "keep-alive", "accept-encoding", "te", "trailer",
+                "transfer-encoding", "upgrade", "proxy-authorization", "proxy-connection"}
+
+
+def standin_url(base, url):
+    """'https://dx.doi.org/10.1136/x' -> '<base>/dx.doi.org/10.1136/x' (fragments are dropped)."""
+    parts = urlsplit(url)
+    return f"{base.rstrip('/')}/{parts.netloc}{parts.path or '/'}" + (f"?{parts.query}" if parts.query else "")
+
+
+def live_url(path, scheme="https"):
+    """Stand-in request path '/<host>/<path>?q' -> the live URL it stands for."""
+    host, _, rest = path.lstrip("/").partition("/")
+    return f"{scheme}://{host}/{rest}"
+
+
+def _standin_path(url):
+    """An absolute live URL as a path on the stand-in (for rewritten Location headers)."""
+    return standin_url("", url)
+
+
+def request_key(method, url, body=b""):
+    """Recording key: method and URL with a sorted query, plus a digest of the (JSON-normalized) body."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    key = f"{method} {parts.scheme}://{parts.netloc}{parts.path}" + (f"?{query}" if query else "")
+    if body:
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode("utf-8")
+        except ValueError:
+            pass
+        key += "#" + hashlib.sha256(body).hexdigest()[:16]
+    return key
+
+
+def stage_of(method, url):
+    line = f"{method} {url}"
+    for name, pattern in STAGES:
+        if pattern.search(line):
+            return name
+    return urlsplit(url).netloc
+
+
+class StandIn:
+    """Request handling shared by the server threads: forward and record, or replay with faults."""
+
+    def __init__(self, recording, upstream_scheme=None, latency=0.0, jitter=0.0, error_rate=0.0,
+                 errors=("429", "500"), timeout_after=35.0, seed=None, debug=False):
+        """`upstream_scheme` set means record mode (forward to <scheme>://<host>); None means replay."""
+        self.recording = recording
+        self.upstream_scheme = upstream_scheme
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.errors = list(errors)
+        self.timeout_after = timeout_after
+        self.debug = debug
+        self.random = random.Random(seed)
+        self.samples = []  # (stage, started_at, seconds, result)
+        self._lock = threading.Lock()
+        self._responses = {}  # key -> decoded envelope, so a page is read from disk once
+        self.index = {page.url: page.digest for page in recording.entries(KIND)}
+        self.client = httpx.Client(timeout=60, follow_redirects=False) if upstream_scheme else None
+
+    def _fault(self):
+        """(delay, injected error or None) for one replayed request."""
+        with self._lock:
+            delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+            error = self.random.choice(self.errors) if self.errors and self.random.random() < self.error_rate else None
+        return delay, error
+
+    def _envelope(self, key):
+        with self._lock:
+            if key not in self._responses:
+                digest = self.index.get(key)
+                self._responses[key] = json.loads(self.recording.read(digest, touch=False)) if digest else None
+            return self._responses[key]
+
+    def _forward(self, handler, url, body):
+        headers = {k: v for k, v in handler.headers.items() if k.lower() not in _HOP_HEADERS}
+        upstream = live_url(handler.path, self.upstream_scheme)
+        response = self.client.request(handler.command, upstream, headers=headers, content=body or None)
+        envelope = {
+            "status": response.status_code,
+            "content_type": response.headers.get("content-type", ""),
+            "location": urljoin(upstream, response.headers["location"]) if "location" in response.headers else "",
+            # surrogateescape keeps bodies that are not valid UTF-8 byte for byte
+            "body": response.content.decode("utf-8", "surrogateescape"),
+        }
+        if response.status_code < 400:
+            key = request_key(handler.command, url, body)
+            digest = self.recording.put(key, json.dumps(envelope), KIND)
+            with self._lock:
+                self.index[key] = digest
+        return envelope
+
+    def respond(self, handler):
+        started_at, started = time.time(), time.perf_counter()
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = handler.rfile.read(length) if length else b""
+        url = live_url(handler.path)  # recordings are keyed by the https URL whatever the upstream scheme
+
+        error, drop = None, False
+        if self.upstream_scheme:
+            try:
+                envelope = self._forward(handler, url, body)
+                result = "ok" if envelope["status"] < 400 else str(envelope["status"])
+            except httpx.HTTPError as e:
+                print(f"⚠️ Upstream request failed for {url}: {e}")
+                envelope, result = {"status": 502, "content_type": "text/plain", "body": str(e)}, "upstream_error"
+        else:
+            delay, error = self._fault()
+            if delay:
+                time.sleep(delay)
+            envelope = None if error else self._envelope(request_key(handler.command, url, body))
+            if error in ("reset", "timeout"):
+                if error == "timeout":
+                    time.sleep(self.timeout_after)
+                drop = True
+            elif error:
+                envelope = {"status": int(error), "content_type": "text/plain", "body": f"injected {error}"}
+            elif envelope is None:
+                envelope = {"status": 404, "content_type": "text/plain", "body": f"not recorded: {url}"}
+            result = error or ("ok" if envelope["status"] < 400 else "miss" if envelope["status"] == 404 else str(envelope["status"]))
+
+        if drop:
+            handler.close_connection = True  # no response at all
+        else:
+            self._send(handler, envelope, retry_after=error == "429")
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.samples.append((stage_of(handler.command, url), started_at, elapsed, result))
+        if self.debug:
+            print(f"[DEBUG] {handler.command} {url} -> {result} in {elapsed * 1000:.0f} ms")
+
+    @staticmethod
+    def _send(handler, envelope, retry_after=False):
+        payload = envelope["body"].encode("utf-8", "surrogateescape")
+        handler.send_response(envelope["status"])
+        if envelope.get("content_type"):
+            handler.send_header("Content-Type", envelope["content_type"])
+        if envelope.get("location"):
+            handler.send_header("Location", _standin_path(envelope["location"]))
+        if retry_after:
+            handler.send_header("Retry-After", "1")
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.end_headers()
+        if handler.command != "HEAD":
+            handler.wfile.write(payload)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, as the pooled clients expect
+
+    def do_GET(self):
+        self.server.standin.respond(self)
+
+    do_POST = do_HEAD = do_GET
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(standin, host="127.0.0.1", port=8765):
+    """Serve `standin` from a background thread; returns (server, base URL). Port 0 picks a free one."""
+    server = ThreadingHTTPServer((host, port), StandInHandler)
+    server.daemon_threads = True
+    server.standin = standin
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def summarize(samples):
+    """Per-stage requests, outcomes, pages/min (successful pages over the stage's active span) and latencies."""
+    frame = pd.DataFrame(samples, columns=["stage", "started_at", "seconds", "result"])
+    rows = []
+    for stage, group in frame.groupby("stage", sort=False):
+        ok = group[group["result"] == "ok"]
+        span = (group["started_at"] + group["seconds"]).max() - group["started_at"].min()
+        ms = ok["seconds"] * 1000
+        rows.append({
+            "stage": stage,
+            "requests": len(group),
+            "ok": len(ok),
+            "missed": int((group["result"] == "miss").sum()),
+            "errors": int((~group["result"].isin(["ok", "miss"])).sum()),
+            "pages_per_min": len(ok) / span * 60 if span > 0 else float("nan"),
+            "p50_ms": ms.median() if len(ms) else float("nan"),
+            "p95_ms": ms.quantile(0.95) if len(ms) else float("nan"),
+        })
+    return pd.DataFrame(rows)
+
+
+def print_summary(summary):
+    if summary.empty:
+        print("ℹ️ No requests reached the stand-in server.")
+        return
+    print(f"{'stage':22s} {'requests':>8s} {'ok':>6s} {'missed':>6s} {'errors':>6s} {'pages/min':>10s} {'p50 ms':>8s} {'p95 ms':>8s}")
+    for row in summary.itertuples():
+        print(f"{row.stage:22s} {row.requests:8d} {row.ok:6d} {row.missed:6d} {row.errors:6d} "
+              f"{row.pages_per_min:10.0f} {row.p50_ms:8.0f} {row.p95_ms:8.0f}")
+
+
+def load_test(standin, base, commands, report_path=None):
+    """Run each command against the stand-in and print its per-stage throughput; returns the worst exit code."""
+    worst = 0
+    for command in commands:
+        argv = shlex.split(command.replace("{base}", base))
+        first = len(standin.samples)
+        print(f"\n🏁 Load test: {' '.join(argv)}")
+        start_time = time.time()
+        code = subprocess.call(argv)
+        elapsed = time.time() - start_time
+        summary = summarize(standin.samples[first:])
+        ok = int(summary["ok"].sum()) if not summary.empty else 0
+        print(f"\n📊 Finished in {elapsed:.1f} sec (exit code {code}), {ok} page(s) served, "
+              f"{ok / elapsed * 60 if elapsed else 0:.0f} pages/min overall")
+        print_summary(summary)
+        worst = max(worst, abs(code))
+        if report_path and not summary.empty:
+            # Appended, so runs with different settings can be compared over time
+            summary.insert(0, "command", command)
+            summary.insert(0, "run_at", time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(start_time)))
+            summary.insert(2, "elapsed_s", round(elapsed, 2))
+            summary.round(1).to_csv(report_path, sep="\t", index=False, mode="a", header=not Path(report_path).exists())
+    if report_path:
+        print(f"💾 Load-test summary appended to {report_path}")
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record/replay stand-in server for end-to-end throughput tests")
+    parser.add_argument("mode", choices=["record", "serve", "load-test"], help="record: proxy the live sites and store their answers; serve: replay a recording; load-test: replay while running --run commands")
+    parser.add_argument("--recording", type=str, default=DEFAULT_RECORDING, help="Recording directory (a compressed page cache)")
+    parser.add_argument("--recording-mb", type=int, default=4096, help="Size cap of the recording in MB")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (0 picks a free one)")
+    parser.add_argument("--upstream-scheme", choices=["https", "http"], default="https", help="In record mode, how the live hosts are reached")
+    parser.add_argument("--latency", type=float, default=0.0, help="Added delay per replayed request, in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random +/- spread around --latency, in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of replayed requests answered with an injected error")
+    parser.add_argument("--errors", type=str, default="429,500,503,reset", help=f"Comma-separated injected error kinds to pick from: {', '.join(ERROR_KINDS)} (reset drops the connection, timeout hangs it for --timeout-after seconds first)")
+    parser.add_argument("--timeout-after", type=float, default=35.0, help="How long an injected 'timeout' holds the connection before dropping it")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for jitter and error injection, for repeatable runs")
+    parser.add_argument("--run", action="append", default=[], help="With load-test: a pipeline command to run against the server; '{base}' is replaced by its URL (repeatable)")
+    parser.add_argument("--report", type=str, default=None, help="With load-test: append the per-stage summary to this TSV")
+    parser.add_argument("--debug", action="store_true", help="Print every request")
+    args = parser.parse_args()
+
+    errors = [e.strip() for e in args.errors.split(",") if e.strip()]
+    unknown = set(errors) - set(ERROR_KINDS)
+    if unknown:
+        parser.error(f"unknown error kind(s): {', '.join(sorted(unknown))}")
+    if args.mode == "load-test" and not args.run:
+        parser.error("load-test needs at least one --run command")
+
+    recording = PageCache(args.recording, max_mb=args.recording_mb)
+    standin = StandIn(recording, upstream_scheme=args.upstream_scheme if args.mode == "record" else None,
+                      latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, errors=errors,
+                      timeout_after=args.timeout_after, seed=args.seed, debug=args.debug)
+    server, base = start_server(standin, args.host, args.port)
+    if args.mode == "record":
+        print(f"🎙️ Recording into {args.recording} via {base} (live URL https://<host>/<path> -> {base}/<host>/<path>)")
+    else:
+        print(f"📼 Replaying {len(standin.index)} recorded response(s) from {args.recording} at {base} "
+              f"(latency {args.latency}s ± {args.jitter}s, error rate {args.error_rate:.0%})")
+
+    code = 0
+    try:
+        if args.mode == "load-test":
+            code = load_test(standin, base, args.run, args.report)
+        else:
+            print("Press Ctrl+C to stop.")
+            while True:
+                time.sleep(3600)
+    except KeyboardInterrupt:
+        print()
+    finally:
+        server.shutdown()
+        if args.mode != "load-test":
+            print_summary(summarize(standin.samples))
+        if args.mode == "record":
+            print(f"🎙️ {len(standin.index)} response(s) in the recording.")
+            recording.report()
+        recording.close()
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Scraper state (session estimates, processed pages, links, abstracts) behind one interface
+with two backends:
+
+- TSVStore: the original TSV files, now written atomically (temp file, fsync, rename)
+  with the previous version kept as .bak via a hard link, so a crash mid-write can no
+  longer leave a table missing.
+- SQLiteStore: one WAL-mode database with a primary key per table, so single rows can be
+  upserted or flagged in a transaction and readers never block the writer.
+
+Both speak DataFrames: read/write whole tables, upsert rows by key, update columns of
+rows by key. copy_tables moves data between them (TSV import/export).
+"""
+import os
+import shutil
+import sqlite3
+import threading
+import contextlib
+from pathlib import Path
+
+import pandas as pd
+
+# table -> primary key and column types; BOOLEAN columns round-trip as Python bools
+TABLES = {
+    "session_estimates": {"key": ["session"], "columns": {"session": "TEXT", "pages": "INTEGER"}},
+    "processed_pages": {"key": ["session", "page"],
+                        "columns": {"session": "TEXT", "page": "INTEGER", "processed": "BOOLEAN"},
+                        "indexes": ["processed"]},
+    "aacr_links": {"key": ["link"],
+                   "columns": {"session": "TEXT", "link": "TEXT", "title": "TEXT", "retrieved": "BOOLEAN"},
+                   "indexes": ["retrieved", "session"]},
+    "aacr_abstracts": {"key": ["link"],
+                       "columns": {"link": "TEXT", "title": "TEXT", "session": "TEXT", "authors": "TEXT",
+                                   "abstract": "TEXT", "status": "TEXT"},
+                       "indexes": ["status"],
+                       "rank": "abstract"},
+    "sitc_links": {"key": ["DOI Link"],
+                   "columns": {"Title": "TEXT", "Authors": "TEXT", "DOI Link": "TEXT", "retrieved": "BOOLEAN"},
+                   "indexes": ["retrieved"]},
+    "sitc_abstracts": {"key": ["DOI Link", "Section"],
+                       "columns": {"DOI Link": "TEXT", "Section": "TEXT", "Text": "TEXT"}},
+}
+
+
+# Ranks for upsert(keep="better"): a row replaces the stored one only if it ranks strictly
+# higher. Abstracts: 'complete' beats any other status, then non-embargoed text beats an
+# embargo notice, then the longer abstract wins.
+_RANK_SQL = {
+    "abstract": ("(CASE WHEN {t}.status = 'complete' THEN 1000000000000 ELSE 0 END)"
+                 " + (CASE WHEN lower(coalesce({t}.abstract, '')) LIKE '%embargoed%' THEN 0 ELSE 100000000000 END)"
+                 " + length(coalesce({t}.abstract, ''))"),
+}
+
+
+def _rank_abstract(df):
+    abstract = df["abstract"].fillna("").astype(str)
+    return (df["status"].eq("complete").astype("int64") * 1000000000000
+            + (~abstract.str.contains("embargoed", case=False)).astype("int64") * 100000000000
+            + abstract.str.len())
+
+
+_RANK_PY = {"abstract": _rank_abstract}
+
+
+def rank_rows(table, df):
+    """The upsert(keep="better") rank of each row of `df`, for tables that have one."""
+    return _RANK_PY[TABLES[table]["rank"]](df)
+
+
+def _q(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _py(value):
+    """numpy scalars and NaN -> plain Python values sqlite3 can bind."""
+    if value is None:
+        return None
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def _frame(rows):
+    return rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
+
+
+def _key_tuples(keys):
+    return [k if isinstance(k, tuple) else (k,) for k in keys]
+
+
+def _per_key(value):
+    """True for an update value given per key (a list/Series aligned with the keys) rather than one scalar."""
+    return not isinstance(value, (str, bytes)) and hasattr(value, "__len__")
+
+
+def atomic_write_tsv(df, path):
+    """Write `df` to `path` via a fsynced temp file; the previous file survives as .bak."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        df.to_csv(f, sep="\t", index=False)
+        f.flush()
+        os.fsync(f.fileno())
+    if path.exists():
+        backup = path.with_suffix(".bak")
+        if backup.exists():
+            backup.unlink()
+        try:
+            os.link(path, backup)
+        except OSError:
+            shutil.copy2(path, backup)
+    os.replace(tmp, path)
+
+
+class TSVStore:
+    kind = "tsv"
+
+    def __init__(self, paths):
+        self.paths = {table: Path(path) for table, path in paths.items()}
+
+    def describe(self, table):
+        return str(self.paths[table])
+
+    def exists(self, table):
+        return self.paths[table].exists()
+
+    def read(self, table, columns=None):
+        """The whole table, or only `columns` of it."""
+        if not self.exists(table):
+            return pd.DataFrame(columns=list(columns or TABLES[table]["columns"]))
+        return pd.read_csv(self.paths[table], sep="\t", usecols=columns)
+
+    def write(self, table, df):
+        atomic_write_tsv(df, self.paths[table])
+
+    def upsert(self, table, rows, keep="new"):
+        """
+        Insert rows, or on a key clash keep the 'new', the 'old' or the 'better' (higher ranked)
+        version. The merge only looks at the batch's keys, but the TSV is still rewritten whole.
+        """
+        rows = _frame(rows)
+        if rows.empty:
+            return
+        key = TABLES[table]["key"]
+        existing = self.read(table)
+        if keep == "better":
+            rank = _RANK_PY[TABLES[table]["rank"]]
+            # Best version of each key within the batch (stable, so earlier rows win ties)
+            rows = rows.assign(_rank=rank(rows)).sort_values("_rank", ascending=False, kind="stable")
+            new = rows.drop_duplicates(subset=key).sort_index().set_index(key)
+            existing = existing.set_index(key)
+            # Only the batch's keys are compared; a stored row is replaced if strictly beaten
+            clash = new.index.intersection(existing.index)
+            wins = clash[new.loc[clash, "_rank"].to_numpy() > rank(existing.loc[clash]).to_numpy()]
+            new = new.drop(columns="_rank")
+            existing.loc[wins, new.columns] = new.loc[wins]
+            combined = pd.concat([existing, new.drop(clash)]).reset_index()
+        else:
+            combined = pd.concat([existing, rows], ignore_index=True)
+            combined = combined.drop_duplicates(subset=key, keep="last" if keep == "new" else "first")
+        self.write(table, combined)
+
+    def update(self, table, keys, **values):
+        """
+        Set columns on the rows whose key is in `keys`; a value is either one scalar for all
+        of them or a list aligned with `keys`. Returns the number of rows changed.
+        """
+        keys = _key_tuples(keys)
+        if not keys or not self.exists(table):
+            return 0
+        df = self.read(table)
+        key_cols = TABLES[table]["key"]
+        if len(key_cols) > 1:
+            index, wanted = pd.MultiIndex.from_frame(df[key_cols]), pd.MultiIndex.from_tuples(keys)
+        else:
+            index, wanted = pd.Index(df[key_cols[0]]), pd.Index([k[0] for k in keys])
+        mask = index.isin(wanted)
+        for column, value in values.items():
+            if _per_key(value):
+                value = pd.Series(list(value), index=wanted).reindex(index[mask]).to_numpy()
+            df.loc[mask, column] = value
+        self.write(table, df)
+        return int(mask.sum())
+
+    def close(self):
+        pass
+
+
+class SQLiteStore:
+    kind = "sqlite"
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        for table, spec in TABLES.items():
+            columns = ", ".join(f"{_q(c)} {t}" for c, t in spec["columns"].items())
+            key = ", ".join(_q(c) for c in spec["key"])
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS {_q(table)} ({columns}, PRIMARY KEY ({key}))")
+            for column in spec.get("indexes", []):
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS {_q(f'{table}_{column}'.replace(' ', '_'))} "
+                                  f"ON {_q(table)} ({_q(column)})")
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def describe(self, table):
+        return f"{self.db_path}:{table}"
+
+    def exists(self, table):
+        return self.conn.execute(f"SELECT 1 FROM {_q(table)} LIMIT 1").fetchone() is not None
+
+    def read(self, table, columns=None):
+        """The whole table, or only `columns` of it."""
+        columns = {c: t for c, t in TABLES[table]["columns"].items() if columns is None or c in columns}
+        df = pd.read_sql_query(f"SELECT {', '.join(_q(c) for c in columns)} FROM {_q(table)} ORDER BY rowid",
+                               self.conn)
+        for column, kind in columns.items():
+            if kind == "BOOLEAN":
+                df[column] = df[column].fillna(0).astype(bool)
+        return df
+
+    def _rows(self, table, df):
+        columns = [c for c in TABLES[table]["columns"] if c in df.columns]
+        values = [tuple(_py(v) for v in row) for row in df[columns].itertuples(index=False, name=None)]
+        return columns, values
+
+    def write(self, table, df):
+        columns, values = self._rows(table, df)
+        with self._transaction() as conn:
+            conn.execute(f"DELETE FROM {_q(table)}")
+            conn.executemany(f"INSERT OR REPLACE INTO {_q(table)} ({', '.join(_q(c) for c in columns)}) "
+                             f"VALUES ({', '.join('?' * len(columns))})", values)
+
+    def upsert(self, table, rows, keep="new"):
+        """
+        Insert rows, or on a key clash keep the 'new', the 'old' or the 'better' (higher ranked)
+        version, in one transaction touching only the batch's rows.
+        """
+        rows = _frame(rows)
+        if rows.empty:
+            return
+        columns, values = self._rows(table, rows)
+        key = TABLES[table]["key"]
+        updates = [c for c in columns if c not in key]
+        if keep in ("new", "better") and updates:
+            conflict = f"DO UPDATE SET {', '.join(f'{_q(c)} = excluded.{_q(c)}' for c in updates)}"
+            if keep == "better":
+                rank = _RANK_SQL[TABLES[table]["rank"]]
+                conflict += f" WHERE {rank.format(t='excluded')} > {rank.format(t=_q(table))}"
+        else:
+            conflict = "DO NOTHING"
+        with self._transaction() as conn:
+            conn.executemany(f"INSERT INTO {_q(table)} ({', '.join(_q(c) for c in columns)}) "
+                             f"VALUES ({', '.join('?' * len(columns))}) "
+                             f"ON CONFLICT ({', '.join(_q(c) for c in key)}) {conflict}", values)
+
+    def update(self, table, keys, **values):
+        """
+        Set columns on the rows whose key is in `keys`; a value is either one scalar for all
+        of them or a list aligned with `keys`. One primary-key lookup per key, in one
+        transaction. Returns the number of rows changed.
+        """
+        keys = _key_tuples(keys)
+        if not keys:
+            return 0
+        key = TABLES[table]["key"]
+        assignments = ", ".join(f"{_q(c)} = ?" for c in values)
+        where = " AND ".join(f"{_q(c)} = ?" for c in key)
+        columns = [list(map(_py, v)) if _per_key(v) else [_py(v)] * len(keys) for v in values.values()]
+        params = [row + tuple(map(_py, key_values)) for row, key_values in zip(zip(*columns), keys)]
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(f"UPDATE {_q(table)} SET {assignments} WHERE {where}", params)
+            return conn.total_changes - before
+
+    def close(self):
+        self.conn.close()
+
+
+def copy_tables(source, target, tables):
+    """Copy whole tables between stores (TSV import into SQLite, or export back to TSV)."""
+    for table in tables:
+        if not source.exists(table):
+            continue
+        df = source.read(table)
+        target.write(table, df)
+        print(f"📦 Copied {len(df)} rows of {table}: {source.describe(table)} → {target.describe(table)}")
+
+
+def open_store(kind, tsv_paths, db_path):
+    """
+    Open the store for `kind` ('tsv' or 'sqlite'). A new SQLite database is seeded from
+    any existing TSVs so a run can switch backends without losing progress.
+    """
+    if kind == "tsv":
+        return TSVStore(tsv_paths)
+    created = not Path(db_path).exists()
+    store = SQLiteStore(db_path)
+    if created:
+        tsv = TSVStore(tsv_paths)
+        if any(tsv.exists(table) for table in tsv_paths):
+            print(f"🚚 Migrating existing TSV state into {db_path}")
+            copy_tables(tsv, store, tsv_paths)
+    return store
@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+# The scrapers are flat modules at the repository root
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
@@ -0,0 +1,173 @@
+"""AbstractsOnlineClient and the record mappers, against recorded JSON served by httpx.MockTransport."""
+import json
+
+import httpx
+import pytest
+
+import abstractsonline_api as aol
+import aacr_scraper
+from conftest import FIXTURES
+from failures import CircuitBreaker
+from state_store import TSVStore
+from throttle import AIMDController
+
+RECORDING = json.loads((FIXTURES / "abstractsonline_recording.json").read_text())
+SESSION_URL = "https://www.abstractsonline.com/pp8/#!/20273/presentations/@sessiontype=Minisymposium/1"
+
+
+class RecordedAPI:
+    """Serves the recording the way the oe3/Program endpoints do, and logs each request."""
+
+    def __init__(self, fail_first=0):
+        self.requests = []
+        self.fail_first = fail_first
+
+    def __call__(self, request):
+        self.requests.append(request)
+        if len(self.requests) <= self.fail_first:
+            return httpx.Response(500)
+        path = request.url.path
+        if request.method == "POST" and path.endswith("/Search/New/presentations"):
+            search_id = RECORDING["searches"].get(json.loads(request.content)["Filter"])
+            return httpx.Response(200, json={"SearchId": search_id}) if search_id else httpx.Response(400)
+        if "/Search/" in path and path.endswith("/Results"):
+            search_id = path.split("/")[-2]
+            page = RECORDING["results"].get(search_id, {}).get(request.url.params["page"])
+            return httpx.Response(200, json=page) if page else httpx.Response(404)
+        if "/Presentation/" in path:
+            record = RECORDING["presentations"].get(path.rsplit("/", 1)[-1])
+            return httpx.Response(200, json=record) if record else httpx.Response(404)
+        return httpx.Response(404)
+
+
+@pytest.fixture(autouse=True)
+def fast_pacing(monkeypatch):
+    monkeypatch.setattr(aacr_scraper, "THROTTLE", AIMDController(initial_delay=0.001, min_delay=0.001))
+    monkeypatch.setattr(aacr_scraper, "BREAKER", CircuitBreaker())
+
+
+@pytest.fixture
+def api():
+    return RecordedAPI()
+
+
+@pytest.fixture
+def client(api, monkeypatch):
+    monkeypatch.setattr(aol.time, "sleep", lambda seconds: None)  # no real backoff between retries
+    return aol.AbstractsOnlineClient(base_url="http://standin.test/oe3/Program",
+                                     client=httpx.Client(transport=httpx.MockTransport(api)))
+
+
+def test_search_is_created_once_per_filter(client, api):
+    filter_expr = aol.filter_from_session_url(SESSION_URL)
+    assert filter_expr == "@sessiontype=Minisymposium"
+    assert client.search(filter_expr) == "a1b2c3"
+    client.results(filter_expr, 1)
+    client.results(filter_expr, 2)
+    posts = [r for r in api.requests if r.method == "POST"]
+    assert len(posts) == 1
+    assert posts[0].url.path == "/oe3/Program/20273/Search/New/presentations"
+
+
+def test_results_paginate(client, api):
+    filter_expr = aol.filter_from_session_url(SESSION_URL)
+    total, first = client.results(filter_expr, 1)
+    _, second = client.results(filter_expr, 2)
+    assert total == 13
+    assert [len(first), len(second)] == [10, 3]
+    assert {r["Id"] for r in first}.isdisjoint(r["Id"] for r in second)
+    gets = [r for r in api.requests if r.method == "GET"]
+    assert [(r.url.params["page"], r.url.params["pagesize"]) for r in gets] == [("1", "10"), ("2", "10")]
+    assert all(r.url.path == "/oe3/Program/20273/Search/a1b2c3/Results" for r in gets)
+
+
+def test_estimated_pages_from_total(client):
+    assert aacr_scraper.get_total_pages_api(client, SESSION_URL, "Minisymposium") == 2
+
+
+def test_presentation(client, api):
+    record = client.presentation("P1")
+    assert record["Id"] == "P1"
+    assert api.requests[-1].url.path == "/oe3/Program/20273/Presentation/P1"
+
+
+def test_request_retries_server_errors(monkeypatch):
+    api = RecordedAPI(fail_first=1)
+    monkeypatch.setattr(aol.time, "sleep", lambda seconds: None)
+    client = aol.AbstractsOnlineClient(base_url="http://standin.test/oe3/Program",
+                                       client=httpx.Client(transport=httpx.MockTransport(api)))
+    assert client.presentation("P1")["Id"] == "P1"
+    assert len(api.requests) == 2
+
+
+def test_missing_presentation_raises(client):
+    with pytest.raises(httpx.HTTPStatusError):
+        client.presentation("missing")
+
+
+def test_listing_to_links_uses_pp8_link_format():
+    records = RECORDING["results"]["a1b2c3"]["1"]["Results"] + [{"Id": "", "Title": "no id"}, {"Id": "X9"}]
+    rows = aol.listing_to_links(records, "Minisymposium")
+    assert len(rows) == 10  # records without an id or a title are skipped
+    assert rows[0] == {
+        "link": "https://www.abstractsonline.com/pp8/#!/20273/presentation/P1",
+        "title": "KRAS inhibition study P1",
+        "retrieved": False,
+        "session": "Minisymposium",
+    }
+    assert all(row["link"].startswith("https://www.abstractsonline.com/pp8/#!/20273/presentation/") for row in rows)
+    assert aol.presentation_id_from_link(rows[3]["link"]) == "P4"
+
+
+def test_presentation_to_row_strips_markup():
+    link = "https://www.abstractsonline.com/pp8/#!/20273/presentation/P1"
+    row = aol.presentation_to_row(RECORDING["presentations"]["P1"], link, "fallback", "Minisymposium")
+    assert row == {
+        "link": link,
+        "title": "KRAS inhibition study P1",
+        "session": "Minisymposium",
+        "authors": "Jane Doe 1, John Roe 2",
+        "abstract": "Background: KRAS is mutated in many tumors. Results follow.",
+        "status": "complete",
+    }
+
+
+def test_presentation_to_row_fallbacks():
+    row = aol.presentation_to_row({"authors": ["Ann Lee", "Bo Chen"]}, "link", "Listing title", "S")
+    assert row["title"] == "Listing title"
+    assert row["authors"] == "Ann Lee, Bo Chen"
+    assert row["abstract"] == "N/A"
+
+
+@pytest.fixture
+def build_state(tmp_path):
+    store = TSVStore({"aacr_links": tmp_path / "aacr_links.tsv", "aacr_abstracts": tmp_path / "aacr_abstracts.tsv"})
+    links = aol.listing_to_links(RECORDING["results"]["a1b2c3"]["1"]["Results"][:3], "Minisymposium")
+    store.write("aacr_links", aacr_scraper.pd.DataFrame(links))
+    state = aacr_scraper.BuildState(store, tmp_path / "journal.jsonl")
+    yield state, store
+    state.journal.close()
+
+
+def test_only_complete_abstracts_are_marked_retrieved(client, build_state):
+    state, store = build_state
+    links = state.pending_links(10)
+    for idx, row in enumerate(links.itertuples()):
+        state.record_abstract(aacr_scraper.fetch_abstract_api(client, idx, row.link, row.title, row.session))
+    state.flush()
+
+    abstracts = store.read("aacr_abstracts").set_index("link")
+    retrieved = store.read("aacr_links").set_index("link")["retrieved"]
+    statuses = dict(zip(abstracts.index.map(aol.presentation_id_from_link), abstracts["status"]))
+    flags = dict(zip(retrieved.index.map(aol.presentation_id_from_link), retrieved))
+    # P1 has an abstract, P2 an embargo notice (complete, reset later by --reset-embargoed-abstracts)
+    # and P3 no text at all, which stays pending
+    assert statuses == {"P1": "complete", "P2": "complete", "P3": "retry"}
+    assert flags == {"P1": True, "P2": True, "P3": False}
+
+
+def test_missing_presentation_is_final(client, build_state):
+    state, store = build_state
+    row = aacr_scraper.fetch_abstract_api(client, 0, "https://www.abstractsonline.com/pp8/#!/20273/presentation/gone",
+                                          "Gone", "Minisymposium")
+    assert row["status"] == "not_found"
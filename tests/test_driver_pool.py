@@ -0,0 +1,130 @@
+"""TabPipeline ordering and admission, against a stand-in driver that records what each tab loaded."""
+import time
+
+import readiness
+from driver_pool import TabPipeline
+
+
+class FakeSwitch:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def new_window(self, kind):
+        self.driver.handles.append(f"tab{len(self.driver.handles)}")
+        self.driver.current_window_handle = self.driver.handles[-1]
+
+    def window(self, handle):
+        self.driver.current_window_handle = handle
+
+
+class FakeDriver:
+    def __init__(self, broken=()):
+        self.handles = ["tab0"]
+        self.current_window_handle = "tab0"
+        self.loaded = {}
+        self.broken = set(broken)
+        self.switch_to = FakeSwitch(self)
+
+    def execute_script(self, script, url):
+        if url in self.broken:
+            raise RuntimeError(f"cannot load {url}")
+        self.loaded[self.current_window_handle] = url
+
+
+def test_results_and_errors_come_back_in_order():
+    driver = FakeDriver(broken={"u2"})
+    pipeline = TabPipeline(driver, tabs=3)
+    extract = lambda d, item: d.loaded[d.current_window_handle]
+    results = [(item, result, error is not None)
+               for item, result, error in pipeline.run([f"u{i}" for i in range(6)], lambda item: item, extract)]
+    assert results == [("u0", "u0", False), ("u1", "u1", False), ("u2", None, True),
+                       ("u3", "u3", False), ("u4", "u4", False), ("u5", "u5", False)]
+
+
+def test_admit_holds_items_back_while_tabs_are_busy():
+    driver = FakeDriver()
+    pipeline = TabPipeline(driver, tabs=3)
+    slots, calls, peak = [1], [], [0]
+
+    def admit(item, wait):
+        calls.append((item, wait))
+        if not slots[0]:
+            assert not wait  # nothing in flight would mean the slot is never given back
+            return False
+        slots[0] -= 1
+        return True
+
+    for item, result, error in pipeline.run(["a", "b", "c"], lambda item: item, lambda d, item: item, admit):
+        peak[0] = max(peak[0], 1 - slots[0])
+        slots[0] += 1  # the consumer releases the slot before the next load is admitted
+    assert calls == [("a", True), ("b", False), ("b", True), ("c", False), ("c", True)]
+    assert peak[0] == 1
+
+
+class HashRouteDriver(FakeDriver):
+    """
+    Tabs of a single-page app: a new URL only changes the fragment, so each tab keeps its old
+    DOM until the route renders `render_after` seconds later (never, for URLs in `stuck`).
+    """
+
+    def __init__(self, render_after=0.05, stuck=()):
+        super().__init__()
+        self.render_after = render_after
+        self.stuck = set(stuck)
+        self.dom = {}  # handle -> [[text, stale], ...]
+        self.pending = {}  # handle -> (render time, url)
+
+    def _render(self, handle):
+        due, url = self.pending.get(handle, (None, None))
+        if due is not None and time.time() >= due:
+            self.dom[handle] = [[f"content of {url}", False]]
+            del self.pending[handle]
+
+    def execute_script(self, script, *args):
+        handle = self.current_window_handle
+        self._render(handle)
+        elements = self.dom.setdefault(handle, [])
+        if script == readiness._MARK_STALE_SCRIPT:
+            for element in elements:
+                element[1] = True
+            return "|".join(text for text, _ in elements)
+        if script == readiness._FRESH_SCRIPT:
+            return bool(elements) and (any(not stale for _, stale in elements)
+                                       or "|".join(text for text, _ in elements) != args[1])
+        url = args[0]
+        self.loaded[handle] = url
+        if url not in self.stuck:
+            self.pending[handle] = (time.time() + self.render_after, url)
+
+    def refresh(self):
+        handle = self.current_window_handle
+        self.dom[handle] = [[f"content of {self.loaded[handle]}", False]]
+        self.pending.pop(handle, None)
+
+    def text(self):
+        self._render(self.current_window_handle)
+        return "|".join(text for text, _ in self.dom.get(self.current_window_handle, []))
+
+
+URLS = [f"https://www.abstractsonline.com/pp8/#!/20273/presentation/{i}" for i in range(6)]
+
+
+def test_reused_tab_keeps_old_dom_without_a_content_selector():
+    driver = HashRouteDriver()
+    pipeline = TabPipeline(driver, tabs=2)
+    results = [result for _, result, _ in pipeline.run(URLS, lambda url: url, lambda d, url: d.text())]
+    assert results != [f"content of {url}" for url in URLS]
+
+
+def test_extraction_waits_for_the_new_route_on_a_reused_tab():
+    driver = HashRouteDriver()
+    pipeline = TabPipeline(driver, tabs=2, content_selector="dl", timeout=5)
+    results = [(url, result, error) for url, result, error in pipeline.run(URLS, lambda url: url, lambda d, url: d.text())]
+    assert results == [(url, f"content of {url}", None) for url in URLS]
+
+
+def test_tab_that_never_renders_is_reloaded():
+    driver = HashRouteDriver(stuck={URLS[3]})
+    pipeline = TabPipeline(driver, tabs=2, content_selector="dl", timeout=0.3)
+    results = [result for _, result, _ in pipeline.run(URLS, lambda url: url, lambda d, url: d.text())]
+    assert results == [f"content of {url}" for url in URLS]
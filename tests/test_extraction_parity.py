@@ -0,0 +1,100 @@
+"""Every extraction backend against the full-page BeautifulSoup(html, "html.parser") walks it replaced."""
+import pytest
+from bs4 import BeautifulSoup
+
+import extraction
+from bench_parsers import doi_page, listing_page, presentation_page
+
+
+def baseline_aacr(html):
+    """aacr_scraper's original <dl> walk (without its polling)."""
+    soup = BeautifulSoup(html, "html.parser")
+    authors = "N/A"
+    abstract = "N/A"
+    for dl_tag in soup.find_all("dl"):
+        for dt, dd in zip(dl_tag.find_all("dt"), dl_tag.find_all("dd")):
+            label = dt.get_text(strip=True).lower()
+            if "presenter" in label or "author" in label:
+                authors = dd.get_text(separator=" ", strip=True)
+            elif "abstract" in label:
+                abstract = dd.get_text(separator=" ", strip=True)
+                break
+        if abstract and abstract != "N/A":
+            break
+    return authors, abstract
+
+
+def baseline_sitc(html):
+    """sitc_scraper's / sitc_parser's original abstract div walk."""
+    abstract_div = BeautifulSoup(html, "html.parser").find("div", class_="section abstract")
+    if not abstract_div:
+        return []
+    subsections = abstract_div.find_all("div", class_="subsection")
+    if not subsections:
+        return [("Abstract", abstract_div.get_text(strip=True))]
+    sections = []
+    for subsection in subsections:
+        heading = subsection.find("strong")
+        section_name = heading.get_text(strip=True) if heading else "Unknown Section"
+        sections.append((section_name, subsection.get_text(strip=True).replace(section_name, "", 1).strip()))
+    return sections
+
+
+BACKENDS = [pytest.param(b, marks=pytest.mark.skipif(not extraction.available(b), reason=f"{b} not installed"))
+            for b in extraction.BACKENDS]
+
+AACR_PAGES = {
+    "synthetic_presentation": presentation_page(),
+    "listing_without_dl": listing_page(),
+    "challenge": doi_page(),
+    "nested_dl": "<dl><dt>Presenter</dt><dd>Ann<dl><dt>Abstract</dt><dd>inner</dd></dl></dd>"
+                 "<dt>Abstract</dt><dd>outer</dd></dl>",
+    "unclosed_dt_dd": "<dl><dt>Presenter/Authors<dd>Ann Lee, Bo Chen<dt>Abstract<dd>Some <b>bold</b> text</dl>",
+    "unclosed_dd_before_next_dl": "<dl><dt>Authors</dt><dd>Ann Lee</dl><dl><dt>Abstract</dt><dd>Text</dd></dl>",
+    "unclosed_dl": "<dl><dt>Authors</dt><dd>Ann Lee</dd><dt>Abstract</dt><dd>Text<p>more",
+    "script_and_comment": "<dl><dt>Abstract</dt><dd>Text <script>var x = 1;</script><!-- note --> "
+                          "<style>p {}</style>more</dd></dl>",
+    "uppercase_tags": "<DL><DT>Authors</DT><DD>Ann</DD><DT>Abstract</DT><DD>Text</DD></DL>",
+    "mismatched_counts": "<dl><dt>Authors</dt><dt>Abstract</dt><dd>Ann</dd></dl><dl><dt>Abstract</dt><dd>T</dd></dl>",
+    "embargoed": "<dl><dt>Abstract</dt><dd>Abstract is embargoed until 9:00 AM</dd></dl>",
+    "dl_in_template": "<template><dl><dt>Abstract</dt><dd>hidden</dd></dl></template><dl><dt>Abstract</dt><dd>shown</dd></dl>",
+    "stray_end_tag": "<dl><dt>Abstract</dt><dd>Ab</p>stract is embargoed until 9:00 AM</dd></dl>",
+    "raw_text_element": "<dl><dt>Authors</dt><dd>Ann</dd><DT>Ab<xmp>stract</DT><DD>Text</DD></dl>",
+    "reference_without_semicolon": "<dl><dt>Abstract</dt><dd>&nbspText</dd></dl>",
+    "empty_comment": "<!--><dl><dt>Abstract</dt><dd>Text</dd></dl>",
+    "empty": "",
+}
+
+SUBSECTIONS = '<div class="subsection"><p><strong>Background</strong> Why.</p></div><div class="subsection"><p>No heading</p></div>'
+SITC_PAGES = {
+    "synthetic_abstract": doi_page(True),
+    "challenge": doi_page(),
+    "listing": listing_page(),
+    "double_space_class": f'<div class="section  abstract">{SUBSECTIONS}</div>',
+    "reordered_classes": f'<div class="abstract section">{SUBSECTIONS}</div><div class="section abstract">Plain text</div>',
+    "extra_class": f'<div class="section abstract extra">{SUBSECTIONS}</div>',
+    "padded_class": f'<div class=" section abstract ">{SUBSECTIONS}</div>',
+    "no_subsections": '<div class="section abstract"><h2>Abstract</h2><p>Only <em>text</em></p></div>',
+    "script_and_comment": '<div class="section abstract"><script>var x = 1;</script><!-- c --><p>Text</p></div>',
+    "nested_abstract": f'<div class="section abstract"><div class="section abstract">{SUBSECTIONS}</div></div>',
+    "unclosed_subsection": '<div class="section abstract"><div class="subsection"><strong>A</strong> one'
+                           '<div class="subsection"><strong>B</strong> two</div>',
+    "unclosed_p": '<div class="section abstract"><div class="subsection"><p><strong>A</strong> one<p>two</div></div>',
+    "stray_end_tag": '<div class="section abstract"><p>A</strong> one<p>two</div>',
+    "textarea": '<div class="section abstract"><h2>Abstract</h2><textarea><p>Only <em>text</p></div>',
+    "list_item_in_item": f'<div class="section abstract"><ul><li>{SUBSECTIONS}<li>x</li></li></ul></div>',
+}
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("name", AACR_PAGES)
+def test_aacr_presentation_matches_baseline(name, backend):
+    html = AACR_PAGES[name]
+    assert extraction.aacr_presentation(html, backend) == baseline_aacr(html)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("name", SITC_PAGES)
+def test_sitc_abstract_matches_baseline(name, backend):
+    html = SITC_PAGES[name]
+    assert extraction.sitc_abstract(html, backend) == baseline_sitc(html)
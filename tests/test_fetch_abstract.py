@@ -0,0 +1,111 @@
+"""fetch_abstract with --capture-network, against presentation records a stubbed capture hands back."""
+import json
+
+import pytest
+
+import aacr_scraper
+from conftest import FIXTURES
+from failures import CircuitBreaker
+from throttle import AIMDController
+
+RECORDING = json.loads((FIXTURES / "abstractsonline_recording.json").read_text())
+LINK = "https://www.abstractsonline.com/pp8/#!/20273/presentation/{}"
+
+
+class Pooled:
+    driver = object()
+
+
+class Pool:
+    def __init__(self):
+        self.released = []
+
+    def acquire(self):
+        return Pooled()
+
+    def release(self, pooled, failed=False):
+        self.released.append(failed)
+
+
+def captured(record):
+    class Capture:
+        def __init__(self, driver, debug=False):
+            pass
+
+        def reset(self):
+            pass
+
+        def wait_for(self, url_pattern, timeout=30):
+            return "https://www.abstractsonline.com/oe3/Program/20273/Presentation/x", record
+    return Capture
+
+
+@pytest.fixture(autouse=True)
+def capture_mode(monkeypatch):
+    monkeypatch.setattr(aacr_scraper, "CAPTURE_NETWORK", True)
+    monkeypatch.setattr(aacr_scraper, "navigate", lambda driver, url, selector: True)
+    monkeypatch.setattr(aacr_scraper.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(aacr_scraper, "THROTTLE", AIMDController(initial_delay=0.001, min_delay=0.001))
+    monkeypatch.setattr(aacr_scraper, "BREAKER", CircuitBreaker())
+
+
+def fetch(monkeypatch, pid):
+    monkeypatch.setattr(aacr_scraper, "NetworkCapture", captured(RECORDING["presentations"][pid]))
+    return aacr_scraper.fetch_abstract(Pool(), 0, LINK.format(pid), "Listing title", "Minisymposium", {})
+
+
+def test_captured_record_with_abstract_is_complete(monkeypatch):
+    row = fetch(monkeypatch, "P1")
+    assert row["status"] == "complete"
+    assert row["abstract"].startswith("Background: KRAS")
+
+
+def test_captured_record_without_abstract_stays_pending(monkeypatch):
+    row = fetch(monkeypatch, "P3")
+    assert row["status"] == "retry"
+    assert row["abstract"] == ""
+
+
+class ScriptedPipeline:
+    """TabPipeline stand-in: each link's loads end with the next outcome in OUTCOMES[link]."""
+    outcomes = {}
+
+    def __init__(self, driver, tabs=2, content_selector=None):
+        pass
+
+    def run(self, items, url_of, extract, admit=None):
+        for item in items:
+            idx, link, title, session = item
+            outcome = self.outcomes[link].pop(0)
+            text = "Background: real text." if outcome == aacr_scraper.failures.OK else ""
+            row = {"link": link, "title": title, "session": session, "authors": "A", "abstract": text,
+                   "status": "complete"}
+            yield item, (row, outcome), None
+
+    def close(self):
+        pass
+
+
+def test_tab_results_are_retried_per_policy(monkeypatch):
+    failures = aacr_scraper.failures
+    ScriptedPipeline.outcomes = {
+        "empty-then-ok": [failures.EMPTY, failures.OK],
+        "gone": [failures.NOT_FOUND],
+        "always-timeout": [failures.TIMEOUT] * 3,
+        "challenged": [failures.CHALLENGE, failures.OK],
+    }
+    monkeypatch.setattr(aacr_scraper, "TabPipeline", ScriptedPipeline)
+    batch = aacr_scraper.pd.DataFrame({"link": list(ScriptedPipeline.outcomes), "title": "t", "session": "S"})
+    pool = Pool()
+    rows = {row["link"]: row["status"] for row in aacr_scraper.fetch_abstracts_tabbed(pool, batch, {}, tabs=2)}
+    assert rows == {"empty-then-ok": "complete", "gone": "not_found", "always-timeout": "retry", "challenged": "complete"}
+    assert all(not left for left in ScriptedPipeline.outcomes.values())  # TIMEOUT: first try and two retries
+    assert pool.released[0] is True  # the challenged browser is not reused for the retry round
+
+
+def test_every_outcome_class_has_a_retry_policy():
+    failures = aacr_scraper.failures
+    outcomes = {failures.OK, failures.EMBARGOED, failures.NOT_FOUND, failures.CHALLENGE, failures.TIMEOUT,
+                failures.EMPTY, failures.ERROR, failures.DRIVER_CRASH}
+    assert outcomes <= set(failures.RETRY_POLICIES)
+    assert not failures.should_retry(failures.OK, 1) and not failures.RETRY_POLICIES[failures.OK].recycle_driver
@@ -0,0 +1,43 @@
+"""PageCache storing the same body from several connections at once (e.g. --workers processes)."""
+import threading
+
+from page_cache import PageCache
+
+
+def test_concurrent_puts_of_one_body(tmp_path):
+    caches = [PageCache(tmp_path) for _ in range(8)]
+    barrier = threading.Barrier(len(caches))
+    errors = []
+
+    def put(i, cache):
+        barrier.wait()
+        try:
+            cache.put(f"https://example.test/{i}", "<html>same body</html>", "html")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=put, args=(i, cache)) for i, cache in enumerate(caches)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    check = caches[0]
+    assert check.conn.execute("SELECT COUNT(*) FROM objects").fetchone()[0] == 1
+    assert len(check.entries("html")) == 8
+    assert {check.read(page.digest) for page in check.entries("html")} == {"<html>same body</html>"}
+    assert not list((tmp_path / "objects").rglob("*.tmp"))
+    for cache in caches:
+        cache.close()
+
+
+def test_put_again_touches_the_body(tmp_path):
+    cache = PageCache(tmp_path)
+    digest = cache.put("https://example.test/a", "body", "html", fetched_at=1.0)
+    first = cache.conn.execute("SELECT last_access FROM objects WHERE digest = ?", (digest,)).fetchone()[0]
+    assert cache.put("https://example.test/b", "body", "html") == digest
+    again = cache.conn.execute("SELECT last_access FROM objects WHERE digest = ?", (digest,)).fetchone()[0]
+    assert again >= first
+    assert [page.url for page in cache.entries("html")] == ["https://example.test/a", "https://example.test/b"]
+    cache.close()
@@ -0,0 +1,57 @@
+"""--reparse rebuilding aacr_abstracts from cached API records without downgrading stored rows."""
+import json
+
+import pandas as pd
+import pytest
+
+import abstractsonline_api as aol
+import aacr_scraper
+from conftest import FIXTURES
+from page_cache import PageCache
+from state_store import TSVStore
+
+RECORDING = json.loads((FIXTURES / "abstractsonline_recording.json").read_text())
+LINK = "https://www.abstractsonline.com/pp8/#!/20273/presentation/{}"
+
+
+@pytest.fixture
+def state(tmp_path, monkeypatch):
+    store = TSVStore({"aacr_links": tmp_path / "aacr_links.tsv", "aacr_abstracts": tmp_path / "aacr_abstracts.tsv"})
+    cache = PageCache(tmp_path / "cache")
+    links = aol.listing_to_links(RECORDING["results"]["a1b2c3"]["1"]["Results"][:2], "Minisymposium")
+    store.write("aacr_links", pd.DataFrame(links))
+    for pid in ("P1", "P2"):
+        cache.put(LINK.format(pid), json.dumps(RECORDING["presentations"][pid]), "aacr_presentation_json")
+    monkeypatch.setattr(aacr_scraper, "STORE", store)
+    monkeypatch.setattr(aacr_scraper, "PAGE_CACHE", cache)
+    yield store
+    cache.close()
+
+
+def test_reparse_never_downgrades(state):
+    full_text = "Background: the full abstract, fetched after the embargo lifted. " * 3
+    state.write("aacr_abstracts", pd.DataFrame([
+        {"link": LINK.format("P1"), "title": "old", "session": "Minisymposium", "authors": "", "abstract": "N/A",
+         "status": "retry"},
+        {"link": LINK.format("P2"), "title": "P2", "session": "Minisymposium", "authors": "A", "abstract": full_text,
+         "status": "complete"},
+    ]))
+
+    aacr_scraper.reparse_abstracts(workers=1)
+
+    abstracts = state.read("aacr_abstracts").set_index("link")
+    # P1's cached record is better than the stored placeholder; P2's cached copy is only the embargo notice
+    assert abstracts.loc[LINK.format("P1"), "abstract"].startswith("Background: KRAS")
+    assert abstracts.loc[LINK.format("P1"), "status"] == "complete"
+    assert abstracts.loc[LINK.format("P2"), "abstract"] == full_text
+    assert state.read("aacr_links").set_index("link").loc[LINK.format("P1"), "retrieved"]
+
+
+def test_reparse_dry_run_counts_only_applied_rows(state, capsys):
+    state.write("aacr_abstracts", pd.DataFrame([
+        {"link": LINK.format("P2"), "title": "P2", "session": "Minisymposium", "authors": "A",
+         "abstract": "Complete text " * 20, "status": "complete"},
+    ]))
+    aacr_scraper.reparse_abstracts(workers=1, dry_run=True)
+    assert "1 new and 0 changed" in capsys.readouterr().out
+    assert len(state.read("aacr_abstracts")) == 1
@@ -0,0 +1,69 @@
+"""--reset-embargoed-abstracts against the per-link loop it replaced, on both state stores."""
+import pandas as pd
+import pytest
+
+import aacr_scraper
+from state_store import SQLiteStore, TSVStore
+
+LINKS = pd.DataFrame({
+    "link": ["l1", "l2", "l3", "l4", "l5", "l6"],
+    "title": ["t1", "t2", "t3", "t4", "t5", "t6"],
+    "retrieved": [True, False, True, True, True, False],
+    "session": ["S"] * 6,
+})
+ABSTRACTS = pd.DataFrame({
+    "link": ["l1", "l2", "l3", "l4", "l6", "gone"],
+    "title": ["t1", "t2", "t3", "t4", "t6", "gone"],
+    "session": ["S"] * 6,
+    "authors": ["a"] * 6,
+    "abstract": ["This abstract is EMBARGOED until the meeting", "Embargoed", "Real text",
+                 "   ", None, "embargoed"],
+    "status": ["complete"] * 6,
+})
+
+
+def old_loop(links_df, abstracts_df, reset_blank):
+    """The baseline implementation's selection and count."""
+    embargoed = abstracts_df[abstracts_df["abstract"].str.contains("embargoed", case=False, na=False)]["link"].tolist()
+    missing = []
+    if reset_blank:
+        missing = abstracts_df[abstracts_df["abstract"].isnull() | (abstracts_df["abstract"].str.strip() == "")]["link"].tolist()
+    links_df = links_df.copy()
+    updated = 0
+    for link in set(embargoed + missing):
+        match = links_df["link"] == link
+        if match.any():
+            links_df.loc[match, "retrieved"] = False
+            updated += 1
+    return updated, links_df
+
+
+@pytest.fixture(params=["tsv", "sqlite"])
+def store(request, tmp_path, monkeypatch):
+    if request.param == "tsv":
+        store = TSVStore({"aacr_links": tmp_path / "aacr_links.tsv", "aacr_abstracts": tmp_path / "aacr_abstracts.tsv"})
+    else:
+        store = SQLiteStore(tmp_path / "state.sqlite")
+    store.write("aacr_links", LINKS)
+    store.write("aacr_abstracts", ABSTRACTS)
+    monkeypatch.setattr(aacr_scraper, "STORE", store)
+    yield store
+    store.close()
+
+
+@pytest.mark.parametrize("reset_blank", [False, True])
+def test_matches_old_loop(store, tmp_path, reset_blank):
+    expected_count, expected_links = old_loop(LINKS, ABSTRACTS, reset_blank)
+    flag = tmp_path / "GET_ABSTRACTS_FINISHED"
+    flag.touch()
+    paths = {"get_abstracts_finished": flag}
+
+    assert aacr_scraper.reset_retrieved_links(include_blank=reset_blank, dry_run=True) == expected_count
+    aacr_scraper.reset_embargoed_abstracts(paths, reset_blank=reset_blank, dry_run=True)
+    assert flag.exists()
+    assert store.read("aacr_links")["retrieved"].astype(bool).tolist() == LINKS["retrieved"].tolist()
+
+    aacr_scraper.reset_embargoed_abstracts(paths, reset_blank=reset_blank)
+    links = store.read("aacr_links").sort_values("link")
+    assert links["retrieved"].astype(bool).tolist() == expected_links["retrieved"].tolist()
+    assert not flag.exists()
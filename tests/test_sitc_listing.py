@@ -0,0 +1,78 @@
+"""extraction.sitc_listing against the split-on-"Abstract Number" loops it replaced."""
+import re
+
+import pytest
+
+import extraction
+from conftest import ROOT
+
+PAGE = (ROOT / "ex_html" / "sitc_page_source.html").read_text(encoding="utf-8")
+SCRAPER_DOI = r"(https?://dx\.doi\.org/10\.1136/jitc-2024-SITC2024\.\d+)"  # sitc_scraper.py
+PARSER_DOI = r"(https://dx\.doi\.org/10\.1136/jitc-2024-SITC2024\.\d+)"  # sitc_parser.py
+
+
+def old_loop(page_source, doi_regex):
+    """The baseline scrapers' loop: (title, authors, DOI link) per section."""
+    entries = []
+    for section in page_source.split("Abstract Number")[1:]:
+        title_match = re.search(r'<p style="font-size: 1.5em; font-weight: 700;"><a href=.*?>(.*?)</a></p>', section, re.DOTALL)
+        title = title_match.group(1).strip() if title_match else "Unknown Title"
+        title = re.sub(r'<.*?>', '', title)
+        authors_match = re.search(r'Authors</span>.*?<span class="ais-Highlight"><span class="ais-Highlight-nonHighlighted">(.*?)</span></span>', section, re.DOTALL)
+        authors = authors_match.group(1).strip() if authors_match else "Unknown Authors"
+        doi_match = re.search(doi_regex, section)
+        entries.append((title, authors, doi_match.group(1) if doi_match else "No DOI Found"))
+    return entries
+
+
+def new_loop(page_source, doi_regex):
+    return [(e.title, e.authors, e.doi_link) for e in extraction.sitc_listing(page_source, re.compile(doi_regex))]
+
+
+HIGHLIGHT = '<span class="ais-Highlight"><span class="ais-Highlight-nonHighlighted">'
+
+
+def hit(number, title='<a href="#x"> A <b>bold</b> title </a></p>', authors=f"{HIGHLIGHT} Ann Lee, Bo Chen </span></span>",
+        doi="https://dx.doi.org/10.1136/jitc-2024-SITC2024.{n}"):
+    return (f'<div>Abstract Number</span></span>{HIGHLIGHT}{number}</span></span>'
+            f'<p style="font-size: 1.5em; font-weight: 700;">{title}'
+            f'<span>Authors</span>{authors}<a href="{doi.format(n=number)}">DOI</a></div>')
+
+
+MALFORMED = "<html><body>" + "".join([
+    hit(1),
+    hit(2, title="<span>no title anchor</span>"),
+    hit(3, title='<a href="#x">unterminated title anchor</a>'),
+    hit(4, authors="<span>no highlighted authors</span>"),
+    hit(5, doi="http://dx.doi.org/10.1136/jitc-2024-SITC2024.{n}"),
+    hit(6, doi="https://doi.org/10.1136/elsewhere.{n}"),
+    hit(7),
+]) + f'<div>Abstract Number</span></span>{HIGHLIGHT}8</span></span><p style="font-size: 1.5em; font-weight: 700;"><a href="#x">cut off'
+
+
+@pytest.mark.parametrize("doi_regex", [SCRAPER_DOI, PARSER_DOI], ids=["sitc_scraper", "sitc_parser"])
+def test_sample_page_matches_old_loop(doi_regex):
+    entries = new_loop(PAGE, doi_regex)
+    assert len(entries) == PAGE.count("Abstract Number")
+    assert entries == old_loop(PAGE, doi_regex)
+
+
+@pytest.mark.parametrize("doi_regex", [SCRAPER_DOI, PARSER_DOI], ids=["sitc_scraper", "sitc_parser"])
+def test_malformed_and_unterminated_entries_match_old_loop(doi_regex):
+    assert new_loop(MALFORMED, doi_regex) == old_loop(MALFORMED, doi_regex)
+
+
+def test_malformed_entries():
+    entries = new_loop(MALFORMED, SCRAPER_DOI)
+    assert entries[0] == ("A bold title", "Ann Lee, Bo Chen", "https://dx.doi.org/10.1136/jitc-2024-SITC2024.1")
+    assert entries[1][0] == entries[2][0] == "Unknown Title"
+    assert entries[3][1] == "Unknown Authors"
+    assert entries[4][2] == "http://dx.doi.org/10.1136/jitc-2024-SITC2024.5"
+    assert entries[5][2] == "No DOI Found"
+    assert entries[7] == ("Unknown Title", "Unknown Authors", "No DOI Found")
+    # sitc_parser.py keeps its https-only DOI match
+    assert new_loop(MALFORMED, PARSER_DOI)[4][2] == "No DOI Found"
+
+
+def test_number_field():
+    assert [e.number for e in extraction.sitc_listing(MALFORMED)] == [str(n) for n in range(1, 9)]
@@ -0,0 +1,163 @@
+"""
+Adaptive per-host pacing for the scrapers (AIMD, as in TCP congestion control).
+
+Each host gets a request rate and a limit on in-flight fetches. Every successful page
+adds a little to the rate (and, once per window of successes, one more in-flight slot);
+a timeout, empty listing or bot challenge halves both. The scrapers therefore run as
+fast as a site tolerates instead of at a fixed worst-case pace. Every change is printed
+so the decisions end up in the run log.
+"""
+import time
+import random
+import asyncio
+import threading
+import collections
+from urllib.parse import urlparse
+
+def host_of(url):
+    return urlparse(url).netloc or url
+
+
+class HostThrottle:
+    """AIMD state for one host."""
+
+    def __init__(self, host, rate, concurrency, settings):
+        self.host = host
+        self.rate = rate  # requests started per second
+        self.concurrency = concurrency
+        self.settings = settings
+        self.inflight = 0
+        self.next_start = 0.0
+        self.successes = 0  # since the last concurrency step
+        self.waiters = collections.deque()  # (loop, future) of acquire_async calls waiting for a free slot
+
+    @property
+    def delay(self):
+        return 1.0 / self.rate
+
+
+class AIMDController:
+    """
+    Hands out per-host start slots via acquire()/release(), mirroring DriverPool.
+    `release(url, failure=None)` reports the outcome: None for a good page, otherwise a
+    short reason ('timeout', 'empty', 'challenge', ...) that triggers a multiplicative backoff.
+    """
+
+    def __init__(self, initial_delay=3.0, min_delay=0.5, max_delay=60.0, initial_concurrency=1,
+                 max_concurrency=1, rate_step=0.05, backoff=0.5, jitter=0.2, debug=False):
+        self.settings = dict(initial_delay=initial_delay, min_delay=min_delay, max_delay=max_delay,
+                             initial_concurrency=initial_concurrency, max_concurrency=max_concurrency,
+                             rate_step=rate_step, backoff=backoff, jitter=jitter)
+        self.debug = debug
+        self._hosts = {}
+        self._lock = threading.Lock()
+        self._freed = threading.Condition(self._lock)  # notified by release()
+
+    def share(self, n):
+        """
+        Settings for one of `n` processes that each pace themselves with their own controller
+        (aacr --workers): every delay is multiplied by n, so together they keep this pace.
+        """
+        s = dict(self.settings)
+        for key in ("initial_delay", "min_delay", "max_delay"):
+            s[key] *= n
+        return s
+
+    def host(self, url):
+        host = host_of(url)
+        with self._lock:
+            if host not in self._hosts:
+                s = self.settings
+                self._hosts[host] = HostThrottle(host, 1.0 / s["initial_delay"],
+                                                 min(s["initial_concurrency"], s["max_concurrency"]), s)
+            return self._hosts[host]
+
+    def _claim(self, state):
+        """
+        With the lock held: claim a start slot and return 0, return None while every in-flight
+        slot is taken (release() wakes the waiters), or the seconds until the next start.
+        """
+        now = time.time()
+        if state.inflight >= state.concurrency:
+            return None
+        if now < state.next_start:
+            return state.next_start - now
+        jitter = self.settings["jitter"]
+        state.inflight += 1
+        state.next_start = now + state.delay * random.uniform(1 - jitter, 1 + jitter)
+        return 0
+
+    def acquire(self, url, block=True):
+        """Claim a start slot for `url` and return True; with block=False, return False instead of waiting."""
+        state = self.host(url)
+        with self._freed:
+            while True:
+                wait = self._claim(state)
+                if wait == 0:
+                    return True
+                if not block:
+                    return False
+                self._freed.wait(wait)  # wait=None: until a release()
+
+    async def acquire_async(self, url):
+        state = self.host(url)
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                wait = self._claim(state)
+                if wait is None:
+                    waiter = loop.create_future()
+                    state.waiters.append((loop, waiter))
+            if wait == 0:
+                return
+            if wait is None:
+                await waiter
+            else:
+                await asyncio.sleep(wait)
+
+    def _wake(self, state):
+        """With the lock held: wake as many waiters as there are free slots."""
+        self._freed.notify_all()
+        free = state.concurrency - state.inflight
+        while free > 0 and state.waiters:
+            loop, waiter = state.waiters.popleft()
+            if not waiter.done():
+                loop.call_soon_threadsafe(lambda w=waiter: w.done() or w.set_result(None))
+                free -= 1
+
+    def release(self, url, failure=None):
+        state = self.host(url)
+        s = self.settings
+        with self._lock:
+            state.inflight = max(0, state.inflight - 1)
+            old_rate, old_conc = state.rate, state.concurrency
+            if failure:
+                # Multiplicative decrease of both the rate and the in-flight limit
+                state.rate = max(1.0 / s["max_delay"], state.rate * s["backoff"])
+                state.concurrency = max(1, int(state.concurrency * s["backoff"]))
+                state.successes = 0
+                # Let the host breathe before the next start
+                state.next_start = max(state.next_start, time.time() + state.delay)
+            else:
+                # Additive increase: a little more rate per page, one more slot per window
+                state.rate = min(1.0 / s["min_delay"], state.rate + s["rate_step"])
+                state.successes += 1
+                if state.successes >= state.concurrency and state.concurrency < s["max_concurrency"]:
+                    state.concurrency += 1
+                    state.successes = 0
+            self._wake(state)
+        if failure:
+            print(f"🐢 {state.host}: backing off after {failure} — {1 / old_rate:.2f}s → {state.delay:.2f}s between requests, "
+                  f"{old_conc} → {state.concurrency} in flight")
+        elif state.concurrency != old_conc:
+            print(f"🐇 {state.host}: {state.concurrency} in flight, {state.delay:.2f}s between requests")
+        elif self.debug:
+            print(f"[DEBUG] {state.host}: {old_rate:.2f} → {state.rate:.2f} req/s")
+
+    def cooldown(self, url):
+        """Sleep for the host's current delay (e.g. while a driver restarts)."""
+        time.sleep(self.host(url).delay)
+
+    def report(self):
+        for state in self._hosts.values():
+            print(f"🚦 {state.host}: settled at {state.delay:.2f}s between requests, {state.concurrency} in flight")